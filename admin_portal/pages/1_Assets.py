@@ -93,9 +93,18 @@ def display_assets_table():
     """Display table of all assets."""
     st.subheader("📋 All Assets")
     
+    query = st.text_input(
+        "🔍 Search assets",
+        placeholder="Name, category or asset ID",
+        help="Typos are tolerated; leave empty to list all assets"
+    ).strip()
+    
     try:
-        # Fetch assets from API
-        response = client.get('assets')
+        # Fetch assets from API, ranked by the search endpoint when filtering
+        if len(query) >= 2:
+            response = client.get('search', params={'q': query, 'types': 'asset', 'limit': 50})['results']
+        else:
+            response = client.get('assets')
         
         if response and len(response) > 0:
             # Convert to DataFrame
@@ -124,6 +133,8 @@ def display_assets_table():
             )
             
             st.caption(f"Total Assets: {len(df)}")
+        elif len(query) >= 2:
+            st.info(f"No assets match \"{query}\".")
         else:
             st.info("No assets found. Create your first asset above!")
     
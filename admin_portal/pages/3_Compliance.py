@@ -27,9 +27,24 @@ def upload_compliance_form():
     """Display form to upload compliance documents."""
     st.subheader("📄 Upload Compliance Document")
     
+    query = st.text_input(
+        "🔍 Find subcontractor",
+        placeholder="Name or email",
+        help="Narrows the subcontractor list below"
+    ).strip()
+    
     try:
         # Fetch subcontractors for dropdown
-        subcontractors = client.get('subcontractors')
+        if len(query) >= 2:
+            subcontractors = client.get(
+                'search', params={'q': query, 'types': 'subcontractor', 'limit': 20}
+            )['results']
+            
+            if not subcontractors:
+                st.warning(f"⚠️ No subcontractors match \"{query}\".")
+                return
+        else:
+            subcontractors = client.get('subcontractors')
         
         if not subcontractors or len(subcontractors) == 0:
             st.warning("⚠️ No subcontractors found. Please add subcontractors first.")
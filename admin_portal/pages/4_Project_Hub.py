@@ -7,7 +7,7 @@ import pandas as pd
 from datetime import datetime
 from admin_portal.config import config
 from admin_portal.utils.auth import require_auth
-from admin_portal.utils.api_client import APIClient
+from admin_portal.utils.api_client import APIClient, APIError
 
 
 # Page configuration
@@ -55,132 +55,155 @@ def display_project_selector():
         return None
 
 
-def calculate_status(expiry_date_str: str) -> tuple:
-    """
-    Calculate compliance status based on expiry date.
-    Returns (status_text, status_color, days_remaining)
-    """
+def status_label(status: str, days_remaining: int) -> str:
+    """Status text with indicator for a document."""
+    if days_remaining < 0:
+        return "🔴 EXPIRED"
+    elif status == "RED":
+        return "🔴 RED"
+    return "🟢 GREEN"
+
+
+def build_compliance_report(project_id: str) -> pd.DataFrame:
+    """Fetch every document on the project for the CSV export."""
+    response = client.get(f'projects/{project_id}/compliance')
+    rows = []
+    for sub in response.get('subcontractors', []):
+        for doc in sub.get('documents', []):
+            rows.append({
+                'Subcontractor': sub.get('name', 'Unknown'),
+                'Subcontractor Status': sub.get('status'),
+                'Document Type': doc.get('document_type'),
+                'Expiry Date': doc.get('expiry_date'),
+                'Status': doc.get('status')
+            })
+    return pd.DataFrame(rows)
+
+
+def display_all_projects_overview():
+    """Display RED/GREEN counts for every project from the compliance matrix."""
     try:
-        expiry_date = datetime.fromisoformat(expiry_date_str).date()
-        days_remaining = (expiry_date - datetime.now().date()).days
+        matrix = client.get('compliance/matrix')
+        totals = matrix['totals']
         
-        if days_remaining <= 0:
-            return ("🔴 EXPIRED", "red", days_remaining)
-        elif days_remaining <= 30:
-            return ("🔴 RED", "red", days_remaining)
-        else:
-            return ("🟢 GREEN", "green", days_remaining)
-    except:
-        return ("⚪ UNKNOWN", "gray", 0)
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Projects", totals['projects'])
+        with col2:
+            st.metric("🟢 GREEN Assignments", totals['green'])
+        with col3:
+            st.metric("🔴 RED Assignments", totals['red'])
+        
+        df = pd.DataFrame([{
+            'Project': project['name'],
+            'Subcontractors': project['green'] + project['red'],
+            '🟢 GREEN': project['green'],
+            '🔴 RED': project['red']
+        } for project in matrix['projects']])
+        
+        if df.empty:
+            st.info("No projects found.")
+            return
+        
+        # Projects needing the most attention first
+        st.dataframe(
+            df.sort_values(['🔴 RED', 'Project'], ascending=[False, True]),
+            use_container_width=True,
+            hide_index=True
+        )
+    
+    except Exception as e:
+        st.error(f"❌ Failed to load compliance overview: {str(e)}")
 
 
 def display_compliance_dashboard(project_id: str):
     """Display compliance status dashboard for selected project."""
     try:
-        # Fetch compliance status for project
-        response = client.get(f'projects/{project_id}/compliance')
+        # Totals, histogram and soonest expiries are computed by the API
+        summary = client.get(f'projects/{project_id}/compliance/summary', params={'limit': 10})
         
-        if not response:
+        if not summary:
             st.info("No compliance data available for this project.")
             return
         
-        project_name = response.get('project_name', 'Unknown Project')
-        subcontractors = response.get('subcontractors', [])
+        project_name = summary.get('project_name', 'Unknown Project')
+        subs = summary['subcontractors']
         
         st.subheader(f"📊 Compliance Status: {project_name}")
         
-        if not subcontractors or len(subcontractors) == 0:
+        if subs['total'] == 0:
             st.info("No subcontractors assigned to this project.")
             return
         
-        # Calculate overall statistics
-        total_subs = len(subcontractors)
-        red_count = sum(1 for sub in subcontractors if sub.get('status') == 'RED')
-        green_count = sum(1 for sub in subcontractors if sub.get('status') == 'GREEN')
-        
         # Display summary metrics
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            st.metric("Total Subcontractors", total_subs)
+            st.metric("Total Subcontractors", subs['total'])
         
         with col2:
-            st.metric("🟢 GREEN", green_count)
+            st.metric("🟢 GREEN", subs['green'])
         
         with col3:
-            st.metric("🔴 RED", red_count)
+            st.metric("🔴 RED", subs['red'])
         
         with col4:
-            compliance_rate = (green_count / total_subs * 100) if total_subs > 0 else 0
-            st.metric("Compliance Rate", f"{compliance_rate:.0f}%")
+            st.metric("Compliance Rate", f"{summary['compliance_rate']:.0f}%")
         
         st.divider()
         
-        # Display detailed compliance table
-        st.subheader("Detailed Compliance Status")
+        # Documents by days until expiry
+        st.subheader("Documents by Days Remaining")
+        buckets = summary['days_remaining']
+        for column, bucket in zip(st.columns(len(buckets)), buckets):
+            with column:
+                st.metric(bucket['bucket'], bucket['count'])
         
-        # Prepare data for table
-        table_data = []
-        for sub in subcontractors:
-            status_text, status_color, days_remaining = calculate_status(sub.get('expiry_date', ''))
-            
-            table_data.append({
-                'Subcontractor': sub.get('name', 'Unknown'),
-                'Document Type': sub.get('document_type', 'N/A'),
-                'Expiry Date': sub.get('expiry_date', 'N/A'),
-                'Days Remaining': days_remaining,
-                'Status': status_text
-            })
+        st.divider()
         
-        if table_data:
-            df = pd.DataFrame(table_data)
-            
-            # Style the dataframe
-            def style_status(val):
-                if '🔴' in val:
-                    return 'background-color: #ffcccc; color: #cc0000; font-weight: bold'
-                elif '🟢' in val:
-                    return 'background-color: #ccffcc; color: #006600; font-weight: bold'
-                else:
-                    return ''
-            
-            def style_days(val):
-                if val <= 0:
-                    return 'background-color: #ffcccc; color: #cc0000; font-weight: bold'
-                elif val <= 30:
-                    return 'background-color: #ffe6cc; color: #cc6600; font-weight: bold'
-                else:
-                    return 'color: #006600'
-            
-            # Display styled dataframe
-            styled_df = df.style.applymap(style_status, subset=['Status'])
-            styled_df = styled_df.applymap(style_days, subset=['Days Remaining'])
+        # Weekly renewal forecast by document type
+        st.subheader("Upcoming Expiries by Week")
+        forecast = client.get('compliance/forecast', params={'project_id': project_id, 'weeks': 26})
+        if forecast['series']:
+            chart = pd.DataFrame(0, index=forecast['weeks'], columns=sorted({s['document_type'] for s in forecast['series']}))
+            for series in forecast['series']:
+                chart.iloc[series['weeks'], chart.columns.get_loc(series['document_type'])] += series['counts']
+            st.bar_chart(chart)
+        else:
+            st.info("No documents expire in the next 26 weeks.")
+        
+        st.divider()
+        
+        # Soonest expiries
+        st.subheader("Soonest Expiries")
+        
+        soonest = summary['soonest_expiries']
+        if soonest:
+            df = pd.DataFrame([{
+                'Subcontractor': doc['subcontractor_name'],
+                'Document Type': doc['document_type'],
+                'Expiry Date': doc['expiry_date'],
+                'Days Remaining': doc['days_remaining'],
+                'Status': status_label(doc['status'], doc['days_remaining'])
+            } for doc in soonest])
             
             st.dataframe(
-                styled_df,
+                df,
                 use_container_width=True,
                 hide_index=True
             )
-            
-            # Display warnings for RED status
-            red_subs = [item for item in table_data if '🔴' in item['Status']]
-            if red_subs:
-                st.warning(f"⚠️ **Action Required:** {len(red_subs)} subcontractor(s) have expired or expiring documents!")
-                
-                with st.expander("View Details"):
-                    for item in red_subs:
-                        st.write(f"""
-                        - **{item['Subcontractor']}**
-                          - Document: {item['Document Type']}
-                          - Expiry: {item['Expiry Date']}
-                          - Days Remaining: {item['Days Remaining']}
-                        """)
+        else:
+            st.info("No documents uploaded for this project.")
+        
+        # Display warnings for RED status
+        if subs['red']:
+            st.warning(f"⚠️ **Action Required:** {subs['red']} subcontractor(s) have expired, expiring or missing documents!")
         
         # Export option
         st.divider()
         if st.button("📥 Export Compliance Report", use_container_width=False):
-            # Convert to CSV
-            csv = df.to_csv(index=False)
+            # The full document list is only fetched for the export
+            csv = build_compliance_report(project_id).to_csv(index=False)
             st.download_button(
                 label="Download CSV",
                 data=csv,
@@ -192,6 +215,25 @@ def display_compliance_dashboard(project_id: str):
         st.error(f"❌ Failed to load compliance data: {str(e)}")
 
 
+def wait_for_live_update(project_id: str):
+    """Block on the event stream and rerun the page when something relevant changes."""
+    with st.spinner("Listening for changes..."):
+        try:
+            for event in client.stream_events(types=['asset.moved', 'document.uploaded'], duration=60):
+                data = event.get('data', {})
+                # Uploads can affect any subcontractor on the project; moves matter when they
+                # bring assets to this project or take them away from it
+                moved_here = data.get('project_id') == project_id
+                moved_away = project_id in data.get('previous_project_ids', [])
+                if event['type'] in ('document.uploaded', 'resync') or moved_here or moved_away:
+                    st.rerun()
+        except APIError as e:
+            st.error(f"❌ Live updates unavailable: {e.message}")
+            return
+    # Nothing happened this round; listen again
+    st.rerun()
+
+
 def main():
     """Main page function."""
     st.title("🏗️ Project Hub Dashboard")
@@ -205,6 +247,10 @@ def main():
     
     st.divider()
     
+    if st.toggle("🗺️ All projects overview", help="RED/GREEN counts for every project at once"):
+        display_all_projects_overview()
+        st.divider()
+    
     # Project selector
     selected_project_id = display_project_selector()
     
@@ -212,6 +258,10 @@ def main():
         st.divider()
         # Display compliance dashboard
         display_compliance_dashboard(selected_project_id)
+        
+        st.divider()
+        if st.toggle("🔴 Live updates", help="Refresh automatically when documents are uploaded or assets move"):
+            wait_for_live_update(selected_project_id)
 
 
 if __name__ == "__main__":
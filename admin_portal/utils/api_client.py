@@ -3,7 +3,9 @@ API client utilities for communicating with the Flask backend.
 Provides request wrapper with JWT header injection, error handling, and response validation.
 """
 import requests
-from typing import Optional, Dict, Any, Union
+import json
+import time
+from typing import Optional, Dict, Any, Union, Iterator, List
 import streamlit as st
 from admin_portal.config import config
 import logging
@@ -223,6 +225,46 @@ class APIClient:
         """
         return self._make_request('DELETE', endpoint)
     
+    def stream_events(self, types: Optional[List[str]] = None, duration: float = 30) -> Iterator[Dict[str, Any]]:
+        """
+        Listen to the live event stream for a limited time.
+        
+        Args:
+            types: Event types to receive (default: all)
+            duration: Seconds to listen before returning
+            
+        Yields:
+            Event dicts with id, type, timestamp and data
+            
+        Raises:
+            APIError: If the stream cannot be opened
+        """
+        url = f"{self.base_url}/events/"
+        params = {'types': ','.join(types)} if types else None
+        deadline = time.monotonic() + duration
+        
+        try:
+            with requests.get(
+                url,
+                headers=self._get_headers(),
+                params=params,
+                stream=True,
+                timeout=(self.timeout, duration)
+            ) as response:
+                if not response.ok:
+                    self._handle_response(response)
+                
+                for line in response.iter_lines(decode_unicode=True):
+                    if line and line.startswith('data: '):
+                        yield json.loads(line[len('data: '):])
+                    if time.monotonic() >= deadline:
+                        return
+        except requests.exceptions.Timeout:
+            return
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Event stream failed: {str(e)}")
+            raise APIError(f"Event stream failed: {str(e)}")
+    
     def validate_token(self) -> bool:
         """
         Validate current JWT token by making a test request.
@@ -6,6 +6,17 @@ from api.routes.places import places_bp
 from api.routes.projects import projects_bp
 from api.routes.auth import auth_bp
 from api.routes.subcontractors import subcontractors_bp
+from api.routes.changes import changes_bp
+from api.routes.events import events_bp
+from api.routes.search import search_bp
+from api.routes.analytics import analytics_bp
+from api.routes.compliance import compliance_bp
+from api.middleware.query_counter import init_query_counter
+from api.middleware.metrics import init_metrics
+from api.middleware.idempotency import init_idempotency
+from database.db import engine, close_request_sessions, SessionLocal
+from services.event_bus import event_bus
+from services.idempotency_store import IdempotencyStore
 
 
 def create_app():
@@ -17,6 +28,23 @@ def create_app():
     
     # Initialize JWT
     jwt = JWTManager(app)
+    
+    # Return each request's database connections to the pool
+    app.teardown_appcontext(close_request_sessions)
+    
+    # Count SQL statements per request and flag N+1 loops
+    init_query_counter(app)
+    
+    # Latency, size, status and pool metrics on /metrics
+    if app.config["METRICS_ENABLED"]:
+        init_metrics(app, engine)
+    
+    # Replay stored responses to retried writes sent with an Idempotency-Key
+    init_idempotency(app, IdempotencyStore(
+        SessionLocal,
+        ttl=app.config["IDEMPOTENCY_TTL_SECONDS"],
+        lock_timeout=app.config["IDEMPOTENCY_LOCK_SECONDS"]
+    ))
 
     # Register blueprints
     app.register_blueprint(auth_bp, url_prefix="/api")
@@ -24,6 +52,15 @@ def create_app():
     app.register_blueprint(projects_bp, url_prefix="/api/projects")
     app.register_blueprint(places_bp, url_prefix="/api/places")
     app.register_blueprint(subcontractors_bp, url_prefix="/api/subcontractors")
+    app.register_blueprint(changes_bp, url_prefix="/api/changes")
+    app.register_blueprint(events_bp, url_prefix="/api/events")
+    app.register_blueprint(search_bp, url_prefix="/api/search")
+    app.register_blueprint(analytics_bp, url_prefix="/api/analytics")
+    app.register_blueprint(compliance_bp, url_prefix="/api/compliance")
+    
+    # Configure the live event bus
+    event_bus.buffer_size = app.config["EVENT_STREAM_BUFFER_SIZE"]
+    event_bus.max_subscribers = app.config["EVENT_STREAM_MAX_SUBSCRIBERS"]
 
     @app.get("/")
     def health():
@@ -7,11 +7,23 @@ from api.middleware.auth import (
     get_current_user_role,
     get_current_user_claims
 )
+from api.middleware.query_counter import (
+    init_query_counter,
+    count_queries,
+    fingerprint,
+    QueryStats,
+    NPlusOneError
+)
 
 __all__ = [
     'jwt_required_custom',
     'role_required',
     'get_current_user_id',
     'get_current_user_role',
-    'get_current_user_claims'
+    'get_current_user_claims',
+    'init_query_counter',
+    'count_queries',
+    'fingerprint',
+    'QueryStats',
+    'NPlusOneError'
 ]
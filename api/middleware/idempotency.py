@@ -0,0 +1,122 @@
+"""
+Idempotency-Key support for the Site-Steward API.
+A POST, PUT, PATCH or DELETE sent with an Idempotency-Key header runs at
+most once per key; retries get the original response back, so clients on
+unreliable connections can retry without duplicating writes.
+"""
+import hashlib
+
+from flask import g, request, jsonify, Response
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+
+from database.db import WRITE_METHODS, close_request_sessions
+from services.idempotency_store import IdempotencyKeyInUse, IdempotencyKeyMismatch
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+
+# Never stored: login responses carry tokens, and logging in twice is harmless
+EXEMPT_ENDPOINTS = {"auth.login"}
+
+
+def request_fingerprint():
+    """
+    SHA-256 of the request method, path, query string and body.
+
+    Multipart bodies are hashed by field and file content rather than as
+    raw bytes, since a client resending the same upload picks a new
+    multipart boundary.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{request.method} {request.path}?{request.query_string.decode('latin-1')}\n".encode("utf-8"))
+    if request.mimetype in ("multipart/form-data", "application/x-www-form-urlencoded"):
+        for name, value in sorted(request.form.items(multi=True)):
+            digest.update(f"{name}={value}\n".encode("utf-8"))
+        for name, file in sorted(request.files.items(multi=True), key=lambda item: (item[0], item[1].filename)):
+            digest.update(f"{name}:{file.filename}\n".encode("utf-8"))
+            digest.update(file.stream.read())
+            file.stream.seek(0)
+    else:
+        digest.update(request.get_data(cache=True))
+    return digest.hexdigest()
+
+
+def scoped_key(client_key):
+    """
+    Key under which a request's response is stored.
+
+    Scoped by user, method and path, so the same client key sent by
+    another user or to another endpoint never replays this response.
+    """
+    try:
+        verify_jwt_in_request(optional=True)
+        identity = get_jwt_identity() or ""
+    except Exception:
+        # The route itself rejects the token
+        identity = ""
+    return hashlib.sha256(f"{identity}\n{request.method}\n{request.path}\n{client_key}".encode("utf-8")).hexdigest()
+
+
+def init_idempotency(app, store):
+    """
+    Honour the Idempotency-Key header on every mutating route of a Flask app.
+
+    The key is reserved before the route runs and the route's response
+    stored after it; a retry with the same key and body gets that
+    response with an Idempotent-Replayed: true header. A retry while the
+    original is still running gets 409 Conflict, and a key reused with a
+    different body gets 422. Server errors (5xx) are not stored, so the
+    request can be retried.
+
+    Args:
+        app: Flask app
+        store: IdempotencyStore
+    """
+    @app.before_request
+    def _check_idempotency_key():
+        client_key = request.headers.get(HEADER)
+        if client_key is None or request.method not in WRITE_METHODS or request.endpoint in EXEMPT_ENDPOINTS:
+            return None
+        if not 0 < len(client_key) <= MAX_KEY_LENGTH:
+            return jsonify({
+                "error": "Bad Request",
+                "message": f"{HEADER} must be 1 to {MAX_KEY_LENGTH} characters"
+            }), 400
+
+        key = scoped_key(client_key)
+        try:
+            stored = store.begin(key, request_fingerprint())
+        except IdempotencyKeyMismatch as e:
+            return jsonify({
+                "error": "Unprocessable Entity",
+                "message": str(e)
+            }), 422
+        except IdempotencyKeyInUse as e:
+            response = jsonify({
+                "error": "Conflict",
+                "message": str(e)
+            })
+            response.status_code = 409
+            response.headers["Retry-After"] = "1"
+            return response
+
+        if stored is not None:
+            response = Response(stored.body, status=stored.status_code, content_type=stored.content_type)
+            response.headers["Idempotent-Replayed"] = "true"
+            return response
+        g.idempotency_key = key
+        return None
+
+    @app.after_request
+    def _store_idempotent_response(response):
+        key = g.pop("idempotency_key", None)
+        if key is None:
+            return response
+
+        # End the route's transactions first: on SQLite they may hold the write lock
+        close_request_sessions()
+        if response.status_code >= 500 or response.is_streamed:
+            store.release(key)
+        else:
+            store.finish(key, response.status_code, response.content_type, response.get_data())
+        return response
@@ -0,0 +1,113 @@
+"""
+Request metrics for the Site-Steward API.
+Records per-endpoint latency, request/response sizes, status codes and
+in-flight requests, exposes SQLAlchemy pool gauges and serves everything
+on /metrics in the Prometheus text format.
+"""
+import time
+
+from flask import g, request, Response
+
+from services.metrics import metrics, SIZE_BUCKETS
+
+REQUEST_LATENCY = metrics.histogram(
+    "http_request_duration_seconds",
+    "Request latency by blueprint and endpoint.",
+    ("blueprint", "endpoint", "method")
+)
+REQUEST_SIZE = metrics.histogram(
+    "http_request_size_bytes",
+    "Request body size by endpoint.",
+    ("endpoint",),
+    buckets=SIZE_BUCKETS
+)
+RESPONSE_SIZE = metrics.histogram(
+    "http_response_size_bytes",
+    "Response body size by endpoint (streamed responses are not counted).",
+    ("endpoint",),
+    buckets=SIZE_BUCKETS
+)
+RESPONSES = metrics.counter(
+    "http_responses_total",
+    "Responses by endpoint and status code.",
+    ("endpoint", "method", "status")
+)
+REQUESTS_STARTED = metrics.counter(
+    "http_requests_started_total",
+    "Requests that reached the app."
+)
+REQUESTS_FINISHED = metrics.counter(
+    "http_requests_finished_total",
+    "Requests that finished, successfully or not."
+)
+
+
+def _in_flight():
+    started = sum(value for _, _, value in REQUESTS_STARTED.samples())
+    finished = sum(value for _, _, value in REQUESTS_FINISHED.samples())
+    return [((), started - finished)]
+
+
+def _pool_stats(engine):
+    pool = engine.pool
+    stats = []
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        reader = getattr(pool, name, None)
+        if callable(reader):
+            stats.append(((name,), reader()))
+    return stats
+
+
+def _endpoint_labels():
+    endpoint = request.endpoint or "unmatched"
+    return request.blueprint or "", endpoint
+
+
+def init_metrics(app, engine=None):
+    """
+    Instrument a Flask app and add the /metrics route.
+
+    Args:
+        app: Flask application
+        engine: SQLAlchemy engine whose connection pool is reported
+    """
+    metrics.gauge_callback(
+        "http_requests_in_flight",
+        "Requests currently being handled.",
+        _in_flight
+    )
+    if engine is not None:
+        metrics.gauge_callback(
+            "db_pool_connections",
+            "SQLAlchemy pool connections by state (size, checkedin, checkedout, overflow).",
+            lambda: _pool_stats(engine),
+            ("state",)
+        )
+
+    @app.before_request
+    def _start_request_timer():
+        g.metrics_start = time.perf_counter()
+        REQUESTS_STARTED.inc()
+        if request.content_length:
+            REQUEST_SIZE.observe(request.content_length, (_endpoint_labels()[1],))
+
+    @app.after_request
+    def _record_response(response):
+        _, endpoint = _endpoint_labels()
+        RESPONSES.inc((endpoint, request.method, str(response.status_code)))
+        if not response.is_streamed:
+            RESPONSE_SIZE.observe(response.calculate_content_length() or 0, (endpoint,))
+        return response
+
+    @app.teardown_request
+    def _stop_request_timer(exc):
+        start = g.pop("metrics_start", None)
+        if start is None:
+            return
+        blueprint, endpoint = _endpoint_labels()
+        REQUEST_LATENCY.observe(time.perf_counter() - start, (blueprint, endpoint, request.method))
+        REQUESTS_FINISHED.inc()
+
+    @app.get("/metrics")
+    def prometheus_metrics():
+        return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
@@ -0,0 +1,146 @@
+"""
+SQL query instrumentation for the Site-Steward API.
+Counts statements and database time per request from SQLAlchemy engine
+events and flags statements repeated often enough to suggest an N+1 loop.
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+_current_stats = ContextVar("db_query_stats", default=None)
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\bIN\s*\((?:\s*(?:\?|%\(\w+\)s|%s|:\w+)\s*,?)+\)", re.IGNORECASE)
+_SPACE_RE = re.compile(r"\s+")
+
+
+class NPlusOneError(Exception):
+    """Raised in strict mode when a request repeats a statement too often."""
+
+
+def fingerprint(statement):
+    """
+    Normalise a SQL statement so repeats with different values compare equal.
+
+    Literals become "?", IN lists collapse to "IN (...)" and whitespace is
+    squeezed, e.g. "SELECT ... WHERE id = 'a1'" and "... id = 'b2'" match.
+    """
+    statement = _STRING_RE.sub("?", statement)
+    statement = _NUMBER_RE.sub("?", statement)
+    statement = _IN_LIST_RE.sub("IN (...)", statement)
+    return _SPACE_RE.sub(" ", statement).strip()
+
+
+class QueryStats:
+    """Statements executed within one request (or count_queries block)."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.fingerprints = Counter()
+
+    def record(self, statement, elapsed):
+        self.count += 1
+        self.total_time += elapsed
+        self.fingerprints[fingerprint(statement)] += 1
+
+    def repeated(self, threshold):
+        """Fingerprints run more than threshold times, most frequent first."""
+        return [(fp, n) for fp, n in self.fingerprints.most_common() if n > threshold]
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None:
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is None:
+        return
+    starts = conn.info.get("query_start_time")
+    if starts:
+        stats.record(statement, time.perf_counter() - starts.pop())
+
+
+@contextmanager
+def count_queries():
+    """
+    Count the statements run inside a block, on any engine.
+
+    Usage:
+        with count_queries() as stats:
+            client.get('/api/assets/')
+        assert stats.count <= 3
+    """
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def init_query_counter(app):
+    """
+    Instrument every request of a Flask app.
+
+    Adds X-DB-Queries and X-DB-Time (milliseconds) response headers and
+    logs a warning for each statement fingerprint run more than
+    DB_QUERY_REPEAT_THRESHOLD times in one request. With DB_QUERY_STRICT
+    enabled the request fails with NPlusOneError instead, so the test
+    suite catches new N+1 loops.
+    """
+    threshold = app.config.get("DB_QUERY_REPEAT_THRESHOLD", 10)
+    strict = app.config.get("DB_QUERY_STRICT", False)
+
+    @app.before_request
+    def _start_query_count():
+        g.db_query_stats = QueryStats()
+        g.db_query_token = _current_stats.set(g.db_query_stats)
+
+    @app.after_request
+    def _report_query_count(response):
+        stats = g.get("db_query_stats")
+        if stats is None:
+            return response
+
+        response.headers["X-DB-Queries"] = str(stats.count)
+        response.headers["X-DB-Time"] = f"{stats.total_time * 1000:.2f}"
+
+        repeated = stats.repeated(threshold)
+        for statement, n in repeated:
+            logger.warning(
+                "Possible N+1 in %s %s: statement ran %d times: %s",
+                request.method, request.path, n, statement
+            )
+        if strict and repeated:
+            statement, n = repeated[0]
+            raise NPlusOneError(
+                f"{request.method} {request.path} ran the same statement {n} times: {statement}"
+            )
+
+        return response
+
+    @app.teardown_request
+    def _stop_query_count(exc):
+        token = g.pop("db_query_token", None)
+        if token is not None:
+            try:
+                _current_stats.reset(token)
+            except ValueError:
+                # Teardown ran in a different context (e.g. a copied one)
+                _current_stats.set(None)
+
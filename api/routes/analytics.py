@@ -0,0 +1,114 @@
+"""
+Analytics routes for the Site-Steward API.
+Aggregates over asset movement history.
+"""
+from datetime import datetime, timedelta
+
+from flask import Blueprint, request, jsonify
+from database.db import get_db
+from services.utilization_service import utilization_service, PERIODS, GROUP_KEYS
+from api.middleware.auth import jwt_required_custom
+from api.utils import parse_timestamp
+
+analytics_bp = Blueprint("analytics", __name__)
+
+DEFAULT_DAYS = 90
+
+
+@analytics_bp.route("/utilization", methods=["GET"])
+@jwt_required_custom()
+def get_utilization():
+    """
+    Asset-days consumed by project, category and period.
+    
+    An asset counts towards a project from the time it is moved there until
+    its next move. Archived history is included.
+    
+    Query parameters:
+        start: ISO date/datetime, inclusive (default: 90 days before end)
+        end: ISO date/datetime, exclusive (default: now)
+        period: day, week, month or quarter (default: month)
+        group_by: Comma-separated subset of project, category, period (default: all)
+        project_id: Only count time at this project
+        category: Only count assets in this category
+    
+    Response:
+        {
+            "start": "2024-01-01T00:00:00",
+            "end": "2024-04-01T00:00:00",
+            "period": "month",
+            "group_by": ["project", "category", "period"],
+            "total_asset_days": 1234.5,
+            "utilization": [
+                {
+                    "project_id": "project_id",
+                    "project_name": "Downtown Office Complex",
+                    "category": "Heavy Equipment",
+                    "period": "2024-01-01",
+                    "asset_days": 62.0
+                }
+            ]
+        }
+    """
+    try:
+        try:
+            end = parse_timestamp(request.args["end"]) if request.args.get("end") else datetime.utcnow()
+            start = parse_timestamp(request.args["start"]) if request.args.get("start") else end - timedelta(days=DEFAULT_DAYS)
+        except ValueError:
+            return jsonify({
+                "error": "Bad Request",
+                "message": "start and end must be ISO 8601 dates"
+            }), 400
+        
+        if start >= end:
+            return jsonify({
+                "error": "Bad Request",
+                "message": "start must be before end"
+            }), 400
+        
+        period = request.args.get("period", "month")
+        if period not in PERIODS:
+            return jsonify({
+                "error": "Bad Request",
+                "message": f"period must be one of: {', '.join(PERIODS)}"
+            }), 400
+        
+        group_by = list(GROUP_KEYS)
+        if request.args.get("group_by") is not None:
+            group_by = [k.strip() for k in request.args["group_by"].split(",") if k.strip()]
+            unknown = set(group_by) - set(GROUP_KEYS)
+            if unknown:
+                return jsonify({
+                    "error": "Bad Request",
+                    "message": f"Unknown group_by keys: {', '.join(sorted(unknown))}"
+                }), 400
+        
+        db = next(get_db())
+        try:
+            rows = utilization_service.utilization(
+                db, start, end,
+                period=period,
+                group_by=group_by,
+                project_id=request.args.get("project_id"),
+                category=request.args.get("category")
+            )
+        except ValueError as e:
+            return jsonify({
+                "error": "Bad Request",
+                "message": str(e)
+            }), 400
+        
+        return jsonify({
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "period": period,
+            "group_by": [k for k in GROUP_KEYS if k in group_by],
+            "total_asset_days": round(sum(r["asset_days"] for r in rows), 2),
+            "utilization": rows
+        }), 200
+    
+    except Exception as e:
+        return jsonify({
+            "error": "Internal Server Error",
+            "message": str(e)
+        }), 500
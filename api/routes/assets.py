@@ -4,14 +4,138 @@ Handles asset CRUD operations and movement tracking.
 """
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import func, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
 from database.db import get_db
-from database.models import AssetORM, ProjectORM, AssetHistoryORM
+from database.models import AssetORM, ProjectORM, AssetHistoryORM, SyncKeyORM
 from api.middleware.auth import jwt_required_custom
+from api.utils import parse_timestamp
+from services.asset_moves import MoveConflict, current_state, move_assets, stale_assets, swap_locations
+from services.event_bus import event_bus
+from services.history_store import history_store
+from services.location_service import location_service
+import gzip
+import json
 import uuid
 from datetime import datetime
 
 assets_bp = Blueprint("assets", __name__)
 
+# Upper bound on assets accepted by a single bulk move request
+MAX_BULK_MOVE = 500
+
+# Upper bound on queued moves accepted by a single sync request
+MAX_SYNC_BATCH = 500
+
+# Attempts at applying a sync batch while other moves change its assets
+SYNC_ATTEMPTS = 3
+
+
+def _get_json_body():
+    """Parse the JSON request body, accepting gzip-compressed payloads."""
+    if request.headers.get("Content-Encoding", "").lower() == "gzip":
+        try:
+            return json.loads(gzip.decompress(request.get_data()))
+        except (OSError, ValueError):
+            return None
+    return request.get_json(silent=True)
+
+
+def _apply_sync(db, valid_moves, user_id):
+    """
+    Record synced moves and move each asset to its newest location.
+    
+    Asset locations are set with one compare-and-swap UPDATE on the
+    versions read here, so a move made by someone else meanwhile is not
+    overwritten with a location decided from stale history. The keys
+    go into sync_keys before the history rows; if a concurrent replay
+    of the same queue recorded one of them first, the insert fails and
+    the retry reports those moves as duplicates.
+    
+    Returns:
+        (dict of idempotency key -> (status, message), list of asset IDs
+        that changed meanwhile, dict of asset_id -> project_id it was
+        moved away from). When the list is not empty nothing was written
+        and the caller should try again.
+    """
+    results = {}
+    keys = [m["key"] for m in valid_moves]
+    asset_ids = {m["asset_id"] for m in valid_moves}
+    project_ids = {m["project_id"] for m in valid_moves}
+    
+    existing_keys = {
+        row[0] for row in
+        db.query(SyncKeyORM.key).filter(SyncKeyORM.key.in_(keys)).all()
+    } if keys else set()
+    current = db.query(AssetORM.id, AssetORM.version, AssetORM.project_id).filter(
+        AssetORM.id.in_(asset_ids)
+    ).all() if asset_ids else []
+    versions = {row.id: row.version for row in current}
+    known_projects = {
+        row[0] for row in
+        db.query(ProjectORM.id).filter(ProjectORM.id.in_(project_ids)).all()
+    } if project_ids else set()
+    latest_moves = dict(
+        db.query(AssetHistoryORM.asset_id, func.max(AssetHistoryORM.moved_at))
+        .filter(AssetHistoryORM.asset_id.in_(asset_ids))
+        .group_by(AssetHistoryORM.asset_id)
+        .all()
+    ) if asset_ids else {}
+    
+    # Conflicts between devices are resolved by when the scan happened
+    locations = {}
+    recorded = []
+    for move in sorted(valid_moves, key=lambda m: m["moved_at"]):
+        key = move["key"]
+        if key in existing_keys:
+            results[key] = ("duplicate", None)
+            continue
+        asset_id = move["asset_id"]
+        if asset_id not in versions:
+            results[key] = ("rejected", f"Asset with ID {asset_id} not found")
+            continue
+        if move["project_id"] not in known_projects:
+            results[key] = ("rejected", f"Project with ID {move['project_id']} not found")
+            continue
+        
+        recorded.append(move)
+        
+        latest = latest_moves.get(asset_id)
+        if latest is None or move["moved_at"] >= latest:
+            locations[asset_id] = move["project_id"]
+            latest_moves[asset_id] = move["moved_at"]
+            results[key] = ("applied", None)
+        else:
+            results[key] = ("superseded", None)
+    
+    if recorded:
+        try:
+            db.execute(insert(SyncKeyORM), [
+                {"key": move["key"], "asset_id": move["asset_id"], "synced_at": datetime.utcnow()}
+                for move in recorded
+            ])
+        except IntegrityError:
+            db.rollback()
+            return results, sorted({move["asset_id"] for move in recorded}), {}
+        db.add_all(AssetHistoryORM(
+            id=move["key"],
+            asset_id=move["asset_id"],
+            project_id=move["project_id"],
+            moved_by=user_id,
+            moved_at=move["moved_at"]
+        ) for move in recorded)
+    
+    expected = {asset_id: versions[asset_id] for asset_id in locations}
+    if not swap_locations(db, expected, locations):
+        db.rollback()
+        return results, stale_assets(db, expected) or sorted(expected), {}
+    
+    db.commit()
+    # The swap matched the versions read above, so these are the locations it replaced
+    previous = {row.id: row.project_id for row in current if row.id in locations}
+    return results, [], previous
+
 
 @assets_bp.route("/", methods=["GET"])
 @jwt_required_custom()
@@ -26,7 +150,8 @@ def list_assets():
                 "name": "Asset Name",
                 "category": "Category",
                 "project_id": "project_id" or null,
-                "project_name": "Project Name" or null
+                "project_name": "Project Name" or null,
+                "version": 1
             }
         ]
     
@@ -36,7 +161,7 @@ def list_assets():
         db = next(get_db())
         
         # Query all assets with their project information
-        assets = db.query(AssetORM).all()
+        assets = db.query(AssetORM).options(joinedload(AssetORM.project)).all()
         
         result = []
         for asset in assets:
@@ -45,7 +170,8 @@ def list_assets():
                 "name": asset.name,
                 "category": asset.category,
                 "project_id": asset.project_id,
-                "project_name": asset.project.name if asset.project else None
+                "project_name": asset.project.name if asset.project else None,
+                "version": asset.version
             }
             result.append(asset_data)
         
@@ -75,6 +201,7 @@ def create_asset():
             "id": "asset_id",
             "name": "Asset Name",
             "category": "Category",
+            "version": 1,
             "qr_code_url": null
         }
     
@@ -107,17 +234,25 @@ def create_asset():
             id=asset_id,
             name=name,
             category=category,
-            project_id=None
+            project_id=None,
+            version=1
         )
         
         db.add(new_asset)
         db.commit()
         db.refresh(new_asset)
         
+        event_bus.publish("asset.created", {
+            "id": new_asset.id,
+            "name": new_asset.name,
+            "category": new_asset.category
+        })
+        
         return jsonify({
             "id": new_asset.id,
             "name": new_asset.name,
             "category": new_asset.category,
+            "version": new_asset.version,
             "qr_code_url": None  # QR code generation handled by frontend
         }), 201
         
@@ -128,6 +263,265 @@ def create_asset():
         }), 500
 
 
+@assets_bp.route("/move", methods=["POST"])
+@jwt_required_custom()
+def bulk_move_assets():
+    """
+    Move several assets to the same project in a single transaction.
+    Used by the field app's bulk scan mode.
+    
+    versions optionally maps asset IDs to the versions the client saw,
+    as in POST /api/assets/{asset_id}/move. If any asset was moved by
+    someone else meanwhile, none is moved and the response is 409
+    Conflict with the current state of the changed assets.
+    
+    Request body:
+        {
+            "asset_ids": ["asset_id", ...],
+            "project_id": "project_id",
+            "versions": {"asset_id": 3}
+        }
+    
+    Response:
+        {
+            "success": true,
+            "moved": 2,
+            "message": "2 asset(s) moved successfully",
+            "versions": {"asset_id": 4, "asset_id_2": 2}
+        }
+    """
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({
+                "error": "Bad Request",
+                "message": "Request body is required"
+            }), 400
+        
+        asset_ids = data.get("asset_ids")
+        project_id = data.get("project_id")
+        versions = data.get("versions") or {}
+        
+        if not project_id:
+            return jsonify({
+                "error": "Bad Request",
+                "message": "project_id is required"
+            }), 400
+        
+        if not isinstance(asset_ids, list) or not asset_ids:
+            return jsonify({
+                "error": "Bad Request",
+                "message": "asset_ids must be a non-empty list"
+            }), 400
+        
+        if not isinstance(versions, dict) or not all(
+            isinstance(v, int) and not isinstance(v, bool) for v in versions.values()
+        ):
+            return jsonify({
+                "error": "Bad Request",
+                "message": "versions must map asset IDs to integers"
+            }), 400
+        
+        # Drop duplicate scans while keeping the scan order
+        asset_ids = list(dict.fromkeys(str(a) for a in asset_ids))
+        
+        if len(asset_ids) > MAX_BULK_MOVE:
+            return jsonify({
+                "error": "Bad Request",
+                "message": f"At most {MAX_BULK_MOVE} assets can be moved at once"
+            }), 400
+        
+        db = next(get_db())
+        
+        # Verify project exists
+        project = db.query(ProjectORM).filter(ProjectORM.id == project_id).first()
+        if not project:
+            return jsonify({
+                "error": "Not Found",
+                "message": f"Project with ID {project_id} not found"
+            }), 404
+        
+        # Load every asset in one query
+        assets = db.query(AssetORM).filter(AssetORM.id.in_(asset_ids)).all()
+        found_ids = {asset.id for asset in assets}
+        missing_ids = [a for a in asset_ids if a not in found_ids]
+        if missing_ids:
+            return jsonify({
+                "error": "Not Found",
+                "message": f"{len(missing_ids)} asset(s) not found",
+                "missing_ids": missing_ids
+            }), 404
+        
+        user_id = get_jwt_identity()
+        expected = {asset.id: versions.get(asset.id, asset.version) for asset in assets}
+        # Read before the move: its commit expires the assets, and reloading costs a query each
+        previous_project_ids = sorted({asset.project_id for asset in assets if asset.project_id})
+        
+        try:
+            new_versions = move_assets(db, expected, project_id, user_id)
+        except MoveConflict as conflict:
+            return jsonify({
+                "error": "Conflict",
+                "message": f"{len(conflict.assets)} asset(s) were moved by someone else; nothing was moved",
+                "assets": conflict.assets
+            }), 409
+        
+        event_bus.publish("asset.moved", {
+            "asset_ids": list(expected),
+            "project_id": project_id,
+            "previous_project_ids": previous_project_ids,
+            "moved_by": user_id
+        })
+        
+        return jsonify({
+            "success": True,
+            "moved": len(assets),
+            "message": f"{len(assets)} asset(s) moved successfully",
+            "versions": new_versions
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            "error": "Internal Server Error",
+            "message": str(e)
+        }), 500
+
+
+@assets_bp.route("/sync", methods=["POST"])
+@jwt_required_custom()
+def sync_moves():
+    """
+    Replay a batch of moves queued offline by the field app.
+    
+    Each move carries the client timestamp of the scan and an idempotency
+    key, which becomes the history record ID so replays are harmless.
+    Moves are applied in moved_at order and the asset location only follows
+    a move that is newer than the asset's latest recorded move. If other
+    moves keep changing the same assets while the batch is applied, the
+    response is 409 Conflict and nothing is recorded. The body may be
+    sent gzip-compressed (Content-Encoding: gzip).
+    
+    Request body:
+        {
+            "moves": [
+                {
+                    "idempotency_key": "uuid",
+                    "asset_id": "asset_id",
+                    "project_id": "project_id",
+                    "moved_at": "2024-01-01T12:00:00Z"
+                }
+            ]
+        }
+    
+    Response:
+        {
+            "results": [
+                {
+                    "idempotency_key": "uuid",
+                    "status": "applied" | "superseded" | "duplicate" | "rejected",
+                    "message": "Reason when rejected"
+                }
+            ]
+        }
+    """
+    try:
+        data = _get_json_body()
+        
+        if not data:
+            return jsonify({
+                "error": "Bad Request",
+                "message": "Request body is required"
+            }), 400
+        
+        moves = data.get("moves")
+        
+        if not isinstance(moves, list) or not moves:
+            return jsonify({
+                "error": "Bad Request",
+                "message": "moves must be a non-empty list"
+            }), 400
+        
+        if len(moves) > MAX_SYNC_BATCH:
+            return jsonify({
+                "error": "Bad Request",
+                "message": f"At most {MAX_SYNC_BATCH} moves can be synced at once"
+            }), 400
+        
+        results = {}
+        valid_moves = []
+        order = []
+        seen = set()
+        
+        for move in moves:
+            key = move.get("idempotency_key") if isinstance(move, dict) else None
+            if not key:
+                continue
+            key = str(key)
+            # Keys repeated inside the batch are only applied once
+            if key in seen:
+                continue
+            seen.add(key)
+            order.append(key)
+            try:
+                moved_at = parse_timestamp(move["moved_at"])
+                asset_id = str(move["asset_id"])
+                project_id = str(move["project_id"])
+            except (KeyError, TypeError, ValueError):
+                results[key] = ("rejected", "asset_id, project_id and ISO moved_at are required")
+                continue
+            valid_moves.append({
+                "key": key,
+                "asset_id": asset_id,
+                "project_id": project_id,
+                "moved_at": moved_at
+            })
+        
+        db = next(get_db())
+        user_id = get_jwt_identity()
+        
+        for _ in range(SYNC_ATTEMPTS):
+            synced, conflicted, previous = _apply_sync(db, valid_moves, user_id)
+            if not conflicted:
+                break
+        else:
+            return jsonify({
+                "error": "Conflict",
+                "message": "Assets kept being moved while syncing; retry the sync",
+                "assets": current_state(db, conflicted)
+            }), 409
+        results.update(synced)
+        
+        # Only moves that changed a location are news to live dashboards
+        applied_by_project = {}
+        for move in valid_moves:
+            if results[move["key"]][0] == "applied":
+                applied_by_project.setdefault(move["project_id"], []).append(move["asset_id"])
+        for project_id, moved_ids in applied_by_project.items():
+            event_bus.publish("asset.moved", {
+                "asset_ids": moved_ids,
+                "project_id": project_id,
+                "previous_project_ids": sorted({previous[a] for a in moved_ids if previous.get(a)}),
+                "moved_by": user_id
+            })
+        
+        response = []
+        for key in order:
+            status, message = results[key]
+            entry = {"idempotency_key": key, "status": status}
+            if message:
+                entry["message"] = message
+            response.append(entry)
+        
+        return jsonify({"results": response}), 200
+        
+    except Exception as e:
+        return jsonify({
+            "error": "Internal Server Error",
+            "message": str(e)
+        }), 500
+
+
 @assets_bp.route("/<asset_id>", methods=["GET"])
 @jwt_required_custom()
 def get_asset_details(asset_id):
@@ -141,6 +535,7 @@ def get_asset_details(asset_id):
             "category": "Category",
             "project_id": "project_id" or null,
             "project_name": "Project Name" or null,
+            "version": 3,
             "history": [
                 {
                     "id": "history_id",
@@ -166,19 +561,21 @@ def get_asset_details(asset_id):
                 "message": f"Asset with ID {asset_id} not found"
             }), 404
         
-        # Get asset history
-        history_records = db.query(AssetHistoryORM).filter(
-            AssetHistoryORM.asset_id == asset_id
-        ).order_by(AssetHistoryORM.moved_at.desc()).all()
+        # Get asset history, hot and archived
+        history_records = history_store.asset_history(db, asset_id)
+        project_ids = {r["project_id"] for r in history_records if r["project_id"]}
+        project_names = dict(
+            db.query(ProjectORM.id, ProjectORM.name).filter(ProjectORM.id.in_(project_ids)).all()
+        ) if project_ids else {}
         
         history = []
         for record in history_records:
             history.append({
-                "id": record.id,
-                "project_id": record.project_id,
-                "project_name": record.project.name if record.project else None,
-                "moved_at": record.moved_at.isoformat() if record.moved_at else None,
-                "moved_by": record.moved_by
+                "id": record["id"],
+                "project_id": record["project_id"],
+                "project_name": project_names.get(record["project_id"]),
+                "moved_at": record["moved_at"].isoformat() if record["moved_at"] else None,
+                "moved_by": record["moved_by"]
             })
         
         result = {
@@ -187,6 +584,7 @@ def get_asset_details(asset_id):
             "category": asset.category,
             "project_id": asset.project_id,
             "project_name": asset.project.name if asset.project else None,
+            "version": asset.version,
             "history": history
         }
         
@@ -199,21 +597,92 @@ def get_asset_details(asset_id):
         }), 500
 
 
+@assets_bp.route("/<asset_id>/location", methods=["GET"])
+@jwt_required_custom()
+def get_asset_location(asset_id):
+    """
+    Get the project an asset was at on a given date and time.
+    
+    Query parameters:
+        at: ISO-8601 timestamp (default: now)
+    
+    Response:
+        {
+            "asset_id": "asset_id",
+            "at": "2024-03-01T09:00:00",
+            "project_id": "project_id" or null,
+            "project_name": "Project Name" or null,
+            "since": "2024-02-12T14:30:00" or null,
+            "until": "2024-03-20T08:15:00" or null
+        }
+    
+    since is the move that put the asset there (null if no move was
+    recorded by then) and until the next move (null if it is still there).
+    """
+    try:
+        try:
+            at = parse_timestamp(request.args["at"]) if request.args.get("at") else datetime.utcnow()
+        except ValueError:
+            return jsonify({
+                "error": "Bad Request",
+                "message": "at must be an ISO-8601 timestamp"
+            }), 400
+        
+        db = next(get_db())
+        
+        asset = db.query(AssetORM.id).filter(AssetORM.id == asset_id).first()
+        if not asset:
+            return jsonify({
+                "error": "Not Found",
+                "message": f"Asset with ID {asset_id} not found"
+            }), 404
+        
+        location = location_service.location_at(db, asset_id, at) or {
+            "project_id": None, "since": None, "until": None
+        }
+        project_name = None
+        if location["project_id"]:
+            project_name = db.query(ProjectORM.name).filter(ProjectORM.id == location["project_id"]).scalar()
+        
+        return jsonify({
+            "asset_id": asset_id,
+            "at": at.isoformat(),
+            "project_id": location["project_id"],
+            "project_name": project_name,
+            "since": location["since"].isoformat() if location["since"] else None,
+            "until": location["until"].isoformat() if location["until"] else None
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            "error": "Internal Server Error",
+            "message": str(e)
+        }), 500
+
+
 @assets_bp.route("/<asset_id>/move", methods=["POST"])
 @jwt_required_custom()
 def move_asset(asset_id):
     """
     Move an asset to a different project.
     
+    Send the version from GET /api/assets/{asset_id} to move the asset
+    only if nobody has moved it since it was scanned. Without it the move
+    is based on the asset as this request finds it. Either way, a move
+    racing another move of the same asset gets 409 Conflict with the
+    asset's current state instead of overwriting it.
+    
     Request body:
         {
-            "project_id": "project_id"
+            "project_id": "project_id",
+            "version": 3
         }
     
     Response:
         {
             "success": true,
-            "message": "Asset moved successfully"
+            "message": "Asset moved successfully",
+            "version": 4
         }
     
     Requirements: 2.4, 2.5
@@ -228,6 +697,7 @@ def move_asset(asset_id):
             }), 400
         
         project_id = data.get("project_id")
+        version = data.get("version")
         
         if not project_id:
             return jsonify({
@@ -235,6 +705,12 @@ def move_asset(asset_id):
                 "message": "project_id is required"
             }), 400
         
+        if version is not None and (not isinstance(version, int) or isinstance(version, bool)):
+            return jsonify({
+                "error": "Bad Request",
+                "message": "version must be an integer"
+            }), 400
+        
         db = next(get_db())
         
         # Verify asset exists
@@ -256,25 +732,29 @@ def move_asset(asset_id):
         # Get current user ID from JWT
         user_id = get_jwt_identity()
         
-        # Create history record before updating asset
-        history_id = str(uuid.uuid4())
-        history_record = AssetHistoryORM(
-            id=history_id,
-            asset_id=asset_id,
-            project_id=project_id,
-            moved_by=user_id,
-            moved_at=datetime.utcnow()
-        )
-        
-        # Update asset location
-        asset.project_id = project_id
+        expected = version if version is not None else asset.version
+        previous_project_id = asset.project_id
+        try:
+            versions = move_assets(db, {asset_id: expected}, project_id, user_id)
+        except MoveConflict as conflict:
+            current = conflict.assets[0] if conflict.assets else None
+            return jsonify({
+                "error": "Conflict",
+                "message": f"Asset was moved by someone else since version {expected}",
+                "asset": current
+            }), 409
         
-        db.add(history_record)
-        db.commit()
+        event_bus.publish("asset.moved", {
+            "asset_ids": [asset_id],
+            "project_id": project_id,
+            "previous_project_ids": [previous_project_id] if previous_project_id else [],
+            "moved_by": user_id
+        })
         
         return jsonify({
             "success": True,
-            "message": "Asset moved successfully"
+            "message": "Asset moved successfully",
+            "version": versions[asset_id]
         }), 200
         
     except Exception as e:
@@ -7,9 +7,18 @@ from flask_jwt_extended import create_access_token
 import bcrypt
 from database.db import get_db
 from database.models import UserORM
+from services.metrics import metrics
 
 auth_bp = Blueprint('auth', __name__)
 
+# bcrypt is deliberately slow and dominates login latency
+BCRYPT_SECONDS = metrics.histogram(
+    "bcrypt_duration_seconds",
+    "Time spent hashing or checking passwords with bcrypt.",
+    ("operation",),
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 1.0, 2.0, 5.0)
+)
+
 
 @auth_bp.route('/login', methods=['POST'])
 def login():
@@ -65,7 +74,7 @@ def login():
             }), 401
         
         # Verify password using bcrypt
-        if not bcrypt.checkpw(password.encode('utf-8'), user.password_hash.encode('utf-8')):
+        if not verify_password(password, user.password_hash):
             return jsonify({
                 'error': 'Unauthorized',
                 'message': 'Invalid credentials'
@@ -106,8 +115,9 @@ def hash_password(password: str) -> str:
     Returns:
         Hashed password string
     """
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
+    with BCRYPT_SECONDS.time(("hashpw",)):
+        salt = bcrypt.gensalt()
+        hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
 
@@ -122,4 +132,5 @@ def verify_password(password: str, password_hash: str) -> bool:
     Returns:
         True if password matches, False otherwise
     """
-    return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+    with BCRYPT_SECONDS.time(("checkpw",)):
+        return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
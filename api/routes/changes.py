@@ -0,0 +1,148 @@
+"""
+Change feed routes for the Site-Steward API.
+Lets clients stay current by fetching only what changed since their last cursor.
+"""
+from flask import Blueprint, request, jsonify
+from database.db import get_db
+from database.models import (
+    ChangeLogORM, AssetORM, ProjectORM, SubcontractorORM,
+    ComplianceDocumentORM, AssetHistoryORM
+)
+from api.middleware.auth import jwt_required_custom
+
+changes_bp = Blueprint("changes", __name__)
+
+DEFAULT_LIMIT = 500
+MAX_LIMIT = 5000
+
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+
+# Entity name -> (ORM class, serializer for the current row)
+ENTITY_SERIALIZERS = {
+    "asset": (AssetORM, lambda a: {
+        "id": a.id,
+        "name": a.name,
+        "category": a.category,
+        "project_id": a.project_id,
+        "updated_at": _isoformat(a.updated_at)
+    }),
+    "project": (ProjectORM, lambda p: {
+        "id": p.id,
+        "name": p.name,
+        "location": p.location
+    }),
+    "subcontractor": (SubcontractorORM, lambda s: {
+        "id": s.id,
+        "name": s.name,
+        "email": s.email,
+        "phone": s.phone
+    }),
+    "document": (ComplianceDocumentORM, lambda d: {
+        "id": d.id,
+        "subcontractor_id": d.subcontractor_id,
+        "document_type": d.document_type,
+        "expiry_date": _isoformat(d.expiry_date),
+        "uploaded_at": _isoformat(d.uploaded_at)
+    }),
+    "asset_history": (AssetHistoryORM, lambda h: {
+        "id": h.id,
+        "asset_id": h.asset_id,
+        "project_id": h.project_id,
+        "moved_at": _isoformat(h.moved_at),
+        "moved_by": h.moved_by
+    }),
+}
+
+
+@changes_bp.route("/", methods=["GET"])
+@jwt_required_custom()
+def list_changes():
+    """
+    List changes after a cursor, oldest first.
+    
+    Each entry carries the current state of the changed row (null once the
+    row is deleted), so a client applies entries in order and stores
+    next_cursor for the following call. Start with since=0 for a full sync.
+    
+    Query parameters:
+        since: Cursor returned by the previous call (default: 0)
+        limit: Maximum number of changes to return (default: 500, max: 5000)
+    
+    Response:
+        {
+            "changes": [
+                {
+                    "seq": 42,
+                    "entity": "asset",
+                    "id": "asset_id",
+                    "operation": "update",
+                    "changed_at": "2024-01-01T12:00:00",
+                    "data": {...}
+                }
+            ],
+            "next_cursor": 42,
+            "has_more": false
+        }
+    """
+    try:
+        try:
+            since = int(request.args.get("since", 0))
+            limit = int(request.args.get("limit", DEFAULT_LIMIT))
+        except ValueError:
+            return jsonify({
+                "error": "Bad Request",
+                "message": "since and limit must be integers"
+            }), 400
+        
+        if since < 0 or limit < 1:
+            return jsonify({
+                "error": "Bad Request",
+                "message": "since must be >= 0 and limit must be >= 1"
+            }), 400
+        
+        limit = min(limit, MAX_LIMIT)
+        
+        db = next(get_db())
+        
+        # Range scan on the primary key; fetch one extra row to detect more pages
+        entries = db.query(ChangeLogORM).filter(
+            ChangeLogORM.seq > since
+        ).order_by(ChangeLogORM.seq).limit(limit + 1).all()
+        
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+        
+        # Load the current rows with one query per entity type
+        ids_by_entity = {}
+        for entry in entries:
+            ids_by_entity.setdefault(entry.entity, set()).add(entry.entity_id)
+        
+        current = {}
+        for entity, ids in ids_by_entity.items():
+            model, serialize = ENTITY_SERIALIZERS[entity]
+            for row in db.query(model).filter(model.id.in_(ids)).all():
+                current[(entity, row.id)] = serialize(row)
+        
+        changes = [{
+            "seq": entry.seq,
+            "entity": entry.entity,
+            "id": entry.entity_id,
+            "operation": entry.operation,
+            "changed_at": _isoformat(entry.changed_at),
+            "data": current.get((entry.entity, entry.entity_id))
+        } for entry in entries]
+        
+        return jsonify({
+            "changes": changes,
+            "next_cursor": entries[-1].seq if entries else since,
+            "has_more": has_more
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            "error": "Internal Server Error",
+            "message": str(e)
+        }), 500
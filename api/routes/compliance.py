@@ -0,0 +1,256 @@
+"""
+Organisation-wide compliance routes for the Site-Steward API.
+Compliance status across every project at once.
+"""
+import json
+from datetime import datetime
+
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from sqlalchemy import case, func, select
+from database.db import get_db
+from database.models import (
+    ProjectORM, SubcontractorORM, ComplianceDocumentORM, ChangeLogORM, project_subcontractors
+)
+from services.compliance_service import ComplianceService
+from api.middleware.auth import jwt_required_custom
+
+compliance_bp = Blueprint("compliance", __name__)
+
+# Rows fetched from the database per round trip while streaming
+MATRIX_BATCH_SIZE = 5000
+
+# Forecast horizon in weeks
+DEFAULT_FORECAST_WEEKS = 26
+MAX_FORECAST_WEEKS = 104
+
+
+def matrix_etag(db, today):
+    """
+    ETag of the compliance matrix.
+    
+    The matrix changes when a project, subcontractor or document is
+    written (each write appends to the change log) and when the date
+    moves on, since statuses are relative to today.
+    """
+    seq = db.query(func.coalesce(func.max(ChangeLogORM.seq), 0)).scalar()
+    return f"matrix-{seq}-{today.isoformat()}"
+
+
+def matrix_query():
+    """
+    One row per project/subcontractor link, projects without any
+    subcontractor included once, ordered by project.
+    
+    Documents are aggregated per subcontractor in a subquery and joined
+    to the links, so each subcontractor's documents are grouped once no
+    matter how many projects it works on.
+    """
+    expiry = ComplianceDocumentORM.expiry_date
+    documents = select(
+        ComplianceDocumentORM.subcontractor_id,
+        func.count(ComplianceDocumentORM.id).label("documents"),
+        (func.count(ComplianceDocumentORM.id) - func.count(expiry)).label("undated"),
+        func.min(expiry).label("soonest_expiry")
+    ).group_by(ComplianceDocumentORM.subcontractor_id).subquery()
+    
+    return select(
+        ProjectORM.id.label("project_id"),
+        ProjectORM.name.label("project_name"),
+        SubcontractorORM.id.label("subcontractor_id"),
+        SubcontractorORM.name.label("subcontractor_name"),
+        documents.c.documents,
+        documents.c.undated,
+        documents.c.soonest_expiry
+    ).select_from(ProjectORM).outerjoin(
+        project_subcontractors, project_subcontractors.c.project_id == ProjectORM.id
+    ).outerjoin(
+        SubcontractorORM, SubcontractorORM.id == project_subcontractors.c.subcontractor_id
+    ).outerjoin(
+        documents, documents.c.subcontractor_id == SubcontractorORM.id
+    ).order_by(ProjectORM.name, ProjectORM.id)
+
+
+def generate_matrix(result, today):
+    """
+    Encode matrix rows as a JSON document, one project at a time.
+    
+    Subcontractor names are collected while streaming and sent once at
+    the end, instead of being repeated in every project.
+    """
+    subcontractors = {}
+    totals = {"projects": 0, "green": 0, "red": 0}
+    project = None
+    
+    def close(project):
+        separator = "," if totals["projects"] else ""
+        totals["projects"] += 1
+        return separator + json.dumps(project)
+    
+    yield '{"as_of": %s, "projects": [' % json.dumps(today.isoformat())
+    for rows in result.partitions():
+        for row in rows:
+            if project is None or project["id"] != row.project_id:
+                if project is not None:
+                    yield close(project)
+                project = {"id": row.project_id, "name": row.project_name, "green": 0, "red": 0, "statuses": {}}
+            if row.subcontractor_id is None:
+                continue
+            
+            status = ComplianceService.aggregate_status(
+                row.documents, row.undated, row.soonest_expiry, today
+            )
+            project["statuses"][row.subcontractor_id] = status
+            project[status.lower()] += 1
+            totals[status.lower()] += 1
+            subcontractors[row.subcontractor_id] = row.subcontractor_name
+    if project is not None:
+        yield close(project)
+    
+    totals["subcontractors"] = len(subcontractors)
+    yield '], "subcontractors": %s, "totals": %s}' % (json.dumps(subcontractors), json.dumps(totals))
+
+
+@compliance_bp.route("/matrix", methods=["GET"])
+@jwt_required_custom()
+def get_compliance_matrix():
+    """
+    Compliance status of every subcontractor on every project.
+    
+    The grid is sparse: each project lists only the subcontractors
+    assigned to it. Built from one grouped join and streamed, so memory
+    use does not grow with the number of projects. Responses carry an
+    ETag; send it back in If-None-Match to get 304 Not Modified while
+    nothing has changed.
+    
+    Response:
+        {
+            "as_of": "2024-11-17",
+            "projects": [
+                {
+                    "id": "project_id",
+                    "name": "Project Name",
+                    "green": 1,
+                    "red": 1,
+                    "statuses": {"subcontractor_id": "GREEN", "subcontractor_id_2": "RED"}
+                }
+            ],
+            "subcontractors": {"subcontractor_id": "Subcontractor Name"},
+            "totals": {"projects": 1, "green": 1, "red": 1, "subcontractors": 2}
+        }
+    """
+    try:
+        db = next(get_db())
+        today = datetime.now().date()
+        
+        etag = matrix_etag(db, today)
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
+        
+        result = db.connection().execution_options(yield_per=MATRIX_BATCH_SIZE).execute(matrix_query())
+        
+        response = Response(
+            stream_with_context(generate_matrix(result, today)),
+            mimetype="application/json"
+        )
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "private, no-cache"
+        return response
+    
+    except Exception as e:
+        return jsonify({
+            "error": "Internal Server Error",
+            "message": str(e)
+        }), 500
+
+
+@compliance_bp.route("/forecast", methods=["GET"])
+@jwt_required_custom()
+def get_expiry_forecast():
+    """
+    Upcoming document expiries per week, document type and project.
+    
+    Weeks start on Monday; week 0 is the current week, from today on.
+    Counts come from one query over the expiry_date index, grouped by
+    week (a CASE over the week boundaries), document type and project.
+    A document counts once for each project its subcontractor is
+    assigned to.
+    
+    Query parameters:
+        weeks: Number of weeks to forecast (default: 26, max: 104)
+        project_id: Only count expiries on this project
+    
+    Response:
+        {
+            "as_of": "2024-11-13",
+            "weeks": ["2024-11-11", "2024-11-18", ...],
+            "projects": {"project_id": "Project Name"},
+            "series": [
+                {
+                    "project_id": "project_id",
+                    "document_type": "Liability Insurance",
+                    "weeks": [0, 3],
+                    "counts": [2, 1]
+                }
+            ],
+            "totals": [2, 0, 0, 1, ...]
+        }
+    """
+    try:
+        try:
+            weeks = int(request.args.get("weeks", DEFAULT_FORECAST_WEEKS))
+        except ValueError:
+            weeks = 0
+        if not 1 <= weeks <= MAX_FORECAST_WEEKS:
+            return jsonify({
+                "error": "Bad Request",
+                "message": f"weeks must be an integer from 1 to {MAX_FORECAST_WEEKS}"
+            }), 400
+        
+        db = next(get_db())
+        today = datetime.now().date()
+        week_starts = ComplianceService.forecast_week_starts(today, weeks)
+        expiry = ComplianceDocumentORM.expiry_date
+        
+        # Week index of each document, computed by the database
+        week = case(*[
+            (expiry < week_starts[index + 1], index) for index in range(weeks)
+        ]).label("week")
+        
+        query = db.query(
+            week,
+            ComplianceDocumentORM.document_type,
+            ProjectORM.id,
+            ProjectORM.name,
+            func.count(ComplianceDocumentORM.id)
+        ).join(
+            project_subcontractors,
+            project_subcontractors.c.subcontractor_id == ComplianceDocumentORM.subcontractor_id
+        ).join(
+            ProjectORM, ProjectORM.id == project_subcontractors.c.project_id
+        ).filter(
+            expiry >= today,
+            expiry < week_starts[-1]
+        )
+        if request.args.get("project_id"):
+            query = query.filter(ProjectORM.id == request.args["project_id"])
+        rows = query.group_by(week, ComplianceDocumentORM.document_type, ProjectORM.id, ProjectORM.name).all()
+        
+        series, totals = ComplianceService.build_forecast(
+            [(row[0], row[1], row[2], row[4]) for row in rows], weeks
+        )
+        
+        return jsonify({
+            "as_of": today.isoformat(),
+            "weeks": [start.isoformat() for start in week_starts[:-1]],
+            "projects": {row[2]: row[3] for row in rows},
+            "series": series,
+            "totals": totals
+        }), 200
+    
+    except Exception as e:
+        return jsonify({
+            "error": "Internal Server Error",
+            "message": str(e)
+        }), 500
@@ -0,0 +1,80 @@
+"""
+Live event stream routes for the Site-Steward API.
+Pushes asset and compliance changes to dashboards with server-sent events.
+"""
+import json
+from flask import Blueprint, Response, request, jsonify, current_app
+from services.event_bus import event_bus, TooManySubscribers
+from api.middleware.auth import jwt_required_custom
+
+events_bp = Blueprint("events", __name__)
+
+EVENT_TYPES = {"asset.created", "asset.moved", "document.uploaded", "resync"}
+
+
+def format_sse(event):
+    """Encode an event dict as a server-sent events message."""
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+@events_bp.route("/", methods=["GET"])
+@jwt_required_custom()
+def stream_events():
+    """
+    Stream live events as text/event-stream.
+    
+    Event types:
+        - asset.created: {"id", "name", "category"}
+        - asset.moved: {"asset_ids", "project_id", "previous_project_ids", "moved_by"}
+        - document.uploaded: {"id", "subcontractor_id", "document_type", "expiry_date", "status"}
+        - resync: {"dropped"} - the client fell behind and should refetch state
+    
+    Query parameters:
+        types: Comma-separated event types to receive (default: all)
+    
+    Requirements: live Project Hub updates without polling
+    """
+    types = request.args.get("types")
+    event_types = None
+    if types:
+        event_types = {t.strip() for t in types.split(",") if t.strip()}
+        unknown = event_types - EVENT_TYPES
+        if unknown:
+            return jsonify({
+                "error": "Bad Request",
+                "message": f"Unknown event types: {', '.join(sorted(unknown))}"
+            }), 400
+        # Slow consumers must always learn that they missed events
+        event_types.add("resync")
+    
+    try:
+        subscription = event_bus.subscribe(event_types=event_types)
+    except TooManySubscribers as e:
+        return jsonify({
+            "error": "Service Unavailable",
+            "message": str(e)
+        }), 503
+    
+    keepalive = current_app.config["EVENT_STREAM_KEEPALIVE_SECONDS"]
+    
+    def generate():
+        try:
+            yield "retry: 3000\n\n"
+            while not subscription.closed:
+                event = subscription.get(timeout=keepalive)
+                if event is None:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_sse(event)
+        finally:
+            subscription.close()
+    
+    return Response(
+        generate(),
+        mimetype="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
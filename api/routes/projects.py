@@ -3,14 +3,25 @@ Project management routes for the Site-Steward API.
 Handles project CRUD operations and compliance status.
 """
 from flask import Blueprint, request, jsonify
+from sqlalchemy import and_, case, func
+from sqlalchemy.orm import selectinload
 from database.db import get_db
-from database.models import ProjectORM, AssetORM, SubcontractorORM, ComplianceDocumentORM
+from database.models import (
+    ProjectORM, AssetORM, SubcontractorORM, ComplianceDocumentORM, project_subcontractors
+)
+from services.compliance_service import ComplianceService
 from api.middleware.auth import jwt_required_custom
+from api.utils import parse_timestamp
+from services.location_service import location_service
 import uuid
 from datetime import datetime, timedelta
 
 projects_bp = Blueprint("projects", __name__)
 
+# Soonest expiries returned by the compliance summary
+DEFAULT_SOONEST = 5
+MAX_SOONEST = 50
+
 
 @projects_bp.route("/", methods=["GET"])
 @jwt_required_custom()
@@ -33,16 +44,18 @@ def list_projects():
     try:
         db = next(get_db())
         
-        # Query all projects
-        projects = db.query(ProjectORM).all()
+        # Query all projects with their asset counts in one statement
+        projects = db.query(ProjectORM, func.count(AssetORM.id)).outerjoin(
+            AssetORM, AssetORM.project_id == ProjectORM.id
+        ).group_by(ProjectORM.id).all()
         
         result = []
-        for project in projects:
+        for project, asset_count in projects:
             project_data = {
                 "id": project.id,
                 "name": project.name,
                 "location": project.location,
-                "asset_count": len(project.assets)
+                "asset_count": asset_count
             }
             result.append(project_data)
         
@@ -155,7 +168,9 @@ def get_project_compliance(project_id):
         db = next(get_db())
         
         # Verify project exists
-        project = db.query(ProjectORM).filter(ProjectORM.id == project_id).first()
+        project = db.query(ProjectORM).options(
+            selectinload(ProjectORM.subcontractors).selectinload(SubcontractorORM.documents)
+        ).filter(ProjectORM.id == project_id).first()
         if not project:
             return jsonify({
                 "error": "Not Found",
@@ -201,3 +216,193 @@ def get_project_compliance(project_id):
             "error": "Internal Server Error",
             "message": str(e)
         }), 500
+
+
+@projects_bp.route("/<project_id>/compliance/summary", methods=["GET"])
+@jwt_required_custom()
+def get_project_compliance_summary(project_id):
+    """
+    Get precomputed compliance totals for a project.
+    
+    Query parameters:
+        limit: Number of soonest expiries to return (default: 5, max: 50)
+    
+    Response:
+        {
+            "project_id": "project_id",
+            "project_name": "Project Name",
+            "as_of": "2024-11-17",
+            "subcontractors": {"total": 12, "green": 9, "red": 3},
+            "compliance_rate": 75.0,
+            "documents": {"total": 36, "green": 30, "red": 6, "expired": 2, "no_expiry": 0},
+            "days_remaining": [
+                {"bucket": "expired", "count": 2},
+                {"bucket": "0-7", "count": 1},
+                ...
+            ],
+            "soonest_expiries": [
+                {
+                    "subcontractor_id": "subcontractor_id",
+                    "subcontractor_name": "Subcontractor Name",
+                    "document_id": "document_id",
+                    "document_type": "Insurance",
+                    "expiry_date": "2024-11-10",
+                    "days_remaining": -7,
+                    "status": "RED"
+                }
+            ]
+        }
+    """
+    try:
+        try:
+            limit = min(int(request.args.get("limit", DEFAULT_SOONEST)), MAX_SOONEST)
+        except ValueError:
+            return jsonify({
+                "error": "Bad Request",
+                "message": "limit must be an integer"
+            }), 400
+        
+        db = next(get_db())
+        
+        project = db.query(ProjectORM.id, ProjectORM.name).filter(ProjectORM.id == project_id).first()
+        if not project:
+            return jsonify({
+                "error": "Not Found",
+                "message": f"Project with ID {project_id} not found"
+            }), 404
+        
+        today = datetime.now().date()
+        expiry = ComplianceDocumentORM.expiry_date
+        
+        # One row per subcontractor on the project: document counts,
+        # earliest expiry and a count per days-remaining bucket
+        buckets = []
+        for label, first, last in ComplianceService.bucket_ranges(today):
+            in_bucket = and_(
+                expiry >= first if first else True,
+                expiry <= last if last else True
+            )
+            buckets.append(func.sum(case((in_bucket, 1), else_=0)).label(label))
+        
+        aggregates = db.query(
+            project_subcontractors.c.subcontractor_id.label("id"),
+            func.count(ComplianceDocumentORM.id).label("documents"),
+            (func.count(ComplianceDocumentORM.id) - func.count(expiry)).label("undated"),
+            func.min(expiry).label("soonest_expiry"),
+            *buckets
+        ).select_from(project_subcontractors).outerjoin(
+            ComplianceDocumentORM,
+            ComplianceDocumentORM.subcontractor_id == project_subcontractors.c.subcontractor_id
+        ).filter(
+            project_subcontractors.c.project_id == project_id
+        ).group_by(project_subcontractors.c.subcontractor_id).all()
+        
+        soonest = db.query(
+            SubcontractorORM.id.label("subcontractor_id"),
+            SubcontractorORM.name.label("subcontractor_name"),
+            ComplianceDocumentORM.id.label("document_id"),
+            ComplianceDocumentORM.document_type,
+            expiry.label("expiry_date")
+        ).select_from(project_subcontractors).join(
+            SubcontractorORM, SubcontractorORM.id == project_subcontractors.c.subcontractor_id
+        ).join(
+            ComplianceDocumentORM, ComplianceDocumentORM.subcontractor_id == SubcontractorORM.id
+        ).filter(
+            project_subcontractors.c.project_id == project_id,
+            expiry.isnot(None)
+        ).order_by(expiry, ComplianceDocumentORM.id).limit(max(limit, 0)).all()
+        
+        summary = ComplianceService.build_summary(
+            [row._mapping for row in aggregates],
+            [row._mapping for row in soonest],
+            today=today
+        )
+        
+        return jsonify({
+            "project_id": project.id,
+            "project_name": project.name,
+            "as_of": today.isoformat(),
+            **summary
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            "error": "Internal Server Error",
+            "message": str(e)
+        }), 500
+
+
+@projects_bp.route("/<project_id>/assets", methods=["GET"])
+@jwt_required_custom()
+def get_project_assets_at(project_id):
+    """
+    List the assets that were on a project at a given date and time.
+    
+    Query parameters:
+        at: ISO-8601 timestamp (default: now)
+    
+    Response:
+        {
+            "project_id": "project_id",
+            "at": "2024-03-01T09:00:00",
+            "count": 1,
+            "assets": [
+                {
+                    "id": "asset_id",
+                    "name": "Asset Name",
+                    "category": "Category",
+                    "since": "2024-02-12T14:30:00",
+                    "until": "2024-03-20T08:15:00" or null
+                }
+            ]
+        }
+    """
+    try:
+        try:
+            at = parse_timestamp(request.args["at"]) if request.args.get("at") else datetime.utcnow()
+        except ValueError:
+            return jsonify({
+                "error": "Bad Request",
+                "message": "at must be an ISO-8601 timestamp"
+            }), 400
+        
+        db = next(get_db())
+        
+        project = db.query(ProjectORM.id).filter(ProjectORM.id == project_id).first()
+        if not project:
+            return jsonify({
+                "error": "Not Found",
+                "message": f"Project with ID {project_id} not found"
+            }), 404
+        
+        stays = location_service.assets_at(db, project_id, at)
+        details = {}
+        if stays:
+            details = {
+                asset.id: asset for asset in db.query(AssetORM.id, AssetORM.name, AssetORM.category)
+                .filter(AssetORM.id.in_([stay["asset_id"] for stay in stays])).all()
+            }
+        
+        assets = []
+        for stay in stays:
+            asset = details.get(stay["asset_id"])
+            assets.append({
+                "id": stay["asset_id"],
+                "name": asset.name if asset else None,
+                "category": asset.category if asset else None,
+                "since": stay["since"].isoformat(),
+                "until": stay["until"].isoformat() if stay["until"] else None
+            })
+        
+        return jsonify({
+            "project_id": project_id,
+            "at": at.isoformat(),
+            "count": len(assets),
+            "assets": assets
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            "error": "Internal Server Error",
+            "message": str(e)
+        }), 500
@@ -0,0 +1,85 @@
+"""
+Search routes for the Site-Steward API.
+Fuzzy, ranked search across assets, subcontractors and projects.
+"""
+from flask import Blueprint, request, jsonify
+from database.db import get_db
+from services.search_service import search_service, SEARCHABLE
+from api.middleware.auth import jwt_required_custom
+
+search_bp = Blueprint("search", __name__)
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+
+@search_bp.route("/", methods=["GET"])
+@jwt_required_custom()
+def search():
+    """
+    Search assets, subcontractors and projects.
+    
+    Matches are fuzzy on asset name/category, subcontractor name/email and
+    project name/location, and by prefix on IDs (e.g. a scanned QR code).
+    
+    Query parameters:
+        q: Search text (at least 2 characters)
+        types: Comma-separated subset of asset, subcontractor, project (default: all)
+        limit: Maximum number of results (default: 10, max: 50)
+    
+    Response:
+        {
+            "query": "excavator",
+            "results": [
+                {
+                    "type": "asset",
+                    "id": "asset_id",
+                    "name": "Excavator CAT 320",
+                    "category": "Heavy Equipment",
+                    "project_id": "project_id",
+                    "score": 0.875
+                }
+            ]
+        }
+    """
+    try:
+        query = (request.args.get("q") or "").strip()
+        
+        if len(query) < 2:
+            return jsonify({
+                "error": "Bad Request",
+                "message": "q must be at least 2 characters"
+            }), 400
+        
+        try:
+            limit = min(int(request.args.get("limit", DEFAULT_LIMIT)), MAX_LIMIT)
+        except ValueError:
+            return jsonify({
+                "error": "Bad Request",
+                "message": "limit must be an integer"
+            }), 400
+        
+        kinds = None
+        types = request.args.get("types")
+        if types:
+            kinds = {t.strip() for t in types.split(",") if t.strip()}
+            unknown = kinds - set(SEARCHABLE)
+            if unknown:
+                return jsonify({
+                    "error": "Bad Request",
+                    "message": f"Unknown types: {', '.join(sorted(unknown))}"
+                }), 400
+        
+        db = next(get_db())
+        results = search_service.search(db, query, limit=max(limit, 1), kinds=kinds)
+        
+        return jsonify({
+            "query": query,
+            "results": results
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            "error": "Internal Server Error",
+            "message": str(e)
+        }), 500
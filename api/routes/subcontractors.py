@@ -7,6 +7,7 @@ from werkzeug.utils import secure_filename
 from database.db import get_db
 from database.models import SubcontractorORM, ComplianceDocumentORM
 from api.middleware.auth import jwt_required_custom
+from services.event_bus import event_bus
 import uuid
 import os
 from datetime import datetime
@@ -257,6 +258,14 @@ def upload_document(sub_id):
         from services.compliance_service import ComplianceService
         status = ComplianceService.calculate_status(expiry_date)
         
+        event_bus.publish("document.uploaded", {
+            "id": new_document.id,
+            "subcontractor_id": sub_id,
+            "document_type": document_type,
+            "expiry_date": new_document.expiry_date.isoformat(),
+            "status": status
+        })
+        
         return jsonify({
             "id": new_document.id,
             "file_path": new_document.file_path,
@@ -0,0 +1,12 @@
+"""
+Request parsing helpers shared by the Site-Steward API routes.
+"""
+from datetime import datetime, timezone
+
+
+def parse_timestamp(value):
+    """Parse an ISO-8601 date or datetime into a naive UTC datetime."""
+    parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
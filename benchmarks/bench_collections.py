@@ -0,0 +1,68 @@
+"""
+Benchmark for the domain-layer AssetCollection and PeopleCollection.
+Builds a Place through PlaceService and reports build and lookup times,
+which should grow linearly with the number of members.
+
+Usage:
+    python benchmarks/bench_collections.py --sizes 10000 50000 100000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models.asset import Asset
+from models.asset_history import AssetHistory
+from models.asset_media import AssetMedia
+from models.user import User
+from services.place_service import PlaceService
+
+CATEGORIES = ["Heavy Equipment", "Power Tools", "Safety Equipment", "Power Equipment", "Survey"]
+ROLES = ["Admin", "Manager", "Worker"]
+
+
+def build_place(size):
+    service = PlaceService()
+    place = service.create_place("Benchmark Site")
+    assets = [
+        Asset(f"Asset {i % 1000}", CATEGORIES[i % len(CATEGORIES)], AssetMedia(), AssetHistory())
+        for i in range(size)
+    ]
+    users = [User(f"User {i}", f"user{i}@example.com", ROLES[i % len(ROLES)]) for i in range(size)]
+
+    start = time.perf_counter()
+    for asset in assets:
+        service.add_asset(place, asset)
+    for user in users:
+        service.add_person(place, user)
+    return place, assets, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000, 100000],
+                        help="Members per collection")
+    args = parser.parse_args()
+
+    print(f"{'members':>10}{'build s':>10}{'us/add':>10}{'find ms':>10}{'remove s':>10}")
+    for size in args.sizes:
+        place, assets, build = build_place(size)
+
+        start = time.perf_counter()
+        for i in range(100):
+            place.assets.find_by_name(f"Asset {i}")
+            place.people.find_by_role(ROLES[i % len(ROLES)])
+        find = (time.perf_counter() - start) / 100
+
+        start = time.perf_counter()
+        for asset in assets:
+            place.assets.remove(asset)
+        remove = time.perf_counter() - start
+
+        print(f"{size:>10,}{build:>10.2f}{build / (2 * size) * 1e6:>10.2f}{find * 1000:>10.2f}{remove:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
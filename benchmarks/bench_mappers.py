@@ -0,0 +1,95 @@
+"""
+Benchmark for the AssetMapper single-object and bulk paths.
+Compares converting and round-tripping assets through ORM instances with
+the Core row-mapping path (to_orm_many/to_domain_many) on SQLite.
+
+Usage:
+    python benchmarks/bench_mappers.py --objects 100000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# database.db builds its engine at import time; the benchmark uses its own
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.gettempdir(), 'bench_mappers.db')}")
+
+from sqlalchemy import create_engine, insert, select, delete
+from sqlalchemy.orm import sessionmaker
+
+from database.db import Base
+from database.models import AssetORM
+from mappers.asset_mapper import AssetMapper
+from models.asset import Asset
+
+CATEGORIES = ["Heavy Equipment", "Power Tools", "Safety Equipment", "Power Equipment", "Survey"]
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40}{elapsed:>10.3f}")
+    return elapsed, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--objects", type=int, default=100000, help="Assets to convert")
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    assets = [Asset(f"Asset {i}", CATEGORIES[i % len(CATEGORIES)], None, None) for i in range(args.objects)]
+    table = AssetORM.__table__
+
+    print(f"{'step (' + format(args.objects, ',') + ' assets)':<40}{'seconds':>10}")
+
+    orm_convert, _ = timed("to_orm x N", lambda: [AssetMapper.to_orm(a) for a in assets])
+    core_convert, rows = timed("to_orm_many", lambda: AssetMapper.to_orm_many(assets))
+
+    def orm_insert():
+        with Session() as db:
+            db.add_all(AssetMapper.to_orm(a) for a in assets)
+            db.commit()
+
+    def core_insert():
+        with Session() as db:
+            db.execute(insert(table), AssetMapper.to_orm_many(assets))
+            db.commit()
+
+    orm_write, _ = timed("to_orm + session.add_all + commit", orm_insert)
+    with engine.begin() as conn:
+        conn.execute(delete(table))
+    core_write, _ = timed("to_orm_many + insert() + commit", core_insert)
+
+    with Session() as db:
+        orm_rows = db.query(AssetORM).all()
+        core_rows = db.execute(select(table.c.id, table.c.name, table.c.category)).mappings().all()
+        orm_back, _ = timed("to_domain x N (ORM instances)", lambda: [AssetMapper.to_domain(r) for r in orm_rows])
+        core_back, loaded = timed("to_domain_many (row mappings)", lambda: AssetMapper.to_domain_many(core_rows))
+
+    def orm_read():
+        with Session() as db:
+            return [AssetMapper.to_domain(row) for row in db.query(AssetORM).all()]
+
+    def core_read():
+        with Session() as db:
+            result = db.execute(select(table.c.id, table.c.name, table.c.category)).mappings()
+            return AssetMapper.to_domain_many(result)
+
+    orm_load, _ = timed("query(AssetORM) + to_domain", orm_read)
+    core_load, _ = timed("select().mappings() + to_domain_many", core_read)
+
+    print()
+    print(f"to_orm conversion speed-up:    {orm_convert / core_convert:.1f}x")
+    print(f"to_domain conversion speed-up: {orm_back / core_back:.1f}x")
+    print(f"insert speed-up:               {orm_write / core_write:.1f}x")
+    print(f"load speed-up:                 {orm_load / core_load:.1f}x")
+    print(f"IDs preserved:                 {loaded[0].asset_id == assets[0].asset_id}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Memory benchmark for the domain models in models/.
+Creates assets, users and documents through the services, logs a few
+history events on each and reports tracemalloc bytes per object.
+
+Usage:
+    python benchmarks/bench_model_memory.py --objects 100000 --events 5
+"""
+import argparse
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models.user import User
+from services.asset_service import AssetService
+from services.document_service import DocumentService
+from services.place_service import PlaceService
+
+MESSAGES = ["Assigned to jobsite Downtown Office", "QR code set: qr.png", "Integrity check passed"]
+
+
+def measure(label, count, factory):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    objects = [factory(i) for i in range(count)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    total = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    print(f"{label:<28}{total / count:>12.0f}{total / 2**20:>12.1f}")
+    return objects
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--objects", type=int, default=100000, help="Objects per model")
+    parser.add_argument("--events", type=int, default=5, help="History events logged per object")
+    args = parser.parse_args()
+
+    assets, documents, places = AssetService(), DocumentService(), PlaceService()
+
+    def asset(i):
+        a = assets.create_asset(f"Asset {i}", "Power Tools")
+        for n in range(args.events - 1):
+            a.history.log(MESSAGES[n % len(MESSAGES)])
+        return a
+
+    def document(i):
+        d = documents.create_document(f"Document {i}", "Insurance", file_path=f"doc{i}.pdf")
+        for n in range(args.events - 1):
+            d.history.log(MESSAGES[n % len(MESSAGES)])
+        return d
+
+    def place(i):
+        p = places.create_place(f"Site {i}", location="Main St")
+        for n in range(args.events - 1):
+            p.history.log(MESSAGES[n % len(MESSAGES)])
+        return p
+
+    print(f"{'model':<28}{'bytes/obj':>12}{'total MiB':>12}")
+    measure(f"Asset (+{args.events} events)", args.objects, asset)
+    measure(f"Document (+{args.events} events)", args.objects, document)
+    measure(f"Place (+{args.events} events)", args.objects, place)
+    measure("User", args.objects, lambda i: User(f"User {i}", f"user{i}@example.com", "Worker"))
+
+
+if __name__ == "__main__":
+    main()
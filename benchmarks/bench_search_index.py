@@ -0,0 +1,65 @@
+"""
+Benchmark for the in-memory search index used by GET /api/search.
+Builds an index over synthetic asset names and reports query latency.
+
+Usage:
+    python benchmarks/bench_search_index.py --docs 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.search_index import NGramIndex
+
+MAKES = ["CAT", "Deere", "Bobcat", "Makita", "DeWalt", "Hilti", "Bosch", "Honda", "Kubota", "Volvo"]
+ITEMS = ["Excavator", "Generator", "Hammer Drill", "Scaffolding Set", "Compressor", "Skid Steer",
+         "Concrete Mixer", "Laser Level", "Pressure Washer", "Welder", "Light Tower", "Trench Box"]
+CATEGORIES = ["Heavy Equipment", "Power Tools", "Safety Equipment", "Power Equipment", "Survey"]
+QUERIES = ["excavator", "hamer dril", "makita", "genrator 50", "scaffold", "laser", "skid steer bobcat"]
+
+
+def build_index(docs, seed=42):
+    rng = random.Random(seed)
+    index = NGramIndex()
+    ids = []
+    for _ in range(docs):
+        asset_id = str(uuid.UUID(int=rng.getrandbits(128)))
+        name = f"{rng.choice(MAKES)} {rng.choice(ITEMS)} {rng.randint(1, 999)}"
+        index.add(("asset", asset_id), f"{name} {rng.choice(CATEGORIES)}", {"id": asset_id}, doc_id=asset_id)
+        ids.append(asset_id)
+    return index, ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=100000, help="Number of documents to index")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per query")
+    parser.add_argument("--limit", type=int, default=10, help="Top-k size")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index, ids = build_index(args.docs)
+    print(f"Indexed {args.docs:,} documents in {time.perf_counter() - start:.1f}s")
+
+    queries = QUERIES + [ids[0][:8]]
+    print(f"{'query':<22}{'p50 ms':>10}{'p95 ms':>10}{'hits':>6}")
+    for query in queries:
+        index.search(query, limit=args.limit)  # warm the posting arrays
+        timings = []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            hits = index.search(query, limit=args.limit)
+            timings.append((time.perf_counter() - t0) * 1000)
+        timings.sort()
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        print(f"{query:<22}{statistics.median(timings):>10.2f}{p95:>10.2f}{len(hits):>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Change log recording for the delta-sync change feed.
+Every ORM flush that inserts, updates or deletes a tracked entity adds a
+row to change_log, whose integer sequence is the cursor clients sync from.
+
+Readers treat seq as a cursor and never look behind it, so sequence values
+must become visible in the order they are allocated. The rows of a
+transaction are collected during its flushes and written when it commits.
+On SQLite, write transactions are already serialized, so they go straight
+into change_log. On PostgreSQL concurrent transactions would commit out of
+seq order, so they go into change_log_pending without a seq instead. Right
+after the commit, sequence_changes() moves every committed pending row
+into change_log in a short transaction of its own. Those transactions are
+serialized by an advisory lock, so a seq is only handed out once every
+lower one is visible. The writing transactions themselves never wait on
+the lock, and one sequencing pass moves the rows of every writer that
+committed before it.
+"""
+import logging
+
+from sqlalchemy import event, insert, text
+from sqlalchemy.orm import Session
+from database.models import (
+    AssetORM, ProjectORM, SubcontractorORM, ComplianceDocumentORM,
+    AssetHistoryORM, ChangeLogORM, ChangeLogPendingORM
+)
+
+logger = logging.getLogger(__name__)
+
+# ORM class -> entity name exposed by the change feed
+TRACKED_ENTITIES = {
+    AssetORM: 'asset',
+    ProjectORM: 'project',
+    SubcontractorORM: 'subcontractor',
+    ComplianceDocumentORM: 'document',
+    AssetHistoryORM: 'asset_history',
+}
+
+# PostgreSQL advisory lock key serializing sequence_changes() ("chgl")
+CHANGE_LOG_LOCK_KEY = 0x6368676C
+
+# Session.info key of change log entries waiting for the commit
+PENDING_KEY = 'change_log_pending'
+
+# Session.info key of the engine whose pending rows need a seq after the commit
+SEQUENCE_KEY = 'change_log_sequence'
+
+# PostgreSQL channel notified when documents change, so the expiry
+# scheduler wakes up instead of waiting for its next change log poll
+DOCUMENT_CHANNEL = 'document_changes'
+
+
+def record_changes(db, entity, entity_ids, operation):
+    """
+    Add change log rows for writes made outside the ORM unit of work
+    (Core inserts, bulk updates). Written when db commits.
+    
+    Args:
+        db: SQLAlchemy session
+        entity: Entity name from TRACKED_ENTITIES
+        entity_ids: IDs of the changed rows
+        operation: 'insert', 'update' or 'delete'
+    """
+    db.info.setdefault(PENDING_KEY, []).extend(
+        {'entity': entity, 'entity_id': entity_id, 'operation': operation}
+        for entity_id in entity_ids
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _log_changes(session, flush_context):
+    """
+    Turn the flushed inserts, updates and deletes into pending change log
+    entries.
+    
+    Runs after the flush (new/dirty/deleted still show the pre-flush
+    state). The entries are written by _write_changes at commit.
+    """
+    entries = []
+    
+    for operation, objects in (
+        ('insert', session.new),
+        ('update', session.dirty),
+        ('delete', session.deleted),
+    ):
+        for obj in objects:
+            entity = TRACKED_ENTITIES.get(type(obj))
+            if entity is None:
+                continue
+            if operation == 'update' and not session.is_modified(obj):
+                continue
+            entries.append({'entity': entity, 'entity_id': obj.id, 'operation': operation})
+    
+    if entries:
+        session.info.setdefault(PENDING_KEY, []).extend(entries)
+
+
+def sequence_changes(engine):
+    """
+    Give committed change_log_pending rows their seq, in a transaction of
+    their own (PostgreSQL only).
+
+    The advisory lock is held for one DELETE ... INSERT of the rows
+    pending at that moment. A pass only starts once the previous one has
+    committed, so the seqs it hands out are above every visible one.
+    Rows left behind by a process that died after its commit are picked
+    up by the next pass.
+    """
+    with engine.begin() as connection:
+        connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {'key': CHANGE_LOG_LOCK_KEY})
+        entities = connection.execute(text(f"""
+            WITH moved AS (
+                DELETE FROM {ChangeLogPendingORM.__tablename__}
+                RETURNING id, entity, entity_id, operation, changed_at
+            )
+            INSERT INTO {ChangeLogORM.__tablename__} (entity, entity_id, operation, changed_at)
+            SELECT entity, entity_id, operation, changed_at FROM moved ORDER BY id
+            RETURNING entity
+        """)).scalars().all()
+        if 'document' in entities:
+            # Delivered once the rows are visible in change_log
+            connection.execute(text(f"NOTIFY {DOCUMENT_CHANNEL}"))
+
+
+@event.listens_for(Session, "before_commit")
+def _write_changes(session):
+    """
+    Insert the transaction's change log entries, with one executemany,
+    right before it commits.
+    """
+    # Commit flushes after this hook; flush now so no entry is left behind
+    session.flush()
+    entries = session.info.pop(PENDING_KEY, None)
+    if not entries:
+        return
+    
+    connection = session.connection()
+    if connection.dialect.name != 'postgresql':
+        connection.execute(insert(ChangeLogORM.__table__), entries)
+        return
+    
+    connection.execute(insert(ChangeLogPendingORM.__table__), entries)
+    session.info[SEQUENCE_KEY] = connection.engine
+
+
+@event.listens_for(Session, "after_commit")
+def _sequence_changes(session):
+    """Sequence the rows _write_changes left pending, once they are committed."""
+    engine = session.info.pop(SEQUENCE_KEY, None)
+    if engine is None:
+        return
+    try:
+        sequence_changes(engine)
+    except Exception as e:
+        # The write itself is committed; the next writer's pass sequences these rows
+        logger.warning("Could not sequence change log rows: %s", e)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_changes(session, transaction):
+    """Drop the entries of a transaction that was rolled back or closed."""
+    if transaction.parent is None:
+        session.info.pop(PENDING_KEY, None)
+        session.info.pop(SEQUENCE_KEY, None)
@@ -2,8 +2,10 @@
 Database connection and session management for Site-Steward.
 Provides SQLAlchemy engine, session factory, and base model class.
 """
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, declarative_base, scoped_session
+from sqlalchemy.pool import QueuePool, StaticPool
 from contextlib import contextmanager
 import os
 import sys
@@ -11,22 +13,120 @@ import sys
 # Add parent directory to path to import config
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from api.config import get_config
+from database.routing import ReplicaSet, RoutingSession, WritePins
 
 # Get configuration
 config = get_config()
 
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+def engine_options(url, config):
+    """
+    Engine keyword arguments for a database URL.
+    
+    PostgreSQL uses SQLALCHEMY_ENGINE_OPTIONS. SQLite files get a fixed
+    QueuePool (connections are cheap, and every connection shares the
+    same file, so overflow buys nothing), in-memory SQLite a StaticPool
+    so every session sees the same database. Pooled SQLite connections
+    move between threads, hence check_same_thread=False.
+    """
+    url = make_url(url)
+    if url.get_backend_name() != "sqlite":
+        return dict(config.SQLALCHEMY_ENGINE_OPTIONS)
+    
+    options = {
+        "connect_args": {
+            "check_same_thread": False,
+            "timeout": config.SQLITE_BUSY_TIMEOUT_MS / 1000,
+        },
+    }
+    if url.database in (None, "", ":memory:"):
+        options["poolclass"] = StaticPool
+    else:
+        options.update(poolclass=QueuePool, pool_size=config.SQLITE_POOL_SIZE, max_overflow=0)
+    return options
+
+
+def configure_sqlite(engine, config):
+    """
+    Tune an SQLite engine for concurrent use by the API.
+    
+    Each new connection switches to WAL (readers no longer block the
+    writer), synchronous=NORMAL (fsync at checkpoints rather than every
+    commit; a power cut can lose the last commits but never corrupts the
+    file), memory-maps the database and waits busy_timeout for locks.
+    
+    The driver's own transaction handling is turned off so transactions
+    can be started explicitly: write requests (and anything outside a
+    request, e.g. scripts) BEGIN IMMEDIATE and take the write lock up
+    front, queueing behind the busy timeout. A deferred transaction that
+    reads first and writes later would instead fail with "database is
+    locked" as soon as another writer committed in between.
+    """
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={config.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA mmap_size={int(config.SQLITE_MMAP_SIZE)}")
+        cursor.execute(f"PRAGMA busy_timeout={int(config.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.close()
+    
+    @event.listens_for(engine, "begin")
+    def _begin(conn):
+        conn.exec_driver_sql("BEGIN IMMEDIATE" if _is_write_context() else "BEGIN")
+
+
+def _is_write_context():
+    """True unless running inside a read-only (GET/HEAD/OPTIONS) request."""
+    try:
+        from flask import has_request_context, request
+    except ImportError:
+        return True
+    if not has_request_context():
+        return True
+    return request.method in WRITE_METHODS
+
+
 # Create database engine with connection pooling
 engine = create_engine(
     config.SQLALCHEMY_DATABASE_URI,
     echo=config.DEBUG,
-    **config.SQLALCHEMY_ENGINE_OPTIONS
+    **engine_options(config.SQLALCHEMY_DATABASE_URI, config)
 )
+if engine.dialect.name == "sqlite":
+    configure_sqlite(engine, config)
+
+
+def create_replica_set(urls, config):
+    """Engines for the read replicas, or None when there are none."""
+    engines = []
+    for url in urls:
+        replica = create_engine(url.strip(), echo=config.DEBUG, **engine_options(url.strip(), config))
+        if replica.dialect.name == "sqlite":
+            configure_sqlite(replica, config)
+        engines.append(replica)
+    if not engines:
+        return None
+    return ReplicaSet(
+        engines,
+        max_lag=config.REPLICA_MAX_LAG_SECONDS,
+        check_interval=config.REPLICA_CHECK_INTERVAL_SECONDS
+    )
+
 
-# Create session factory
+replicas = create_replica_set(config.DATABASE_REPLICA_URLS, config)
+
+# Create session factory; GET requests read from a replica when configured
 SessionLocal = sessionmaker(
+    class_=RoutingSession,
     autocommit=False,
     autoflush=False,
-    bind=engine
+    bind=engine,
+    replicas=replicas,
+    pins=WritePins(config.READ_YOUR_WRITES_SECONDS)
 )
 
 # Create thread-safe scoped session
@@ -41,15 +141,43 @@ def get_db():
     Dependency function to get database session.
     Yields a database session and ensures it's closed after use.
     
+    Inside a Flask request the session is closed when the request ends
+    (see close_request_sessions). Routes call next(get_db()), which drops
+    the generator straight away, so closing in the generator's finally
+    block would run before the route used the session and leave its
+    connection checked out until garbage collection.
+    
     Usage:
-        with get_db() as db:
-            # Use db session
-            pass
+        db = next(get_db())
     """
     db = SessionLocal()
+    request_scoped = _register_request_session(db)
     try:
         yield db
     finally:
+        if not request_scoped:
+            db.close()
+
+
+def _register_request_session(db):
+    """Track a session on flask.g so close_request_sessions can close it."""
+    try:
+        from flask import g, has_app_context
+    except ImportError:
+        return False
+    if not has_app_context():
+        return False
+    g.setdefault("db_sessions", []).append(db)
+    return True
+
+
+def close_request_sessions(exc=None):
+    """
+    Close every session handed out by get_db() during the current request.
+    Registered as a Flask teardown_appcontext handler in api/app.py.
+    """
+    from flask import g
+    for db in g.pop("db_sessions", []):
         db.close()
 
 
@@ -85,6 +213,8 @@ def init_db():
     from database.models import (
         UserORM, ProjectORM, AssetORM, SubcontractorORM,
         ComplianceDocumentORM, AssetHistoryORM, PlaceORM,
+        ChangeLogORM, ChangeLogPendingORM, ExpiryAlertORM, ExpiryCheckShardORM,
+        ExpiryCheckRunORM, JobORM, IdempotencyKeyORM, SyncKeyORM,
         project_subcontractors
     )
     
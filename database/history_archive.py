@@ -0,0 +1,276 @@
+"""
+Cold storage for old asset_history months as compressed Parquet files.
+One file per month, sorted by asset_id so per-row-group min/max
+statistics let a single asset's history be read without scanning the
+file. manifest.json lists the archived months.
+
+Requires pyarrow (optional; only needed once something is archived).
+"""
+import bisect
+import json
+import os
+import threading
+from datetime import datetime
+
+from sqlalchemy import select, text, delete, func
+
+from database.models import AssetHistoryORM
+from database.partitions import (
+    add_months, month_start, attached_partitions, detached_partitions, ensure_partitions, PARENT
+)
+
+COLUMNS = ("id", "asset_id", "project_id", "moved_at", "moved_by")
+ROW_GROUP_SIZE = 16384
+BATCH_SIZE = 50000
+MANIFEST = "manifest.json"
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise RuntimeError("Archiving asset_history requires pyarrow (pip install pyarrow)") from e
+    return pyarrow
+
+
+class HistoryArchive:
+    """Directory of archived asset_history months."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._manifest = None
+        self._manifest_mtime = None
+        self._row_groups = {}       # path -> (mtime, metadata, [(index, min asset_id, max asset_id)])
+
+    def _manifest_path(self):
+        return os.path.join(self.directory, MANIFEST)
+
+    def months(self):
+        """{"YYYY-MM": {"file", "rows"}} for every archived month."""
+        path = self._manifest_path()
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return {}
+        with self._lock:
+            if mtime != self._manifest_mtime:
+                with open(path) as f:
+                    self._manifest = json.load(f)
+                self._manifest_mtime = mtime
+            return dict(self._manifest)
+
+    def _record_month(self, key, filename, rows):
+        months = self.months()
+        months[key] = {"file": filename, "rows": rows}
+        tmp = self._manifest_path() + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(dict(sorted(months.items())), f, indent=2)
+        os.replace(tmp, self._manifest_path())
+
+    def write_month(self, month, batches):
+        """
+        Write one month from an iterable of row-dict batches sorted by
+        asset_id, then add it to the manifest.
+
+        Returns:
+            Rows written
+        """
+        pa = _pyarrow()
+        schema = pa.schema([
+            ("id", pa.string()),
+            ("asset_id", pa.string()),
+            ("project_id", pa.string()),
+            ("moved_at", pa.timestamp("us")),
+            ("moved_by", pa.string()),
+        ])
+        os.makedirs(self.directory, exist_ok=True)
+        key = f"{month:%Y-%m}"
+        filename = f"asset_history_{month:%Y_%m}.parquet"
+        path = os.path.join(self.directory, filename)
+
+        rows = 0
+        tmp = path + ".tmp"
+        with pa.parquet.ParquetWriter(tmp, schema, compression="zstd") as writer:
+            for batch in batches:
+                if batch:
+                    writer.write_table(pa.Table.from_pylist(batch, schema=schema), row_group_size=ROW_GROUP_SIZE)
+                    rows += len(batch)
+
+        # A month archived twice (e.g. rows that arrived late) keeps both files' rows
+        previous = self.months().get(key)
+        if previous:
+            old = pa.parquet.read_table(os.path.join(self.directory, previous["file"]), schema=schema)
+            combined = pa.concat_tables([old, pa.parquet.read_table(tmp, schema=schema)])
+            combined = combined.sort_by([("asset_id", "ascending"), ("moved_at", "ascending")])
+            pa.parquet.write_table(combined, tmp, compression="zstd", row_group_size=ROW_GROUP_SIZE)
+            rows = combined.num_rows
+
+        written = pa.parquet.ParquetFile(tmp).metadata.num_rows
+        if written != rows:
+            os.remove(tmp)
+            raise RuntimeError(f"Archive of {key} has {written} rows, expected {rows}")
+        os.replace(tmp, path)
+        self._record_month(key, filename, rows)
+        return rows
+
+    def _row_groups_for(self, path):
+        pa = _pyarrow()
+        mtime = os.path.getmtime(path)
+        cached = self._row_groups.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1], cached[2]
+        metadata = pa.parquet.ParquetFile(path).metadata
+        column = COLUMNS.index("asset_id")
+        groups = []
+        for i in range(metadata.num_row_groups):
+            stats = metadata.row_group(i).column(column).statistics
+            groups.append((i, stats.min if stats else None, stats.max if stats else None))
+        self._row_groups[path] = (mtime, metadata, groups)
+        return metadata, groups
+
+    def read(self, asset_ids=None, start=None, end=None):
+        """
+        Archived rows as dicts, optionally limited to some assets and to
+        moved_at in [start, end). Months outside the range are skipped by
+        file, and row groups whose asset_id range misses every requested
+        asset are never read.
+        """
+        rows = []
+        for table in self._tables(asset_ids=asset_ids, start=start, end=end):
+            rows.extend(table.to_pylist())
+        return rows
+
+    def read_table(self, asset_range=None, start=None, end=None):
+        """
+        Archived rows with asset_id in asset_range ((low, high), high
+        exclusive, either side None for unbounded) and moved_at in
+        [start, end), as one pyarrow Table, or None if nothing matches.
+        """
+        tables = list(self._tables(asset_range=asset_range, start=start, end=end))
+        if not tables:
+            return None
+        return _pyarrow().concat_tables(tables)
+
+    def _tables(self, asset_ids=None, asset_range=None, start=None, end=None):
+        months = self.months()
+        if not months:
+            return
+        pa = _pyarrow()
+        import pyarrow.compute as pc
+
+        wanted = sorted(set(asset_ids)) if asset_ids is not None else None
+        low, high = asset_range or (None, None)
+        for key, entry in months.items():
+            month = datetime.strptime(key, "%Y-%m")
+            if start is not None and add_months(month, 1) <= start:
+                continue
+            if end is not None and month >= end:
+                continue
+            path = os.path.join(self.directory, entry["file"])
+            metadata, groups = self._row_groups_for(path)
+            selected = [
+                i for i, group_low, group_high in groups
+                if (wanted is None or _overlaps(wanted, group_low, group_high))
+                and _in_range(low, high, group_low, group_high)
+            ]
+            if not selected:
+                continue
+            table = pa.parquet.ParquetFile(path, metadata=metadata).read_row_groups(selected)
+            if wanted is not None:
+                table = table.filter(pc.is_in(table["asset_id"], value_set=pa.array(wanted)))
+            if low is not None:
+                table = table.filter(pc.greater_equal(table["asset_id"], pa.scalar(low)))
+            if high is not None:
+                table = table.filter(pc.less(table["asset_id"], pa.scalar(high)))
+            if start is not None:
+                table = table.filter(pc.greater_equal(table["moved_at"], pa.scalar(start, pa.timestamp("us"))))
+            if end is not None:
+                table = table.filter(pc.less(table["moved_at"], pa.scalar(end, pa.timestamp("us"))))
+            if table.num_rows:
+                yield table
+
+
+def _overlaps(sorted_ids, low, high):
+    """True if any of sorted_ids falls within [low, high] (unknown bounds match)."""
+    if low is None or high is None:
+        return True
+    index = bisect.bisect_left(sorted_ids, low)
+    return index < len(sorted_ids) and sorted_ids[index] <= high
+
+
+def _in_range(low, high, group_low, group_high):
+    """True if [group_low, group_high] meets [low, high) (unknown bounds match)."""
+    if group_low is None or group_high is None:
+        return True
+    return (low is None or group_high >= low) and (high is None or group_low < high)
+
+
+def _batches(conn, statement, params=None):
+    result = conn.execution_options(stream_results=True, yield_per=BATCH_SIZE).execute(statement, params or {})
+    for partition in result.mappings().partitions(BATCH_SIZE):
+        yield [dict(row) for row in partition]
+
+
+def archive_history(engine, archive, hot_months, dry_run=False, log=print):
+    """
+    Move every month older than hot_months (counting the current month)
+    from asset_history to the archive.
+
+    PostgreSQL: each old partition is detached, exported and dropped.
+    Partitions left detached by an interrupted run are picked up again.
+    Other databases: each old month is exported and its rows deleted.
+
+    Returns:
+        {"YYYY-MM": rows archived}
+    """
+    cutoff = add_months(month_start(datetime.utcnow()), -(hot_months - 1))
+    archived = {}
+
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            ensure_partitions(conn)
+            months = {m: n for m, n in attached_partitions(conn).items() if m < cutoff}
+            months.update({m: n for m, n in detached_partitions(conn).items() if m < cutoff})
+            attached = attached_partitions(conn)
+        for month, name in sorted(months.items()):
+            if dry_run:
+                log(f"Would archive {name}")
+                continue
+            # Detach first (own transaction) so the export reads a table no one writes to
+            if month in attached:
+                with engine.begin() as conn:
+                    conn.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name}"))
+            with engine.connect() as conn:
+                rows = archive.write_month(month, _batches(conn, text(
+                    f"SELECT {', '.join(COLUMNS)} FROM {name} ORDER BY asset_id, moved_at"
+                )))
+            with engine.begin() as conn:
+                conn.execute(text(f"DROP TABLE {name}"))
+            archived[f"{month:%Y-%m}"] = rows
+            log(f"Archived {name}: {rows:,} rows")
+        return archived
+
+    table = AssetHistoryORM.__table__
+    with engine.connect() as conn:
+        oldest = conn.execute(select(func.min(table.c.moved_at))).scalar()
+    month = month_start(oldest) if oldest else cutoff
+    while month < cutoff:
+        end = add_months(month, 1)
+        in_month = (table.c.moved_at >= month) & (table.c.moved_at < end)
+        if dry_run:
+            log(f"Would archive {month:%Y-%m}")
+        else:
+            with engine.begin() as conn:
+                count = conn.execute(select(func.count()).select_from(table).where(in_month)).scalar()
+                if count:
+                    rows = archive.write_month(month, _batches(
+                        conn, select(*[table.c[c] for c in COLUMNS]).where(in_month)
+                        .order_by(table.c.asset_id, table.c.moved_at)
+                    ))
+                    conn.execute(delete(table).where(in_month))
+                    archived[f"{month:%Y-%m}"] = rows
+                    log(f"Archived {month:%Y-%m}: {rows:,} rows")
+        month = end
+    return archived
@@ -3,8 +3,9 @@ Database initialization script for Site-Steward.
 Creates all tables and optionally seeds initial data.
 
 Usage:
-    python database/init_db.py           # Create tables only
-    python database/init_db.py --seed    # Create tables and seed data
+    python database/init_db.py                        # Create tables only
+    python database/init_db.py --seed                 # Create tables and seed data
+    python database/init_db.py --seed --scale 100000  # Load a synthetic dataset instead
 
 Docker Usage:
     docker-compose exec api python database/init_db.py --seed
@@ -14,7 +15,9 @@ from database.models import (
     UserORM, ProjectORM, AssetORM, SubcontractorORM,
     ComplianceDocumentORM, AssetHistoryORM, PlaceORM
 )
+import argparse
 import sys
+import time
 import uuid
 from datetime import datetime, timedelta
 import bcrypt
@@ -170,9 +173,50 @@ def seed_data():
         db.close()
 
 
+def seed_synthetic_data(scale, workers, seed):
+    """
+    Load a high-volume synthetic dataset for load tests and index tuning.
+    See database/synthetic.py for the distributions.
+    """
+    from database.synthetic import SyntheticScale, generate
+    
+    dataset = SyntheticScale(scale)
+    print(f"Seeding synthetic data: {dataset.as_dict()}")
+    start = time.perf_counter()
+    
+    try:
+        counts = generate(engine, dataset, seed=seed, workers=workers)
+    except Exception as e:
+        print(f"✗ Error seeding synthetic data: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+    
+    elapsed = time.perf_counter() - start
+    total = sum(counts.values())
+    for table, n in counts.items():
+        print(f"  {table}: {n:,}")
+    print(f"✓ Loaded {total:,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s).")
+    print("\nCredentials:")
+    print("  Admin - username: admin, password: admin123")
+    print("  Foremen - username: foreman1, foreman2, ..., password: foreman123")
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create the Site-Steward tables and optionally seed data.")
+    parser.add_argument('--seed', action='store_true', help="Seed data after creating the tables")
+    parser.add_argument('--scale', type=int,
+                        help="With --seed, load a synthetic dataset with this many assets (about 4 rows per asset)")
+    parser.add_argument('--workers', type=int, default=4, help="Parallel loaders for --scale")
+    parser.add_argument('--random-seed', type=int, default=42, help="Random seed for --scale")
+    args = parser.parse_args()
+    if args.scale is not None and not args.seed:
+        parser.error("--scale requires --seed")
+    
     init_db()
     
     # Optionally seed data
-    if len(sys.argv) > 1 and sys.argv[1] == '--seed':
-        seed_data()
\ No newline at end of file
+    if args.scale is not None:
+        seed_synthetic_data(args.scale, args.workers, args.random_seed)
+    elif args.seed:
+        seed_data()
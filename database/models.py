@@ -1,4 +1,5 @@
-from sqlalchemy import Column, String, ForeignKey, DateTime, Date, Table
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, ForeignKey, DateTime, Date, Table, Index, DDL, JSON, LargeBinary, Text, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database.db import Base
@@ -8,7 +9,9 @@ project_subcontractors = Table(
     'project_subcontractors',
     Base.metadata,
     Column('project_id', String, ForeignKey('projects.id'), primary_key=True),
-    Column('subcontractor_id', String, ForeignKey('subcontractors.id'), primary_key=True)
+    Column('subcontractor_id', String, ForeignKey('subcontractors.id'), primary_key=True),
+    # The primary key only serves lookups by project
+    Index('ix_project_subcontractors_subcontractor_id', 'subcontractor_id')
 )
 
 
@@ -54,6 +57,8 @@ class AssetORM(Base):
     name = Column(String, nullable=False)
     category = Column(String, nullable=False)
     project_id = Column(String, ForeignKey("projects.id"), nullable=True)
+    # Bumped whenever project_id is set (services/asset_moves.py)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
     
@@ -93,7 +98,7 @@ class ComplianceDocumentORM(Base):
     subcontractor_id = Column(String, ForeignKey("subcontractors.id"), nullable=False)
     document_type = Column(String, nullable=False)
     file_path = Column(String, nullable=False)
-    expiry_date = Column(Date, nullable=False)
+    expiry_date = Column(Date, nullable=False, index=True)
     uploaded_at = Column(DateTime, server_default=func.now())
     
     # Relationships
@@ -101,13 +106,26 @@ class ComplianceDocumentORM(Base):
 
 
 class AssetHistoryORM(Base):
-    """Asset history model for tracking movements."""
+    """
+    Asset history model for tracking movements.
+    
+    On PostgreSQL the table is range-partitioned by month of moved_at
+    (see database/partitions.py), so moved_at is part of the primary key
+    and always set on insert. Months older than HISTORY_HOT_MONTHS are
+    moved to Parquet files by scripts/archive_history.py; read full
+    histories through services/history_store.py.
+    """
     __tablename__ = "asset_history"
+    __table_args__ = (
+        # One asset's moves in time order: point-in-time lookups and analytics
+        Index("ix_asset_history_asset_id_moved_at", "asset_id", "moved_at"),
+        {"postgresql_partition_by": "RANGE (moved_at)"},
+    )
 
     id = Column(String, primary_key=True)
     asset_id = Column(String, ForeignKey("assets.id"), nullable=False)
     project_id = Column(String, ForeignKey("projects.id"), nullable=True)
-    moved_at = Column(DateTime, server_default=func.now())
+    moved_at = Column(DateTime, primary_key=True, default=datetime.utcnow, server_default=func.now())
     moved_by = Column(String, ForeignKey("users.id"), nullable=True)
     
     # Relationships
@@ -123,4 +141,174 @@ class PlaceORM(Base):
     id = Column(String, primary_key=True)    
     name = Column(String)
     location = Column(String)
-    assets = relationship("AssetORM", back_populates="place")
\ No newline at end of file
+    assets = relationship("AssetORM", back_populates="place")
+
+
+class ChangeLogORM(Base):
+    """Append-only change log backing the delta-sync change feed."""
+    __tablename__ = "change_log"
+
+    seq = Column(Integer, primary_key=True, autoincrement=True)  # Monotonic cursor
+    entity = Column(String, nullable=False)  # 'asset', 'project', 'subcontractor', 'document', 'asset_history'
+    entity_id = Column(String, nullable=False)
+    operation = Column(String, nullable=False)  # 'insert', 'update' or 'delete'
+    changed_at = Column(DateTime, server_default=func.now())
+
+
+class ChangeLogPendingORM(Base):
+    """
+    Change log rows committed on PostgreSQL but not yet given a seq
+    (see database/change_feed.py). Emptied into change_log right after
+    each writing transaction commits.
+    """
+    __tablename__ = "change_log_pending"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)  # Write order within the table
+    entity = Column(String, nullable=False)
+    entity_id = Column(String, nullable=False)
+    operation = Column(String, nullable=False)
+    changed_at = Column(DateTime, server_default=func.now())
+
+
+class ExpiryAlertORM(Base):
+    """
+    Expiry alerts already sent by the expiry scheduler.
+    
+    Keyed by expiry date as well, so a renewed document is alerted again
+    at its new thresholds. Rows outlive deleted documents.
+    """
+    __tablename__ = "expiry_alerts"
+
+    document_id = Column(String, primary_key=True)
+    threshold_days = Column(Integer, primary_key=True)  # Days before expiry: 30, 7 or 0
+    expiry_date = Column(Date, primary_key=True)
+    sent_at = Column(DateTime, server_default=func.now())
+
+
+class ExpiryCheckShardORM(Base):
+    """
+    One row per shard of the daily expiry check (scripts/check_expiry.py).
+    
+    Workers lock a row to check its shard and stamp last_run_date when
+    done, so each shard is checked once a day across all nodes. The
+    documents found are kept for the day's digest email.
+    """
+    __tablename__ = "expiry_check_shards"
+
+    shard = Column(Integer, primary_key=True, autoincrement=False)
+    last_run_date = Column(Date, nullable=True)  # Day the shard was last checked
+    checked_by = Column(String, nullable=True)  # host:pid of that worker
+    checked_at = Column(DateTime, nullable=True)
+    documents = Column(JSON, nullable=True)  # [document_id, expiry_date] pairs found, for the digest
+
+
+class ExpiryCheckRunORM(Base):
+    """
+    One row per day the expiry check finished every shard.
+    
+    The worker that inserts the row queues the day's digest email, so
+    the digest is queued once even when workers finish together.
+    """
+    __tablename__ = "expiry_check_runs"
+
+    run_date = Column(Date, primary_key=True)
+    queued_by = Column(String, nullable=False)  # host:pid of the worker that queued the digest
+    queued_at = Column(DateTime, nullable=False)
+
+
+class JobORM(Base):
+    """
+    Background job run by scripts/job_worker.py (see services/job_queue.py).
+    
+    run_at is when the job next becomes visible to workers: the time it
+    was queued for, its retry time after a failure, or the end of the
+    visibility timeout while a worker holds it.
+    """
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    kind = Column(String, nullable=False)  # Handler name, e.g. 'expiry_email'
+    payload = Column(JSON, nullable=False)
+    priority = Column(Integer, nullable=False, default=0)  # Higher runs first
+    status = Column(String, nullable=False, default="queued")  # 'queued', 'running', 'done' or 'failed'
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    run_at = Column(DateTime, nullable=False)
+    locked_by = Column(String, nullable=True)  # host:pid of the worker holding the job
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, server_default=func.now())
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # Dequeue: visible jobs by priority, then age
+        Index('ix_jobs_dequeue', 'status', 'priority', 'run_at'),
+    )
+
+
+class IdempotencyKeyORM(Base):
+    """
+    Response of a request sent with an Idempotency-Key header, replayed
+    to retries of that request (see api/middleware/idempotency.py).
+    
+    A row without status_code is a request still in progress.
+    """
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String, primary_key=True)  # SHA-256 of user, method, path and client key
+    request_hash = Column(String, nullable=False)  # SHA-256 of the request body
+    status_code = Column(Integer, nullable=True)
+    content_type = Column(String, nullable=True)
+    body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime, nullable=False, index=True)  # UTC; expiry counts from here
+
+
+class SyncKeyORM(Base):
+    """
+    Idempotency key of every move replayed through POST /api/assets/sync.
+    
+    asset_history is keyed by (id, moved_at), so its id alone cannot
+    stop two concurrent replays of one offline queue from both recording
+    a move. The key is inserted here first, in the same transaction as
+    the history row, and the primary key lets only one replay record it.
+    """
+    __tablename__ = "sync_keys"
+
+    key = Column(String, primary_key=True)  # Client's idempotency key, also the history row ID
+    asset_id = Column(String, nullable=False)
+    synced_at = Column(DateTime, nullable=False)  # UTC
+
+
+# Trigram indexes behind GET /api/search (Postgres only, other databases
+# use the in-memory index in services/search_index.py)
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
+
+for _table, _column in (
+    (AssetORM.__table__, "name"),
+    (AssetORM.__table__, "category"),
+    (SubcontractorORM.__table__, "name"),
+    (SubcontractorORM.__table__, "email"),
+    (ProjectORM.__table__, "name"),
+    (ProjectORM.__table__, "location"),
+):
+    Index(
+        f"ix_{_table.name}_{_column}_trgm",
+        _table.c[_column],
+        postgresql_using="gin",
+        postgresql_ops={_column: "gin_trgm_ops"},
+    ).ddl_if(dialect="postgresql")
+
+
+# Monthly partitions for asset_history (Postgres only)
+@event.listens_for(AssetHistoryORM.__table__, "after_create")
+def _create_history_partitions(target, connection, **kw):
+    if connection.dialect.name == "postgresql":
+        from database.partitions import ensure_partitions
+        ensure_partitions(connection)
+
+
+# Register the session hook that fills change_log
+import database.change_feed  # noqa: E402,F401
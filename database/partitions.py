@@ -0,0 +1,159 @@
+"""
+Monthly range partitions for asset_history on PostgreSQL.
+Each calendar month of moved_at lives in its own partition named
+asset_history_pYYYY_MM; rows outside every partition land in
+asset_history_default until ensure_partitions gives them a month.
+"""
+import re
+from datetime import datetime
+
+from sqlalchemy import text
+
+PARENT = "asset_history"
+DEFAULT_PARTITION = "asset_history_default"
+MONTHS_AHEAD = 3
+
+_NAME_RE = re.compile(r"^asset_history_p(\d{4})_(\d{2})$")
+
+
+def month_start(value):
+    """First instant of the month containing value."""
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f"{PARENT}_p{month.year:04d}_{month.month:02d}"
+
+
+def partition_month(name):
+    """Month a partition name stands for, or None for other tables."""
+    match = _NAME_RE.match(name)
+    return datetime(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+def attached_partitions(conn):
+    """{month: name} of the monthly partitions currently attached."""
+    rows = conn.execute(text("""
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = CAST(:parent AS regclass)
+    """), {"parent": PARENT}).scalars()
+    return {partition_month(name): name for name in rows if partition_month(name)}
+
+
+def detached_partitions(conn):
+    """{month: name} of monthly partition tables no longer attached (mid-archive)."""
+    names = conn.execute(text(
+        "SELECT tablename FROM pg_tables WHERE schemaname = current_schema() AND tablename LIKE :pattern"
+    ), {"pattern": f"{PARENT}_p%"}).scalars()
+    attached = set(attached_partitions(conn).values())
+    return {partition_month(n): n for n in names if partition_month(n) and n not in attached}
+
+
+def ensure_partitions(conn, months_ahead=MONTHS_AHEAD, since=None):
+    """
+    Create the default partition and a partition for every month from
+    the oldest row in the default partition (or since, or the current
+    month, whichever is earliest) up to months_ahead months from now.
+
+    Rows already in the default partition for a new month are moved into
+    it: the default is detached while the month is split out, because
+    PostgreSQL refuses to create a partition whose range overlaps rows
+    in the default.
+
+    Returns:
+        Names of the partitions created
+    """
+    conn.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT} DEFAULT"))
+
+    oldest = conn.execute(text(f"SELECT min(moved_at) FROM {DEFAULT_PARTITION}")).scalar()
+    current = month_start(datetime.utcnow())
+    month = month_start(min(d for d in (oldest, since, current) if d is not None))
+    last = add_months(current, months_ahead)
+
+    existing = attached_partitions(conn)
+    created = []
+    while month <= last:
+        if month not in existing:
+            _create_partition(conn, month)
+            created.append(partition_name(month))
+        month = add_months(month, 1)
+    return created
+
+
+def _create_partition(conn, month):
+    name = partition_name(month)
+    bounds = {"start": month, "end": add_months(month, 1)}
+    in_default = conn.execute(text(
+        f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE moved_at >= :start AND moved_at < :end)"
+    ), bounds).scalar()
+
+    if in_default:
+        conn.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {DEFAULT_PARTITION}"))
+
+    conn.execute(text(
+        f"CREATE TABLE {name} PARTITION OF {PARENT} "
+        f"FOR VALUES FROM ('{bounds['start']:%Y-%m-%d}') TO ('{bounds['end']:%Y-%m-%d}')"
+    ))
+
+    if in_default:
+        conn.execute(text(
+            f"INSERT INTO {name} SELECT * FROM {DEFAULT_PARTITION} WHERE moved_at >= :start AND moved_at < :end"
+        ), bounds)
+        conn.execute(text(
+            f"DELETE FROM {DEFAULT_PARTITION} WHERE moved_at >= :start AND moved_at < :end"
+        ), bounds)
+        conn.execute(text(f"ALTER TABLE {PARENT} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+
+
+def convert_to_partitioned(conn):
+    """
+    One-off migration of an existing, unpartitioned asset_history table.
+
+    Renames the old table, creates the partitioned one from the model,
+    copies the rows (they fall into the default partition first) and
+    splits them into monthly partitions. Runs in the caller's
+    transaction, so a failure leaves the old table in place.
+
+    Returns:
+        Number of rows copied, or None if the table is already partitioned
+    """
+    from database.models import AssetHistoryORM
+
+    partitioned = conn.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = CAST(:parent AS regclass))"
+    ), {"parent": PARENT}).scalar()
+    if partitioned:
+        return None
+
+    legacy = f"{PARENT}_unpartitioned"
+    conn.execute(text(f"ALTER TABLE {PARENT} RENAME TO {legacy}"))
+    # Free the constraint and index names for the new table
+    constraints = conn.execute(text(
+        "SELECT conname FROM pg_constraint WHERE conrelid = CAST(:t AS regclass) AND contype IN ('p', 'f')"
+    ), {"t": legacy}).scalars().all()
+    for constraint in constraints:
+        conn.execute(text(f'ALTER TABLE {legacy} DROP CONSTRAINT "{constraint}"'))
+    indexes = conn.execute(text(
+        "SELECT indexname FROM pg_indexes WHERE schemaname = current_schema() AND tablename = :t"
+    ), {"t": legacy}).scalars().all()
+    for index in indexes:
+        conn.execute(text(f'DROP INDEX "{index}"'))
+
+    # after_create adds the default and current partitions; then cover
+    # every month the old rows span so they are copied straight in
+    AssetHistoryORM.__table__.create(conn)
+    oldest = conn.execute(text(f"SELECT min(moved_at) FROM {legacy}")).scalar()
+    ensure_partitions(conn, since=oldest)
+    copied = conn.execute(text(
+        f"INSERT INTO {PARENT} (id, asset_id, project_id, moved_at, moved_by) "
+        f"SELECT id, asset_id, project_id, COALESCE(moved_at, now()), moved_by FROM {legacy}"
+    )).rowcount
+    conn.execute(text(f"DROP TABLE {legacy}"))
+    return copied
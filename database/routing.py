@@ -0,0 +1,188 @@
+"""
+Read-replica routing for SQLAlchemy sessions.
+Read-only work goes to a healthy replica chosen round-robin; writes, and
+reads by a user who has just written, go to the primary.
+"""
+import itertools
+import logging
+import threading
+import time
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Delete, Insert, Update
+
+logger = logging.getLogger(__name__)
+
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Seconds the replica is behind. Zero when it has replayed everything it
+# received, so an idle primary does not look like lag.
+POSTGRES_LAG_QUERY = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+class ReplicaSet:
+    """
+    Replica engines with cached health checks and round-robin selection.
+
+    A replica is healthy if a lag query succeeds and reports no more than
+    max_lag seconds. Each replica is re-checked at most once every
+    check_interval seconds; between checks the last result is used.
+    """
+
+    def __init__(self, engines, max_lag=5.0, check_interval=5.0, lag_query=None):
+        self.engines = list(engines)
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.lag_query = lag_query
+        self._cycle = itertools.cycle(range(len(self.engines))) if self.engines else None
+        self._cycle_lock = threading.Lock()
+        self._health = {}   # engine index -> (healthy, checked_at)
+        for engine in self.engines:
+            event.listen(engine, "handle_error", self._on_error)
+
+    def _on_error(self, context):
+        # A dropped connection takes the replica out until its next check
+        if context.is_disconnect and context.engine is not None:
+            self.mark_failed(context.engine)
+
+    def measure_lag(self, engine):
+        """Replication lag of one replica in seconds; raises if unreachable."""
+        query = self.lag_query
+        if query is None:
+            query = POSTGRES_LAG_QUERY if engine.dialect.name == "postgresql" else "SELECT 0"
+        with engine.connect() as conn:
+            return float(conn.execute(text(query)).scalar() or 0)
+
+    def is_healthy(self, index):
+        healthy, checked_at = self._health.get(index, (None, 0.0))
+        now = time.monotonic()
+        if healthy is not None and now - checked_at < self.check_interval:
+            return healthy
+
+        engine = self.engines[index]
+        try:
+            lag = self.measure_lag(engine)
+            healthy = lag <= self.max_lag
+            if not healthy:
+                logger.warning("Replica %s is %.1fs behind; reading from the primary", _name(engine), lag)
+        except Exception as e:
+            healthy = False
+            logger.warning("Replica %s failed its health check: %s", _name(engine), e)
+        self._health[index] = (healthy, now)
+        return healthy
+
+    def mark_failed(self, engine):
+        """Take a replica out of rotation until its next health check."""
+        for index, candidate in enumerate(self.engines):
+            if candidate is engine:
+                self._health[index] = (False, time.monotonic())
+
+    def choose(self):
+        """Next healthy replica in round-robin order, or None."""
+        if not self.engines:
+            return None
+        for _ in range(len(self.engines)):
+            with self._cycle_lock:
+                index = next(self._cycle)
+            if self.is_healthy(index):
+                return self.engines[index]
+        return None
+
+
+class WritePins:
+    """
+    Users who wrote recently, so their reads stay on the primary.
+
+    Held in process memory: with several API worker processes a user's
+    next request can reach a worker that has not seen the write, so keep
+    the window longer than the usual replica lag rather than relying on
+    it alone.
+    """
+
+    def __init__(self, window=10.0):
+        self.window = window
+        self._until = {}
+        self._lock = threading.Lock()
+
+    def pin(self, key):
+        if key is None or self.window <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._until[key] = now + self.window
+            if len(self._until) > 10000:
+                self._until = {k: t for k, t in self._until.items() if t > now}
+
+    def is_pinned(self, key):
+        if key is None:
+            return False
+        until = self._until.get(key)
+        return until is not None and until > time.monotonic()
+
+
+class RoutingSession(Session):
+    """
+    Session that sends read-only work to a replica.
+
+    read_only=True routes every read to a replica (scripts), False never
+    does, and None (the default) decides per Flask request: GET, HEAD and
+    OPTIONS requests read from a replica unless the user wrote within the
+    pin window. Writes and flushes always use the primary. Once a session
+    has written, its later reads use the primary too. A replica is chosen
+    once per session so all its reads see one consistent database.
+    """
+
+    def __init__(self, *args, replicas=None, pins=None, read_only=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+        self.pins = pins
+        self.read_only = read_only
+        self._replica = None
+        self._primary_only = False
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._flushing or isinstance(clause, (Insert, Update, Delete)):
+            self._primary_only = True
+            if self.pins is not None:
+                self.pins.pin(_current_user())
+        if self._primary_only or self.replicas is None or not self._use_replica():
+            return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+        if self._replica is None:
+            self._replica = self.replicas.choose()
+            if self._replica is None:
+                # No healthy replica; stay on the primary for this session
+                self._primary_only = True
+                return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+        return self._replica
+
+    def _use_replica(self):
+        if self.read_only is not None:
+            return self.read_only
+        try:
+            from flask import has_request_context, request
+        except ImportError:
+            return False
+        if not has_request_context() or request.method not in READ_METHODS:
+            return False
+        return self.pins is None or not self.pins.is_pinned(_current_user())
+
+
+def _current_user():
+    """JWT identity of the current request, if one has been verified."""
+    try:
+        from flask_jwt_extended import get_jwt_identity
+        return get_jwt_identity()
+    except Exception:
+        return None
+
+
+def _name(engine):
+    return engine.url.render_as_string(hide_password=True)
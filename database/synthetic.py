@@ -0,0 +1,316 @@
+"""
+High-volume synthetic data for load tests and index tuning.
+Generates deterministic, deliberately skewed data and bulk loads it in
+parallel chunks: COPY on PostgreSQL (psycopg2), executemany elsewhere.
+
+Distributions:
+    - Project sizes follow a Zipf curve, so a few projects hold most assets.
+    - asset_history depth is long-tailed: most assets moved a handful of
+      times, a few hot assets moved hundreds of times. Each asset's
+      latest history row matches its current project.
+    - Subcontractors work on a long-tailed number of projects; a few are
+      on dozens.
+    - Document expiry dates cluster around the 30-day compliance
+      threshold, with a share already expired and the rest spread out
+      over the next year.
+
+Usage:
+    python -m database.init_db --seed --scale 1250000
+"""
+import bisect
+import csv
+import io
+import random
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import bcrypt
+from sqlalchemy import insert, text
+
+from database.models import (
+    UserORM, ProjectORM, AssetORM, SubcontractorORM,
+    ComplianceDocumentORM, AssetHistoryORM, project_subcontractors
+)
+
+CHUNK_SIZE = 20000
+DEFAULT_WORKERS = 4
+MAX_HISTORY_DEPTH = 500
+EXPIRY_THRESHOLD_DAYS = 30
+HISTORY_DAYS = 730              # asset_history goes back up to two years
+
+ADMIN_USERNAME = "admin"
+ADMIN_PASSWORD = "admin123"
+FOREMAN_PASSWORD = "foreman123"
+
+ITEMS = ["Excavator", "Generator", "Hammer Drill", "Scaffolding Set", "Compressor", "Skid Steer",
+         "Concrete Mixer", "Laser Level", "Pressure Washer", "Welder", "Light Tower", "Trench Box"]
+MAKES = ["CAT", "Deere", "Bobcat", "Makita", "DeWalt", "Hilti", "Bosch", "Honda", "Kubota", "Volvo"]
+CATEGORIES = ["Heavy Equipment", "Power Tools", "Safety Equipment", "Power Equipment", "Survey"]
+TRADES = ["Electrical", "Plumbing", "Concrete", "Roofing", "Framing", "HVAC", "Drywall", "Excavation"]
+DOCUMENT_TYPES = ["Liability Insurance", "Workers Compensation Insurance", "Safety Certification"]
+
+# Entity codes mixed into the deterministic IDs
+_KINDS = {"user": 1, "project": 2, "subcontractor": 3, "asset": 4, "history": 5, "document": 6}
+
+
+class SyntheticScale:
+    """
+    Row counts for one synthetic dataset, derived from the asset count.
+
+    With the defaults a scale of N assets produces roughly 4N rows in
+    total, so --scale 1250000 is a ~5M-row dataset.
+    """
+
+    def __init__(self, assets, projects=None, subcontractors=None, users=None,
+                 history_depth=3, docs_per_subcontractor=len(DOCUMENT_TYPES)):
+        self.assets = assets
+        self.projects = projects or max(1, assets // 100)
+        self.subcontractors = subcontractors or max(1, assets // 50)
+        self.users = users or max(2, assets // 1000)
+        self.history_depth = history_depth      # mean asset_history rows per asset
+        self.docs_per_subcontractor = docs_per_subcontractor
+
+    def as_dict(self):
+        return dict(vars(self))
+
+
+def entity_id(kind, index, seed=42):
+    """
+    Deterministic UUID for the index-th row of an entity.
+
+    IDs are computed rather than stored, so chunks generated in parallel
+    can reference each other's rows without sharing lists.
+    """
+    value = ((seed & 0xFFFFFFFF) << 96) | (_KINDS[kind] << 64) | index
+    return str(uuid.UUID(int=value, version=4))
+
+
+def entity_ids(kind, count, seed=42):
+    """All IDs of an entity, e.g. for picking request targets in a benchmark."""
+    return [entity_id(kind, i, seed) for i in range(count)]
+
+
+def _zipf_cum_weights(n, exponent=1.0):
+    """Cumulative Zipf weights for rng.choices / bisect lookups."""
+    total = 0.0
+    cumulative = []
+    for rank in range(1, n + 1):
+        total += 1.0 / rank ** exponent
+        cumulative.append(total)
+    return cumulative
+
+
+def _long_tail(rng, mean, cap):
+    """Integer >= 1 from a Pareto distribution (alpha 1.5) with roughly the given mean."""
+    alpha = 1.5
+    scale = mean * (alpha - 1) / alpha
+    return max(1, min(cap, int(round(scale * rng.paretovariate(alpha)))))
+
+
+def _expiry_offset(rng):
+    """Days until a document expires, clustered around the 30-day threshold."""
+    roll = rng.random()
+    if roll < 0.15:
+        return -rng.randint(1, 180)                                   # already expired
+    if roll < 0.55:
+        return max(0, int(rng.gauss(EXPIRY_THRESHOLD_DAYS, 10)))      # either side of the threshold
+    return rng.randint(EXPIRY_THRESHOLD_DAYS + 1, 365)                # comfortably valid
+
+
+class _Plan:
+    """Everything a chunk generator needs, shared read-only across workers."""
+
+    def __init__(self, scale, seed, now):
+        self.scale = scale
+        self.seed = seed
+        self.now = now
+        self.project_weights = _zipf_cum_weights(scale.projects)
+        admin_hash = bcrypt.hashpw(ADMIN_PASSWORD.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+        foreman_hash = bcrypt.hashpw(FOREMAN_PASSWORD.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+        # Two bcrypt calls for the whole dataset; every foreman shares one hash
+        self.password_hashes = (admin_hash, foreman_hash)
+
+    def rng(self, table, chunk):
+        return random.Random(f"{self.seed}:{table}:{chunk}")
+
+    def pick_project(self, rng):
+        total = self.project_weights[-1]
+        return bisect.bisect_left(self.project_weights, rng.random() * total)
+
+
+def _users(plan, start, stop):
+    rows = []
+    for i in range(start, stop):
+        admin = i == 0
+        rows.append({
+            "id": entity_id("user", i, plan.seed),
+            "username": ADMIN_USERNAME if admin else f"foreman{i}",
+            "password_hash": plan.password_hashes[0 if admin else 1],
+            "role": "admin" if admin else "foreman",
+            "email": "admin@sitesteward.com" if admin else f"foreman{i}@sitesteward.com",
+        })
+    return {UserORM.__table__: rows}
+
+
+def _projects(plan, start, stop):
+    rng = plan.rng("projects", start)
+    return {ProjectORM.__table__: [{
+        "id": entity_id("project", i, plan.seed),
+        "name": f"{rng.choice(MAKES)} {rng.choice(['Tower', 'Plaza', 'Depot', 'Bridge', 'Campus'])} {i}",
+        "location": f"{rng.randint(1, 9999)} {rng.choice(['Main', 'Oak', 'Harbor', 'Mill'])} St",
+    } for i in range(start, stop)]}
+
+
+def _subcontractors(plan, start, stop):
+    """Subcontractors with their project links and compliance documents."""
+    rng = plan.rng("subcontractors", start)
+    scale = plan.scale
+    subcontractors, links, documents = [], [], []
+    for i in range(start, stop):
+        sid = entity_id("subcontractor", i, plan.seed)
+        subcontractors.append({
+            "id": sid,
+            "name": f"{rng.choice(TRADES)} Services {i}",
+            "email": f"sub{i}@example.com",
+            "phone": f"555-{i % 10000:04d}",
+        })
+        for p in rng.sample(range(scale.projects), _long_tail(rng, 3, scale.projects)):
+            links.append({"project_id": entity_id("project", p, plan.seed), "subcontractor_id": sid})
+        for n in range(scale.docs_per_subcontractor):
+            documents.append({
+                "id": entity_id("document", i * scale.docs_per_subcontractor + n, plan.seed),
+                "subcontractor_id": sid,
+                "document_type": DOCUMENT_TYPES[n % len(DOCUMENT_TYPES)],
+                "file_path": f"uploads/compliance/{sid}_{n}.pdf",
+                "expiry_date": (plan.now + timedelta(days=_expiry_offset(rng))).date(),
+            })
+    return {
+        SubcontractorORM.__table__: subcontractors,
+        project_subcontractors: links,
+        ComplianceDocumentORM.__table__: documents,
+    }
+
+
+def _assets(plan, start, stop):
+    """Assets with their movement history, oldest move first."""
+    rng = plan.rng("assets", start)
+    scale = plan.scale
+    assets, history = [], []
+    for i in range(start, stop):
+        aid = entity_id("asset", i, plan.seed)
+        depth = _long_tail(rng, scale.history_depth, MAX_HISTORY_DEPTH) if scale.history_depth else 0
+        # About one asset in twenty sits in the yard with no project
+        unassigned = rng.random() < 0.05
+        project = None
+        first_seen = plan.now - timedelta(days=rng.randint(30, HISTORY_DAYS))
+        span = plan.now - first_seen
+        for n, position in enumerate(sorted(rng.random() for _ in range(depth))):
+            project = plan.pick_project(rng)
+            history.append({
+                "id": entity_id("history", i * MAX_HISTORY_DEPTH + n, plan.seed),
+                "asset_id": aid,
+                "project_id": None if unassigned and n == depth - 1 else entity_id("project", project, plan.seed),
+                "moved_at": first_seen + span * position,
+                "moved_by": entity_id("user", rng.randrange(scale.users), plan.seed),
+            })
+        if project is None and not unassigned:
+            project = plan.pick_project(rng)
+        assets.append({
+            "id": aid,
+            "name": f"{rng.choice(MAKES)} {rng.choice(ITEMS)} {i}",
+            "category": rng.choice(CATEGORIES),
+            "project_id": None if unassigned else entity_id("project", project, plan.seed),
+        })
+    # Assets first: history rows reference them
+    return {AssetORM.__table__: assets, AssetHistoryORM.__table__: history}
+
+
+def _copy_rows(conn, table, rows):
+    """Stream rows into a table with COPY ... FROM STDIN (psycopg2 only)."""
+    columns = list(rows[0].keys())
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        # Unquoted empty fields are NULL in COPY's CSV format
+        writer.writerow(["" if row[c] is None else row[c] for c in columns])
+    buffer.seek(0)
+    cursor = conn.connection.driver_connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer
+        )
+    finally:
+        cursor.close()
+
+
+def _load_chunk(engine, generator, plan, start, stop, use_copy):
+    """Generate one chunk and load it in its own transaction."""
+    tables = generator(plan, start, stop)
+    counts = {}
+    with engine.begin() as conn:
+        for table, rows in tables.items():
+            if rows:
+                if use_copy:
+                    _copy_rows(conn, table, rows)
+                else:
+                    conn.execute(insert(table), rows)
+            counts[table.name] = len(rows)
+    return counts
+
+
+def generate(engine, scale, seed=42, workers=DEFAULT_WORKERS, chunk_size=CHUNK_SIZE):
+    """
+    Load a synthetic dataset into an empty schema.
+
+    Tables are loaded in dependency order (users, projects, then
+    subcontractors and assets); within each phase chunks are generated
+    and loaded concurrently on separate connections. SQLite allows a
+    single writer, so it is always loaded with one worker.
+
+    Args:
+        engine: SQLAlchemy engine for a database with the tables created
+        scale: SyntheticScale
+        seed: Random seed; the same seed and scale give the same data
+        workers: Concurrent chunk loaders
+        chunk_size: Parent rows (users, projects, ...) per chunk
+
+    Returns:
+        Dict of table name -> rows inserted
+    """
+    dialect = engine.dialect.name
+    use_copy = dialect == "postgresql" and engine.dialect.driver == "psycopg2"
+    if dialect == "sqlite":
+        workers = 1
+
+    plan = _Plan(scale, seed, datetime.utcnow())
+    phases = [
+        [(_users, scale.users), (_projects, scale.projects)],
+        [(_subcontractors, scale.subcontractors), (_assets, scale.assets)],
+    ]
+
+    if dialect == "postgresql":
+        # Monthly asset_history partitions for the whole date range, so
+        # rows are routed straight to them rather than the default
+        from database.partitions import ensure_partitions
+        with engine.begin() as conn:
+            ensure_partitions(conn, since=plan.now - timedelta(days=HISTORY_DAYS))
+
+    counts = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for phase in phases:
+            futures = [
+                pool.submit(_load_chunk, engine, generator, plan, start, min(start + chunk_size, total), use_copy)
+                for generator, total in phase
+                for start in range(0, total, chunk_size)
+            ]
+            for future in futures:
+                for table, n in future.result().items():
+                    counts[table] = counts.get(table, 0) + n
+
+    if dialect == "postgresql":
+        # Fresh statistics so the planner sees the new row counts
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("ANALYZE"))
+
+    return counts
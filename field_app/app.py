@@ -5,6 +5,8 @@ Handles authentication and main navigation.
 import streamlit as st
 from field_app.config import config
 from field_app.utils.auth import is_authenticated, login, logout
+from field_app.utils.api_client import APIClient, APIError
+from field_app.utils.offline_queue import get_offline_store
 
 
 # Page configuration - optimized for mobile
@@ -35,6 +37,37 @@ def show_login_page():
                 st.error("Please enter both username and password.")
 
 
+def show_sync_status():
+    """Replay moves queued offline and show what is still pending."""
+    store = get_offline_store()
+    
+    if store.pending_count():
+        try:
+            synced = store.sync(APIClient())
+            if synced:
+                st.success(f"🔄 Synced {synced} offline move(s)")
+        except APIError as e:
+            st.error(f"Sync failed: {e.message}")
+    
+    pending = store.pending_count()
+    if pending:
+        st.warning(f"📴 {pending} move(s) waiting for signal")
+        if st.button("🔄 Sync Now", use_container_width=True):
+            st.rerun()
+    
+    rejected = store.get_rejected_moves()
+    if rejected:
+        with st.expander(f"⚠️ {len(rejected)} move(s) rejected by the server"):
+            for move in rejected:
+                st.write(f"- {move['asset_id']} at {move['moved_at']}: {move['error']}")
+            if st.button("Dismiss", use_container_width=True):
+                store.clear_rejected()
+                st.rerun()
+    
+    if pending or rejected:
+        st.divider()
+
+
 def show_main_navigation():
     """Display main navigation page with two buttons."""
     st.title(f"{config.APP_ICON} Site-Steward Field App")
@@ -59,6 +92,8 @@ def show_main_navigation():
     
     st.divider()
     
+    show_sync_status()
+    
     # Logout button at bottom
     if st.button("🚪 Logout", use_container_width=True):
         logout()
@@ -27,6 +27,11 @@ class Config:
     QR_SCANNER_FPS = int(os.getenv('QR_SCANNER_FPS', '10'))
     QR_SCANNER_WIDTH = int(os.getenv('QR_SCANNER_WIDTH', '640'))
     QR_SCANNER_HEIGHT = int(os.getenv('QR_SCANNER_HEIGHT', '480'))
+    
+    # Offline queue configuration
+    OFFLINE_DB_PATH = os.getenv('OFFLINE_DB_PATH', 'field_app_offline.db')
+    OFFLINE_SYNC_BATCH_SIZE = int(os.getenv('OFFLINE_SYNC_BATCH_SIZE', '100'))
+    OFFLINE_CACHED_ASSETS = int(os.getenv('OFFLINE_CACHED_ASSETS', '500'))  # Recently scanned assets kept
 
 
 # Create global config instance
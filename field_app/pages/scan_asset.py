@@ -5,8 +5,9 @@ Allows foremen to scan asset QR codes and view asset details.
 import streamlit as st
 from field_app.config import config
 from field_app.utils.auth import require_auth
-from field_app.utils.api_client import APIClient
+from field_app.utils.api_client import APIClient, APIError
 from field_app.utils.qr_scanner import QRScanner
+from field_app.utils.offline_queue import get_offline_store
 
 
 # Page configuration
@@ -21,6 +22,52 @@ st.set_page_config(
 require_auth()
 
 
+def get_projects(client: APIClient) -> list:
+    """Fetch projects, falling back to the offline snapshot without signal."""
+    store = get_offline_store()
+    try:
+        projects = client.get("projects")
+        store.cache_projects(projects)
+        return projects
+    except APIError as e:
+        if not e.offline:
+            raise
+        st.caption("📴 Offline - showing cached projects")
+        return store.get_cached_projects()
+
+
+def move_or_queue(client: APIClient, asset_ids: list, project_id: str, version: int = None) -> str:
+    """
+    Move assets through the API, queueing them locally when offline.
+    
+    Args:
+        version: Version of a single asset as it was scanned, so the move
+            fails with 409 if someone else moved it meanwhile
+    
+    Returns:
+        Message to display to the user
+    """
+    try:
+        if len(asset_ids) == 1:
+            data = {'project_id': project_id}
+            if version is not None:
+                data['version'] = version
+            response = client.post(f"assets/{asset_ids[0]}/move", data=data)
+        else:
+            response = client.post(
+                "assets/move",
+                data={'asset_ids': asset_ids, 'project_id': project_id}
+            )
+        return response.get('message', 'Asset moved successfully!')
+    except APIError as e:
+        if not e.offline:
+            raise
+        store = get_offline_store()
+        for asset_id in asset_ids:
+            store.queue_move(asset_id, project_id)
+        return f"📴 Offline - {len(asset_ids)} move(s) saved and will sync when back online"
+
+
 def show_move_asset_form(asset: dict):
     """Display form to move asset to a different project."""
     st.subheader("📦 Move Asset")
@@ -30,7 +77,7 @@ def show_move_asset_form(asset: dict):
         client = APIClient()
         
         # Fetch all projects
-        projects = client.get("projects")
+        projects = get_projects(client)
         
         if not projects:
             st.warning("No projects available. Please create a project first.")
@@ -53,11 +100,8 @@ def show_move_asset_form(asset: dict):
             if st.button("✅ Confirm Move", use_container_width=True, type="primary"):
                 try:
                     project_id = project_options[selected_project_name]
-                    response = client.post(
-                        f"assets/{asset['id']}/move",
-                        data={'project_id': project_id}
-                    )
-                    st.success(f"✅ {response.get('message', 'Asset moved successfully!')}")
+                    message = move_or_queue(client, [asset['id']], project_id, asset.get('version'))
+                    st.success(f"✅ {message}")
                     
                     # Clear state and refresh
                     st.session_state.show_move_form = False
@@ -65,6 +109,16 @@ def show_move_asset_form(asset: dict):
                     st.session_state.scanned_asset_id = None
                     st.rerun()
                     
+                except APIError as e:
+                    if e.status_code != 409:
+                        st.error(f"Failed to move asset: {e.message}")
+                    else:
+                        current = (e.response_data or {}).get('asset') or {}
+                        st.warning(
+                            f"⚠️ Someone else moved this asset to "
+                            f"{current.get('project_name') or 'another project'} meanwhile. "
+                            "Scan it again to see where it is now."
+                        )
                 except Exception as e:
                     st.error(f"Failed to move asset: {str(e)}")
         
@@ -81,7 +135,20 @@ def show_asset_details(asset_id: str):
     """Fetch and display asset details."""
     try:
         client = APIClient()
-        asset = client.get(f"assets/{asset_id}")
+        store = get_offline_store()
+        store.record_scan(asset_id)
+        
+        try:
+            asset = client.get(f"assets/{asset_id}")
+            store.cache_asset(asset)
+        except APIError as e:
+            if not e.offline:
+                raise
+            asset = store.get_cached_asset(asset_id)
+            if asset is None:
+                # Unknown to this device, but a move can still be queued by ID
+                asset = {'id': asset_id, 'name': 'Not cached', 'category': 'N/A'}
+            st.caption("📴 Offline - showing cached asset details")
         
         st.success(f"✅ Asset Found: {asset.get('name', 'Unknown')}")
         
@@ -122,6 +189,81 @@ def show_asset_details(asset_id: str):
         st.session_state.scan_complete = False
 
 
+def get_bulk_scanner() -> QRScanner:
+    """Return the bulk scanner kept across reruns so its code set survives."""
+    if 'bulk_scanner' not in st.session_state:
+        st.session_state.bulk_scanner = QRScanner(bulk=True)
+    return st.session_state.bulk_scanner
+
+
+def show_bulk_scan():
+    """Scan many QR codes in one pass and move them to a project together."""
+    scanner = get_bulk_scanner()
+    
+    st.info("📱 Sweep your camera across all asset QR codes. Every code seen is collected.")
+    scanner.start_scanner()
+    
+    valid_ids, rejected = scanner.get_scanned_codes()
+    
+    st.divider()
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Assets Scanned", len(valid_ids))
+    with col2:
+        if st.button("🔄 Refresh List", use_container_width=True):
+            st.rerun()
+    
+    if rejected:
+        st.warning(f"Ignored {len(rejected)} code(s) that are not asset IDs.")
+    
+    if not valid_ids:
+        return
+    
+    with st.expander(f"Scanned assets ({len(valid_ids)})"):
+        for asset_id in valid_ids:
+            st.write(f"- {asset_id}")
+    
+    try:
+        client = APIClient()
+        projects = get_projects(client)
+    except Exception as e:
+        st.error(f"Failed to load projects: {str(e)}")
+        return
+    
+    if not projects:
+        st.warning("No projects available. Please create a project first.")
+        return
+    
+    project_options = {p['name']: p['id'] for p in projects}
+    selected_project_name = st.selectbox(
+        "Select Project",
+        options=list(project_options.keys()),
+        key="bulk_project_selector"
+    )
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        if st.button(f"✅ Move {len(valid_ids)} Assets", use_container_width=True, type="primary"):
+            try:
+                message = move_or_queue(client, valid_ids, project_options[selected_project_name])
+                st.success(f"✅ {message}")
+                scanner.clear_codes()
+            except APIError as e:
+                missing = (e.response_data or {}).get('missing_ids', [])
+                for asset_id in missing:
+                    scanner.remove_code(asset_id)
+                if missing:
+                    st.error(f"Failed to move assets: {e.message}. Unknown codes were removed, please retry.")
+                else:
+                    st.error(f"Failed to move assets: {e.message}")
+    
+    with col2:
+        if st.button("🗑️ Clear Scans", use_container_width=True):
+            scanner.clear_codes()
+            st.rerun()
+
+
 def main():
     """Main page function."""
     st.title("📷 Scan Asset QR Code")
@@ -137,10 +279,23 @@ def main():
             del st.session_state.current_asset
         if 'show_move_form' in st.session_state:
             del st.session_state.show_move_form
+        if 'bulk_scanner' in st.session_state:
+            del st.session_state.bulk_scanner
         st.switch_page("app.py")
     
     st.divider()
     
+    scan_mode = st.radio(
+        "Scan Mode",
+        options=["Single Asset", "Bulk Scan"],
+        horizontal=True,
+        key="scan_mode"
+    )
+    
+    if scan_mode == "Bulk Scan":
+        show_bulk_scan()
+        return
+    
     # Check if we have a scanned asset
     if st.session_state.get('scan_complete') and st.session_state.get('scanned_asset_id'):
         show_asset_details(st.session_state.scanned_asset_id)
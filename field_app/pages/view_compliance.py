@@ -84,9 +84,10 @@ def show_compliance_status(project_id: str, project_name: str):
                 
                 st.divider()
         
-        # Summary
-        green_count = sum(1 for s in subcontractors if s.get('status') == 'GREEN')
-        red_count = sum(1 for s in subcontractors if s.get('status') == 'RED')
+        # Summary, counted by the API
+        summary = client.get(f"projects/{project_id}/compliance/summary", params={"limit": 0})
+        green_count = summary['subcontractors']['green']
+        red_count = summary['subcontractors']['red']
         
         st.subheader("Summary")
         col1, col2 = st.columns(2)
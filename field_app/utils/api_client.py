@@ -3,6 +3,10 @@ API client utilities for communicating with the Flask backend.
 Provides request wrapper with JWT header injection, error handling, and response validation.
 """
 import requests
+import gzip
+import json
+import time
+import uuid
 from typing import Optional, Dict, Any, Union
 import streamlit as st
 from field_app.config import config
@@ -10,30 +14,41 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+WRITE_METHODS = {'POST', 'PUT', 'PATCH', 'DELETE'}
+
 
 class APIError(Exception):
     """Custom exception for API errors."""
-    def __init__(self, message: str, status_code: Optional[int] = None, response_data: Optional[Dict] = None):
+    def __init__(
+        self,
+        message: str,
+        status_code: Optional[int] = None,
+        response_data: Optional[Dict] = None,
+        offline: bool = False
+    ):
         self.message = message
         self.status_code = status_code
         self.response_data = response_data
+        self.offline = offline  # True when the server could not be reached at all
         super().__init__(self.message)
 
 
 class APIClient:
     """Client for making authenticated API requests with error handling and response validation."""
     
-    def __init__(self, token: Optional[str] = None, timeout: int = 30):
+    def __init__(self, token: Optional[str] = None, timeout: int = 30, retries: int = 2):
         """
         Initialize API client with optional JWT token.
         
         Args:
             token: JWT token for authentication
             timeout: Request timeout in seconds (default: 30)
+            retries: Extra attempts after a timeout or connection error (default: 2)
         """
         self.base_url = config.API_BASE_URL
         self.token = token or st.session_state.get('token')
         self.timeout = timeout
+        self.retries = retries
     
     def _get_headers(self) -> Dict[str, str]:
         """Get request headers with JWT token if available."""
@@ -85,17 +100,23 @@ class APIClient:
         endpoint: str,
         data: Optional[Dict] = None,
         params: Optional[Dict] = None,
-        files: Optional[Dict] = None
+        files: Optional[Dict] = None,
+        compress: bool = False
     ) -> Dict[str, Any]:
         """
         Make HTTP request with error handling for network failures.
         
+        Writes carry an Idempotency-Key, so a request that timed out or lost
+        its connection is retried with the same key and the server applies
+        it at most once. Uploads are not retried.
+        
         Args:
             method: HTTP method (GET, POST, PUT, DELETE)
             endpoint: API endpoint path
             data: Request body data
             params: Query parameters
             files: Files for multipart upload
+            compress: Send the JSON body gzip-compressed
             
         Returns:
             Parsed response data
@@ -110,33 +131,56 @@ class APIClient:
         if files:
             headers.pop('Content-Type', None)
         
-        try:
-            logger.debug(f"Making {method} request to {url}")
-            
-            response = requests.request(
-                method=method,
-                url=url,
-                headers=headers,
-                json=data if not files else None,
-                data=data if files else None,
-                params=params,
-                files=files,
-                timeout=self.timeout
-            )
-            
-            return self._handle_response(response)
-            
-        except requests.exceptions.Timeout:
-            logger.error(f"Request timeout for {url}")
-            raise APIError("Request timed out. Please check your connection and try again.")
+        json_body = data if not files else None
+        body = data if files else None
+        if compress and json_body is not None:
+            headers['Content-Encoding'] = 'gzip'
+            body = gzip.compress(json.dumps(json_body).encode('utf-8'))
+            json_body = None
         
-        except requests.exceptions.ConnectionError:
-            logger.error(f"Connection error for {url}")
-            raise APIError("Unable to connect to server. Please check your network connection.")
+        attempts = 1
+        if method in WRITE_METHODS and endpoint != 'login':
+            headers['Idempotency-Key'] = str(uuid.uuid4())
+            if not files:
+                attempts += self.retries
         
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Request failed for {url}: {str(e)}")
-            raise APIError(f"Request failed: {str(e)}")
+        for attempt in range(attempts):
+            if attempt:
+                time.sleep(0.5 * 2 ** (attempt - 1))
+            try:
+                logger.debug(f"Making {method} request to {url}")
+                
+                response = requests.request(
+                    method=method,
+                    url=url,
+                    headers=headers,
+                    json=json_body,
+                    data=body,
+                    params=params,
+                    files=files,
+                    timeout=self.timeout
+                )
+                
+                # The first attempt reached the server and is still running
+                if response.status_code == 409 and 'Retry-After' in response.headers and attempt + 1 < attempts:
+                    continue
+                return self._handle_response(response)
+                
+            except requests.exceptions.Timeout:
+                logger.error(f"Request timeout for {url}")
+                if attempt + 1 < attempts:
+                    continue
+                raise APIError("Request timed out. Please check your connection and try again.", offline=True)
+            
+            except requests.exceptions.ConnectionError:
+                logger.error(f"Connection error for {url}")
+                if attempt + 1 < attempts:
+                    continue
+                raise APIError("Unable to connect to server. Please check your network connection.", offline=True)
+            
+            except requests.exceptions.RequestException as e:
+                logger.error(f"Request failed for {url}: {str(e)}")
+                raise APIError(f"Request failed: {str(e)}")
     
     def login(self, username: str, password: str) -> Dict[str, Any]:
         """
@@ -174,7 +218,8 @@ class APIClient:
         self,
         endpoint: str,
         data: Optional[Dict] = None,
-        files: Optional[Dict] = None
+        files: Optional[Dict] = None,
+        compress: bool = False
     ) -> Dict[str, Any]:
         """
         Make POST request to API.
@@ -183,6 +228,7 @@ class APIClient:
             endpoint: API endpoint path
             data: Request body data
             files: Files for multipart upload
+            compress: Send the JSON body gzip-compressed
             
         Returns:
             Response data
@@ -190,7 +236,7 @@ class APIClient:
         Raises:
             APIError: If request fails
         """
-        return self._make_request('POST', endpoint, data=data, files=files)
+        return self._make_request('POST', endpoint, data=data, files=files, compress=compress)
     
     def put(self, endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -0,0 +1,287 @@
+"""
+Offline support for the Field Mobile App.
+Keeps a durable SQLite queue of scans and moves made without signal,
+a cached snapshot of projects and recently scanned assets, and replays
+queued moves to the API in compressed batches once connectivity returns.
+"""
+import json
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, List
+import logging
+
+from field_app.config import config
+
+logger = logging.getLogger(__name__)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pending_moves (
+    idempotency_key TEXT PRIMARY KEY,
+    asset_id TEXT NOT NULL,
+    project_id TEXT NOT NULL,
+    moved_at TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_pending_moves_status ON pending_moves (status, moved_at);
+
+CREATE TABLE IF NOT EXISTS scan_log (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    asset_id TEXT NOT NULL,
+    scanned_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS cached_projects (
+    id TEXT PRIMARY KEY,
+    payload TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS cached_assets (
+    id TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    cached_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_cached_assets_cached_at ON cached_assets (cached_at);
+"""
+
+
+def utc_now_iso() -> str:
+    """Current client time as an ISO-8601 UTC timestamp."""
+    return datetime.now(timezone.utc).isoformat()
+
+
+class OfflineStore:
+    """Durable local queue and cache backed by a SQLite file."""
+
+    def __init__(self, path: Optional[str] = None, max_cached_assets: Optional[int] = None):
+        """
+        Open (and create if needed) the local offline database.
+
+        Args:
+            path: SQLite file path (default: config.OFFLINE_DB_PATH)
+            max_cached_assets: Number of recently scanned assets to keep cached
+        """
+        self.path = path or config.OFFLINE_DB_PATH
+        self.max_cached_assets = max_cached_assets or config.OFFLINE_CACHED_ASSETS
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """Open a short-lived connection; Streamlit reruns on many threads."""
+        with self._lock:
+            conn = sqlite3.connect(self.path, timeout=10)
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                conn.close()
+
+    # ------------------------------------------------------------------
+    # Queue
+    # ------------------------------------------------------------------
+
+    def queue_move(self, asset_id: str, project_id: str, moved_at: Optional[str] = None) -> str:
+        """
+        Record a move to be replayed later.
+
+        Returns:
+            The idempotency key of the queued move
+        """
+        key = str(uuid.uuid4())
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO pending_moves (idempotency_key, asset_id, project_id, moved_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, asset_id, project_id, moved_at or utc_now_iso())
+            )
+        return key
+
+    def record_scan(self, asset_id: str):
+        """Log a scan with its client timestamp."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO scan_log (asset_id, scanned_at) VALUES (?, ?)",
+                (asset_id, utc_now_iso())
+            )
+
+    def pending_count(self) -> int:
+        """Number of moves still waiting to be synced."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT COUNT(*) FROM pending_moves WHERE status = 'pending'"
+            ).fetchone()
+        return row[0]
+
+    def get_pending_moves(self, limit: int) -> List[Dict[str, str]]:
+        """Oldest pending moves first."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT idempotency_key, asset_id, project_id, moved_at FROM pending_moves "
+                "WHERE status = 'pending' ORDER BY moved_at LIMIT ?",
+                (limit,)
+            ).fetchall()
+        return [
+            {'idempotency_key': r[0], 'asset_id': r[1], 'project_id': r[2], 'moved_at': r[3]}
+            for r in rows
+        ]
+
+    def get_rejected_moves(self) -> List[Dict[str, str]]:
+        """Moves the server refused, kept so the user can see what was lost."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT idempotency_key, asset_id, project_id, moved_at, last_error FROM pending_moves "
+                "WHERE status = 'rejected' ORDER BY moved_at"
+            ).fetchall()
+        return [
+            {'idempotency_key': r[0], 'asset_id': r[1], 'project_id': r[2], 'moved_at': r[3], 'error': r[4]}
+            for r in rows
+        ]
+
+    def apply_sync_results(self, results: List[Dict[str, Any]]):
+        """Drop accepted moves from the queue and flag rejected ones."""
+        done = [(r['idempotency_key'],) for r in results if r.get('status') != 'rejected']
+        rejected = [
+            (r.get('message'), r['idempotency_key'])
+            for r in results if r.get('status') == 'rejected'
+        ]
+        with self._connect() as conn:
+            conn.executemany("DELETE FROM pending_moves WHERE idempotency_key = ?", done)
+            conn.executemany(
+                "UPDATE pending_moves SET status = 'rejected', last_error = ? WHERE idempotency_key = ?",
+                rejected
+            )
+
+    def clear_rejected(self):
+        """Forget moves the server refused."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM pending_moves WHERE status = 'rejected'")
+
+    # ------------------------------------------------------------------
+    # Cache
+    # ------------------------------------------------------------------
+
+    def cache_projects(self, projects: List[Dict[str, Any]]):
+        """Replace the cached project snapshot."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM cached_projects")
+            conn.executemany(
+                "INSERT INTO cached_projects (id, payload) VALUES (?, ?)",
+                [(p['id'], json.dumps(p)) for p in projects]
+            )
+
+    def get_cached_projects(self) -> List[Dict[str, Any]]:
+        """Projects from the last successful fetch."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT payload FROM cached_projects").fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def cache_asset(self, asset: Dict[str, Any]):
+        """Cache an asset and trim the cache to the most recent scans."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cached_assets (id, payload, cached_at) VALUES (?, ?, ?)",
+                (asset['id'], json.dumps(asset), utc_now_iso())
+            )
+            conn.execute(
+                "DELETE FROM cached_assets WHERE id NOT IN "
+                "(SELECT id FROM cached_assets ORDER BY cached_at DESC LIMIT ?)",
+                (self.max_cached_assets,)
+            )
+
+    def get_cached_asset(self, asset_id: str) -> Optional[Dict[str, Any]]:
+        """Cached asset details, with any queued moves applied on top."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT payload FROM cached_assets WHERE id = ?", (asset_id,)
+            ).fetchone()
+            latest_move = conn.execute(
+                "SELECT project_id FROM pending_moves WHERE asset_id = ? AND status = 'pending' "
+                "ORDER BY moved_at DESC LIMIT 1",
+                (asset_id,)
+            ).fetchone()
+            project = None
+            if latest_move:
+                project = conn.execute(
+                    "SELECT payload FROM cached_projects WHERE id = ?", (latest_move[0],)
+                ).fetchone()
+
+        if not row:
+            return None
+
+        asset = json.loads(row[0])
+        if latest_move:
+            asset['project_id'] = latest_move[0]
+            asset['project_name'] = json.loads(project[0]).get('name') if project else None
+        return asset
+
+    # ------------------------------------------------------------------
+    # Sync
+    # ------------------------------------------------------------------
+
+    def sync(self, client, batch_size: Optional[int] = None) -> int:
+        """
+        Replay queued moves to the API in compressed batches.
+
+        Stops quietly at the first batch that cannot reach the server, or
+        that conflicts with moves made by others, so the remaining moves
+        stay queued.
+
+        Args:
+            client: APIClient used to send the batches
+            batch_size: Moves per request (default: config.OFFLINE_SYNC_BATCH_SIZE)
+
+        Returns:
+            Number of moves accepted by the server
+        """
+        from field_app.utils.api_client import APIError
+
+        batch_size = batch_size or config.OFFLINE_SYNC_BATCH_SIZE
+        synced = 0
+
+        while True:
+            moves = self.get_pending_moves(batch_size)
+            if not moves:
+                break
+
+            try:
+                response = client.post('assets/sync', data={'moves': moves}, compress=True)
+            except APIError as e:
+                if e.offline:
+                    logger.info("Still offline, %d move(s) remain queued", self.pending_count())
+                    break
+                if e.status_code == 409:
+                    # Assets were being moved by others; try again on the next sync
+                    logger.info("Sync conflicted with other moves, %d move(s) remain queued", self.pending_count())
+                    break
+                raise
+
+            results = response.get('results', [])
+            self.apply_sync_results(results)
+            synced += sum(1 for r in results if r.get('status') != 'rejected')
+
+            if len(moves) < batch_size:
+                break
+
+        return synced
+
+
+_store = None
+
+
+def get_offline_store() -> OfflineStore:
+    """Process-wide offline store."""
+    global _store
+    if _store is None:
+        _store = OfflineStore()
+    return _store
@@ -7,7 +7,9 @@ import av
 from pyzbar import pyzbar
 import numpy as np
 import cv2
-from typing import Optional
+import threading
+import uuid
+from typing import Optional, List, Tuple
 
 
 RTC_CONFIGURATION = RTCConfiguration(
@@ -15,12 +17,39 @@ RTC_CONFIGURATION = RTCConfiguration(
 )
 
 
+def is_valid_asset_id(code: str) -> bool:
+    """Check that a decoded QR payload looks like an asset ID (UUID)."""
+    try:
+        uuid.UUID(code)
+        return True
+    except (ValueError, AttributeError, TypeError):
+        return False
+
+
 class QRScanner:
-    """QR code scanner using webcam."""
+    """
+    QR code scanner using webcam.
+    
+    In single mode the most recently decoded code is stored in session state.
+    In bulk mode every distinct code seen across frames (several per frame
+    included) is accumulated into a deduplicated set that can be submitted
+    as one move.
+    """
     
-    def __init__(self):
-        """Initialize QR scanner."""
+    def __init__(self, bulk: bool = False):
+        """
+        Initialize QR scanner.
+        
+        Args:
+            bulk: Accumulate all distinct codes instead of stopping at the first
+        """
         self.scanned_code = None
+        self.bulk = bulk
+        
+        # Frames are processed on a worker thread, so the bulk set is
+        # guarded by a lock rather than kept in session state
+        self._lock = threading.Lock()
+        self._codes = {}
     
     def video_frame_callback(self, frame):
         """Process video frame and detect QR codes."""
@@ -29,12 +58,20 @@ class QRScanner:
         # Decode QR codes in the frame
         decoded_objects = pyzbar.decode(img)
         
+        if self.bulk and decoded_objects:
+            with self._lock:
+                for obj in decoded_objects:
+                    # dict keeps the first-seen order of the codes
+                    self._codes.setdefault(obj.data.decode('utf-8'), None)
+        
         for obj in decoded_objects:
             # Extract QR code data
             qr_data = obj.data.decode('utf-8')
             
             # Store in session state
-            if 'scanned_asset_id' not in st.session_state or st.session_state.scanned_asset_id != qr_data:
+            if not self.bulk and (
+                'scanned_asset_id' not in st.session_state or st.session_state.scanned_asset_id != qr_data
+            ):
                 st.session_state.scanned_asset_id = qr_data
                 st.session_state.scan_complete = True
             
@@ -51,6 +88,30 @@ class QRScanner:
         
         return av.VideoFrame.from_ndarray(img, format="bgr24")
     
+    def get_scanned_codes(self) -> Tuple[List[str], List[str]]:
+        """
+        Return the codes collected in bulk mode, split by local validation.
+        
+        Returns:
+            Tuple of (valid asset IDs, rejected codes), both in scan order
+        """
+        with self._lock:
+            codes = list(self._codes)
+        
+        valid = [code for code in codes if is_valid_asset_id(code)]
+        rejected = [code for code in codes if not is_valid_asset_id(code)]
+        return valid, rejected
+    
+    def remove_code(self, code: str):
+        """Drop a single code from the bulk set."""
+        with self._lock:
+            self._codes.pop(code, None)
+    
+    def clear_codes(self):
+        """Reset the bulk set."""
+        with self._lock:
+            self._codes.clear()
+    
     def start_scanner(self):
         """Start the QR code scanner."""
         # Initialize session state
@@ -61,7 +122,7 @@ class QRScanner:
         
         # Start webcam stream
         webrtc_ctx = webrtc_streamer(
-            key="qr-scanner",
+            key="qr-bulk-scanner" if self.bulk else "qr-scanner",
             mode=WebRtcMode.SENDRECV,
             rtc_configuration=RTC_CONFIGURATION,
             video_frame_callback=self.video_frame_callback,
@@ -2,6 +2,14 @@ from models.asset import Asset
 from database.models import AssetORM
 
 class AssetMapper:
+    """
+    Converts between domain Assets and the assets table.
+
+    to_orm/to_domain work on single ORM instances. The *_many variants
+    work on plain row mappings instead, which is much faster for large
+    batches because no ORM instances, identity map or unit of work are
+    involved.
+    """
 
     @staticmethod
     def to_orm(domain_asset: Asset) -> AssetORM:
@@ -17,5 +25,35 @@ class AssetMapper:
             name=asset_orm.name,
             category=asset_orm.category,
             media=None,
-            history=None
+            history=None,
+            asset_id=asset_orm.id
         )
+
+    @staticmethod
+    def to_orm_many(domain_assets) -> list:
+        """
+        Convert domain Assets to row mappings for the assets table.
+
+        The result can be passed to insert(AssetORM).values(...),
+        db.execute(insert(AssetORM), rows) or db.bulk_insert_mappings.
+        Bulk inserts skip the session's flush hooks, so call
+        database.change_feed.record_changes for the inserted IDs.
+        """
+        return [
+            {"id": a.asset_id, "name": a.name, "category": a.category}
+            for a in domain_assets
+        ]
+
+    @staticmethod
+    def to_domain_many(rows) -> list:
+        """
+        Convert assets table row mappings to domain Assets, keeping their IDs.
+
+        Args:
+            rows: Mappings with id, name and category keys, e.g. from
+                db.execute(select(AssetORM.__table__)).mappings()
+        """
+        return [
+            Asset(row["name"], row["category"], None, None, row["id"])
+            for row in rows
+        ]
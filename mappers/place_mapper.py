@@ -2,6 +2,14 @@ from models.place import Place
 from database.models import PlaceORM
 
 class PlaceMapper:
+    """
+    Converts between domain Places and the places table.
+
+    to_orm/to_domain work on single ORM instances. The *_many variants
+    work on plain row mappings instead, which is much faster for large
+    batches because no ORM instances, identity map or unit of work are
+    involved.
+    """
 
     @staticmethod
     def to_orm(domain_place: Place) -> PlaceORM:
@@ -17,5 +25,33 @@ class PlaceMapper:
             name=place_orm.name,
             location=place_orm.location,
             metadata=None,
-            history=None
+            history=None,
+            place_id=place_orm.id
         )
+
+    @staticmethod
+    def to_orm_many(domain_places) -> list:
+        """
+        Convert domain Places to row mappings for the places table.
+
+        The result can be passed to insert(PlaceORM).values(...),
+        db.execute(insert(PlaceORM), rows) or db.bulk_insert_mappings.
+        """
+        return [
+            {"id": p.place_id, "name": p.name, "location": p.location}
+            for p in domain_places
+        ]
+
+    @staticmethod
+    def to_domain_many(rows) -> list:
+        """
+        Convert places table row mappings to domain Places, keeping their IDs.
+
+        Args:
+            rows: Mappings with id, name and location keys, e.g. from
+                db.execute(select(PlaceORM.__table__)).mappings()
+        """
+        return [
+            Place(row["name"], row["location"], None, None, row["id"])
+            for row in rows
+        ]
@@ -6,8 +6,10 @@ class Asset:
     Contains no assignment or business logic.
     """
 
-    def __init__(self, name: str, category: str, media, history):
-        self.asset_id = str(uuid.uuid4())
+    __slots__ = ("asset_id", "name", "category", "media", "history")
+
+    def __init__(self, name: str, category: str, media, history, asset_id: str = None):
+        self.asset_id = asset_id or str(uuid.uuid4())
         self.name = name
         self.category = category
 
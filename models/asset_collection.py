@@ -1,24 +1,73 @@
 class AssetCollection:
     """
     A manager for storing and organizing assets inside a place/jobsite.
+
+    Assets are kept in an insertion-ordered dict keyed by asset_id, with
+    secondary indexes by name and category, so add, remove and the
+    find_* lookups don't scan the whole collection.
     """
 
+    __slots__ = ("_assets", "_keys", "_by_name", "_by_category")
+
     def __init__(self):
-        self.assets = []
+        self._assets = {}           # asset_id -> asset
+        self._keys = {}             # asset_id -> (name, category) it is indexed under
+        self._by_name = {}          # name -> {asset_id: asset}
+        self._by_category = {}      # category -> {asset_id: asset}
+
+    @property
+    def assets(self):
+        """Read-only view of the assets in insertion order; use list() for a copy."""
+        return self._assets.values()
+
+    def __len__(self):
+        return len(self._assets)
+
+    def __iter__(self):
+        return iter(self._assets.values())
 
     def add(self, asset):
-        if asset not in self.assets:
-            self.assets.append(asset)
+        if asset.asset_id in self._assets:
+            return
+        self._assets[asset.asset_id] = asset
+        self._index(asset)
 
     def remove(self, asset):
-        if asset in self.assets:
-            self.assets.remove(asset)
+        if self._assets.get(asset.asset_id) is not asset:
+            return
+        del self._assets[asset.asset_id]
+        self._unindex(asset.asset_id)
+
+    def reindex(self, asset):
+        """Refresh the indexes after an asset's name or category changed."""
+        if self._assets.get(asset.asset_id) is asset:
+            self._unindex(asset.asset_id)
+            self._index(asset)
+
+    def _index(self, asset):
+        self._keys[asset.asset_id] = (asset.name, asset.category)
+        self._by_name.setdefault(asset.name, {})[asset.asset_id] = asset
+        self._by_category.setdefault(asset.category, {})[asset.asset_id] = asset
+
+    def _unindex(self, asset_id):
+        name, category = self._keys.pop(asset_id)
+        for index, key in ((self._by_name, name), (self._by_category, category)):
+            members = index[key]
+            del members[asset_id]
+            if not members:
+                del index[key]
+
+    def get(self, asset_id):
+        return self._assets.get(asset_id)
 
     def list(self):
-        return self.assets
+        return list(self._assets.values())
 
     def count(self):
-        return len(self.assets)
+        return len(self)
 
     def find_by_name(self, name):
-        return [a for a in self.assets if a.name == name]
\ No newline at end of file
+        return list(self._by_name.get(name, {}).values())
+
+    def find_by_category(self, category):
+        return list(self._by_category.get(category, {}).values())
@@ -1,15 +1,8 @@
-from datetime import datetime
+from models.event_log import EventLog
 
-class AssetHistory:
+class AssetHistory(EventLog):
     """
     Stores and manages the event history (movements, assignments, etc.)
     """
 
-    def __init__(self):
-        self.events = []
-
-    def log(self, message: str):
-        self.events.append({
-            "timestamp": datetime.now().isoformat(),
-            "event": message
-        })
\ No newline at end of file
+    __slots__ = ()
@@ -5,6 +5,8 @@ class AssetMedia:
     - QR code path
     """
 
+    __slots__ = ("photo_path", "qr_code_path")
+
     def __init__(self, photo_path=None, qr_code_path=None):
         self.photo_path = photo_path
         self.qr_code_path = qr_code_path
@@ -6,6 +6,8 @@ class Document:
     No validation or business logic here.
     """
 
+    __slots__ = ("document_id", "name", "doc_type", "metadata", "history")
+
     def __init__(self, name, doc_type, metadata, history):
         self.document_id = str(uuid.uuid4())
         self.name = name               
@@ -1,16 +1,9 @@
-from datetime import datetime
+from models.event_log import EventLog
 
 
-class DocumentHistory:
+class DocumentHistory(EventLog):
     """
     Stores document-related logs such as edits, validations, integrity checks.
     """
 
-    def __init__(self):
-        self.events = []
-
-    def log(self, message: str):
-        self.events.append({
-            "timestamp": datetime.now().isoformat(),
-            "event": message
-        })
\ No newline at end of file
+    __slots__ = ()
@@ -8,6 +8,8 @@ class DocumentMetadata:
     - Document owner (asset or user)
     """
 
+    __slots__ = ("file_path", "issued_on", "expires_on")
+
     def __init__(self, file_path=None, issued_on: date = None, expires_on: date = None):
         self.file_path = file_path
         self.issued_on = issued_on
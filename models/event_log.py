@@ -0,0 +1,83 @@
+import sys
+import time
+from itertools import chain
+from array import array
+from datetime import datetime
+
+
+class EventLog:
+    """
+    Compact, bounded event history shared by the *History models.
+
+    Timestamps are stored as epoch microseconds in an array and messages
+    are interned, so repeated messages share one string. Once max_events
+    is reached the log becomes a ring buffer: the oldest event is
+    overwritten and either appended to spill_path or counted in dropped.
+    """
+
+    __slots__ = ("max_events", "spill_path", "dropped", "_times", "_messages", "_start")
+
+    DEFAULT_MAX_EVENTS = 1000
+
+    def __init__(self, max_events=DEFAULT_MAX_EVENTS, spill_path=None):
+        self.max_events = max_events
+        self.spill_path = spill_path
+        self.dropped = 0
+
+        self._times = array("q")    # epoch microseconds
+        self._messages = []
+        self._start = 0             # index of the oldest event once full
+
+    def log(self, message: str):
+        timestamp = time.time_ns() // 1000
+        message = sys.intern(message)
+
+        if self.max_events is None or len(self._messages) < self.max_events:
+            self._times.append(timestamp)
+            self._messages.append(message)
+            return
+
+        i = self._start
+        self._evict(self._times[i], self._messages[i])
+        self._times[i] = timestamp
+        self._messages[i] = message
+        self._start = (i + 1) % self.max_events
+
+    def _evict(self, timestamp, message):
+        if self.spill_path is None:
+            self.dropped += 1
+            return
+        with open(self.spill_path, "a", encoding="utf-8") as f:
+            f.write(f"{timestamp}\t{message.replace(chr(10), ' ')}\n")
+
+    def _ordered(self):
+        for i in chain(range(self._start, len(self._messages)), range(self._start)):
+            yield self._times[i], self._messages[i]
+
+    @staticmethod
+    def _as_event(timestamp, message):
+        return {
+            "timestamp": datetime.fromtimestamp(timestamp / 1_000_000).isoformat(),
+            "event": message
+        }
+
+    @property
+    def events(self):
+        """In-memory events, oldest first, as {"timestamp", "event"} dicts."""
+        return [self._as_event(t, m) for t, m in self._ordered()]
+
+    def iter_all(self):
+        """Spilled events followed by in-memory events, oldest first."""
+        if self.spill_path is not None:
+            try:
+                with open(self.spill_path, encoding="utf-8") as f:
+                    for line in f:
+                        timestamp, message = line.rstrip("\n").split("\t", 1)
+                        yield self._as_event(int(timestamp), message)
+            except FileNotFoundError:
+                pass
+        for t, m in self._ordered():
+            yield self._as_event(t, m)
+
+    def __len__(self):
+        return len(self._messages)
@@ -1,24 +1,67 @@
 class PeopleCollection:
     """
     A manager for storing and organizing users inside a place/jobsite.
+
+    Users are kept in an insertion-ordered dict keyed by user_id, with a
+    secondary index by role, so add, remove and find_by_role don't scan
+    the whole collection.
     """
 
+    __slots__ = ("_people", "_roles", "_by_role")
+
     def __init__(self):
-        self.people = []
+        self._people = {}           # user_id -> user
+        self._roles = {}            # user_id -> role it is indexed under
+        self._by_role = {}          # role -> {user_id: user}
+
+    @property
+    def people(self):
+        """Read-only view of the users in insertion order; use list() for a copy."""
+        return self._people.values()
+
+    def __len__(self):
+        return len(self._people)
+
+    def __iter__(self):
+        return iter(self._people.values())
 
     def add(self, user):
-        if user not in self.people:
-            self.people.append(user)
+        if user.user_id in self._people:
+            return
+        self._people[user.user_id] = user
+        self._index(user)
 
     def remove(self, user):
-        if user in self.people:
-            self.people.remove(user)
+        if self._people.get(user.user_id) is not user:
+            return
+        del self._people[user.user_id]
+        self._unindex(user.user_id)
+
+    def reindex(self, user):
+        """Refresh the role index after a user's role changed."""
+        if self._people.get(user.user_id) is user:
+            self._unindex(user.user_id)
+            self._index(user)
+
+    def _index(self, user):
+        self._roles[user.user_id] = user.role
+        self._by_role.setdefault(user.role, {})[user.user_id] = user
+
+    def _unindex(self, user_id):
+        role = self._roles.pop(user_id)
+        members = self._by_role[role]
+        del members[user_id]
+        if not members:
+            del self._by_role[role]
+
+    def get(self, user_id):
+        return self._people.get(user_id)
 
     def list(self):
-        return self.people
+        return list(self._people.values())
 
     def count(self):
-        return len(self.people)
+        return len(self)
 
     def find_by_role(self, role):
-        return [p for p in self.people if p.role == role]
\ No newline at end of file
+        return list(self._by_role.get(role, {}).values())
@@ -9,8 +9,10 @@ class Place:
     This Place can store assets and people, replacing the old Jobsite class.
     """
 
-    def __init__(self, name, location=None, metadata=None, history=None):
-        self.place_id = str(uuid.uuid4())
+    __slots__ = ("place_id", "name", "location", "metadata", "history", "assets", "people")
+
+    def __init__(self, name, location=None, metadata=None, history=None, place_id=None):
+        self.place_id = place_id or str(uuid.uuid4())
         self.name = name
         self.location = location
         self.metadata = metadata      # PlaceMetadata instance
@@ -22,5 +24,5 @@ class Place:
     def __str__(self):
         return (
             f"Place(ID={self.place_id}, Name={self.name}, "
-            f"Assets={self.assets.count()}, People={self.people.count()})"
+            f"Assets={len(self.assets)}, People={len(self.people)})"
         )
\ No newline at end of file
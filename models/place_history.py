@@ -1,15 +1,8 @@
-from datetime import datetime
+from models.event_log import EventLog
 
-class PlaceHistory:
+class PlaceHistory(EventLog):
     """
     Tracks events or updates related to a place.
     """
 
-    def __init__(self):
-        self.events = []
-
-    def log(self, message: str):
-        self.events.append({
-            "timestamp": datetime.now().isoformat(),
-            "event": message
-        })
\ No newline at end of file
+    __slots__ = ()
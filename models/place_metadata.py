@@ -3,6 +3,8 @@ class PlaceMetadata:
     Stores metadata about a place.
     """
 
+    __slots__ = ("description", "created_by")
+
     def __init__(self, description=None, created_by=None):
         self.description = description
         self.created_by = created_by
@@ -6,6 +6,8 @@ class User:
     No permission or role logic here.
     """
 
+    __slots__ = ("user_id", "name", "email", "role")
+
     def __init__(self, name: str, email: str, role: str):
         self.user_id = str(uuid.uuid4())
         self.name = name
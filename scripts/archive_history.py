@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Asset History Archival Script
+
+Moves asset_history months older than HISTORY_HOT_MONTHS out of the
+database into compressed Parquet files under HISTORY_ARCHIVE_DIR, so the
+hot table and its indexes stay small. On PostgreSQL it also creates the
+monthly partitions for the months ahead. Run monthly (see the deployment
+guide); asset histories served by the API include archived months.
+
+Usage:
+    python scripts/archive_history.py                  # Archive per HISTORY_HOT_MONTHS
+    python scripts/archive_history.py --hot-months 6   # Keep only six months in the database
+    python scripts/archive_history.py --dry-run        # List what would be archived
+    python scripts/archive_history.py --convert        # One-off: partition an existing table (PostgreSQL)
+"""
+import argparse
+import os
+import sys
+from datetime import datetime
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.db import engine
+from database.history_archive import HistoryArchive, archive_history
+from database.partitions import convert_to_partitioned, ensure_partitions
+from api.config import get_config
+
+
+def main():
+    """Create upcoming partitions and archive old history months."""
+    config = get_config()
+
+    parser = argparse.ArgumentParser(description="Archive old asset_history months to Parquet.")
+    parser.add_argument('--hot-months', type=int, default=config.HISTORY_HOT_MONTHS,
+                        help="Months (including the current one) kept in the database")
+    parser.add_argument('--archive-dir', default=config.HISTORY_ARCHIVE_DIR, help="Parquet output directory")
+    parser.add_argument('--dry-run', action='store_true', help="Only list the months that would be archived")
+    parser.add_argument('--convert', action='store_true',
+                        help="Convert an existing unpartitioned asset_history table first (PostgreSQL)")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("Site-Steward Asset History Archival")
+    print(f"Execution Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print("=" * 80)
+
+    try:
+        if engine.dialect.name == "postgresql":
+            with engine.begin() as conn:
+                if args.convert:
+                    copied = convert_to_partitioned(conn)
+                    if copied is None:
+                        print("asset_history is already partitioned.")
+                    else:
+                        print(f"✓ Converted asset_history to monthly partitions ({copied:,} rows).")
+                created = ensure_partitions(conn)
+            for name in created:
+                print(f"✓ Created partition {name}")
+        elif args.convert:
+            print("--convert only applies to PostgreSQL; skipping.")
+
+        print(f"\nArchiving months older than {args.hot_months} month(s) to {args.archive_dir} ...")
+        archived = archive_history(engine, HistoryArchive(args.archive_dir), args.hot_months, dry_run=args.dry_run)
+
+        if archived:
+            print(f"\n✓ Archived {sum(archived.values()):,} rows from {len(archived)} month(s).")
+        elif not args.dry_run:
+            print("✓ Nothing to archive.")
+    except Exception as e:
+        print(f"\n✗ ERROR: Archival failed: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+    finally:
+        print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,49 +3,49 @@
 Compliance Document Expiry Check Script
 
 This script checks for compliance documents that are expired or expiring within 30 days
-and sends email notifications to designated recipients.
+and queues email notifications to designated recipients, sent by the
+background job workers (scripts/job_worker.py).
+
+Documents are split into EXPIRY_CHECK_SHARDS shards by subcontractor, and
+worker processes claim shards one at a time, so the script can run from
+cron on every node: each shard is checked once a day, by whichever worker
+claims it first, and the worker that finishes the last shard queues one
+digest email with the documents of every shard.
+
+Usage:
+    python scripts/check_expiry.py [--workers N]
 
 Requirements: 5.1, 5.2, 5.5
 """
+import argparse
 import os
+import socket
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
+from multiprocessing import get_context
 from pathlib import Path
 
 # Add parent directory to path to import modules
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from sqlalchemy import and_
-from database.db import SessionLocal
-from database.models import ComplianceDocumentORM, SubcontractorORM, ProjectORM
+from database.db import SessionLocal, engine
+from sqlalchemy.orm import selectinload
+from database.models import (
+    ComplianceDocumentORM, ExpiryCheckRunORM, ExpiryCheckShardORM, JobORM, SubcontractorORM, ProjectORM
+)
+from services.expiry_shards import (
+    claim_digest, claim_shard, complete_shard, ensure_shards, shard_documents, subcontractor_shards
+)
+from services.job_queue import enqueue
 from api.config import get_config
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
-
-def get_expiring_documents(db_session):
-    """
-    Query compliance documents expiring within 30 days.
-    
-    Requirements: 5.1
-    
-    Args:
-        db_session: SQLAlchemy database session
-        
-    Returns:
-        List of ComplianceDocumentORM objects that are expired or expiring within 30 days
-    """
-    today = datetime.now().date()
-    thirty_days_from_now = today + timedelta(days=30)
-    
-    # Query documents where expiry_date is between today and 30 days from now
-    # This includes both expired documents (expiry_date < today) and expiring documents
-    expiring_docs = db_session.query(ComplianceDocumentORM).filter(
-        ComplianceDocumentORM.expiry_date <= thirty_days_from_now
-    ).all()
-    
-    return expiring_docs
+# Background job kind of expiry emails
+EXPIRY_EMAIL_JOB = "expiry_email"
 
 
 def get_document_status(expiry_date):
@@ -204,69 +204,194 @@ def send_email_notification(config, expiring_docs_with_details):
         return False
 
 
+def document_pairs(expiring_docs):
+    """[document_id, expiry_date] of each document, as kept for the digest and sent to the job."""
+    return [[doc.id, doc.expiry_date.isoformat()] for doc in expiring_docs]
+
+
+def email_job_payload(expiring_docs):
+    """Payload of an expiry email job: the documents and the expiry dates they were found with."""
+    return {"documents": document_pairs(expiring_docs)}
+
+
+def send_expiry_email(db_session, payload):
+    """
+    Background job handler for expiry emails (kind EXPIRY_EMAIL_JOB).
+    
+    Documents deleted or renewed since the job was queued are left out.
+    Raises if the email cannot be sent, so the job is retried.
+    
+    Args:
+        db_session: SQLAlchemy database session
+        payload: Dict with "documents": list of [document_id, expiry_date]
+    """
+    expected = {document_id: expiry_date for document_id, expiry_date in payload["documents"]}
+    expiring_docs = [
+        doc for doc in db_session.query(ComplianceDocumentORM).options(
+            selectinload(ComplianceDocumentORM.subcontractor).selectinload(SubcontractorORM.projects)
+        ).filter(ComplianceDocumentORM.id.in_(list(expected))).all()
+        if doc.expiry_date and doc.expiry_date.isoformat() == expected[doc.id]
+    ]
+    if not expiring_docs:
+        return
+    
+    expiring_docs.sort(key=lambda doc: (doc.expiry_date, doc.id))
+    expiring_docs_with_details = [
+        (doc, doc.subcontractor, doc.subcontractor.projects if doc.subcontractor else [])
+        for doc in expiring_docs
+    ]
+    if not send_email_notification(get_config(), expiring_docs_with_details):
+        raise RuntimeError("Email notification failed")
+
+
+def check_shard(db_session, shard, shards, subcontractor_ids=None):
+    """
+    Find and log one shard's documents expiring within 30 days.
+    
+    Args:
+        db_session: SQLAlchemy database session to read documents from
+        shard: Shard number
+        shards: Total number of shards
+        subcontractor_ids: The shard's subcontractors, off PostgreSQL
+            (see services.expiry_shards.subcontractor_shards)
+        
+    Returns:
+        List of ComplianceDocumentORM objects that are expired or expiring within 30 days
+    """
+    today = datetime.now().date()
+    expiring_docs = shard_documents(
+        db_session, shard, shards, today + timedelta(days=30), subcontractor_ids
+    )
+    if not expiring_docs:
+        return []
+    
+    lines = [f"⚠️  Shard {shard}: {len(expiring_docs)} document(s) requiring attention:"]
+    for doc in expiring_docs:
+        subcontractor = doc.subcontractor
+        projects = subcontractor.projects if subcontractor else []
+        status_color, status_text, days_until = get_document_status(doc.expiry_date)
+        project_names = ", ".join([p.name for p in projects]) if projects else "No projects"
+        lines.append(
+            f"  • {subcontractor.name if subcontractor else 'Unknown'}: {doc.document_type}, "
+            f"expires {doc.expiry_date.strftime('%Y-%m-%d')} ({status_text}, {days_until} days), "
+            f"projects: {project_names}"
+        )
+    # One print per shard keeps output from parallel workers readable
+    print("\n".join(lines))
+    
+    return expiring_docs
+
+
+def run_worker(shards):
+    """
+    Claim and check shards until none is left for today.
+    
+    The claimed shard stays locked while it is checked, and its documents
+    are stored with it in the transaction that marks it done. Once no
+    shard is left, the worker that finds every shard done queues the
+    day's digest email as a background job; job workers
+    (scripts/job_worker.py) send it and retry failures.
+    
+    Args:
+        shards: Total number of shards
+        
+    Returns:
+        Tuple of (shards checked, documents found, documents in the
+        digest this worker queued or None)
+    """
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    today = datetime.now().date()
+    checked, documents = 0, 0
+    
+    claim_session = SessionLocal()
+    if engine.dialect.name == "sqlite":
+        # The claim already holds SQLite's write lock; read in the same transaction
+        db_session = claim_session
+    else:
+        # Read-only: served by a replica when DATABASE_REPLICA_URLS is set
+        db_session = SessionLocal(read_only=True)
+    try:
+        # Without hashtext() the shards are split by subcontractor ID, read once
+        by_shard = None if engine.dialect.name == "postgresql" else subcontractor_shards(db_session, shards)
+        while True:
+            shard = claim_shard(claim_session, today)
+            if shard is None:
+                break
+            expiring_docs = check_shard(
+                db_session, shard.shard, shards, by_shard.get(shard.shard, []) if by_shard is not None else None
+            )
+            if db_session is not claim_session:
+                db_session.rollback()
+            complete_shard(claim_session, shard, today, worker, document_pairs(expiring_docs))
+            checked += 1
+            documents += len(expiring_docs)
+        
+        digest = claim_digest(claim_session, today, worker)
+        if digest:
+            enqueue(claim_session, EXPIRY_EMAIL_JOB, {"documents": digest})
+        claim_session.commit()
+    finally:
+        db_session.close()
+        claim_session.close()
+    return checked, documents, None if digest is None else len(digest)
+
+
 def main():
     """
     Main function to check expiring documents and send notifications.
     
     Requirements: 5.1, 5.2, 5.5
     """
+    parser = argparse.ArgumentParser(description="Check compliance documents for expiry")
+    parser.add_argument(
+        "--workers", type=int, default=min(4, os.cpu_count() or 1),
+        help="Worker processes claiming shards (default: up to 4)"
+    )
+    args = parser.parse_args()
+    
     print("=" * 80)
     print("Site-Steward Compliance Document Expiry Check")
     print(f"Execution Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("=" * 80)
     
-    # Load configuration
     config = get_config()
-    
-    # Create database session
-    db_session = SessionLocal()
+    shards = config.EXPIRY_CHECK_SHARDS
+    # SQLite has no row locks to share shards with: one worker on one node
+    workers = 1 if engine.dialect.name == "sqlite" else max(1, args.workers)
     
     try:
-        # Get expiring documents
-        print("\nQuerying compliance documents expiring within 30 days...")
-        expiring_docs = get_expiring_documents(db_session)
-        
-        if not expiring_docs:
-            print("✓ No expiring documents found. All compliance documents are valid.")
-            return
+        # Databases created before sharding and background jobs lack these tables
+        ExpiryCheckShardORM.__table__.create(engine, checkfirst=True)
+        ExpiryCheckRunORM.__table__.create(engine, checkfirst=True)
+        JobORM.__table__.create(engine, checkfirst=True)
+        db_session = SessionLocal()
+        try:
+            ensure_shards(db_session, shards)
+        finally:
+            db_session.close()
         
-        print(f"⚠️  Found {len(expiring_docs)} document(s) requiring attention:")
-        print()
-        
-        # Gather details for each document
-        expiring_docs_with_details = []
-        
-        for doc in expiring_docs:
-            # Get subcontractor details
-            subcontractor = db_session.query(SubcontractorORM).filter(
-                SubcontractorORM.id == doc.subcontractor_id
-            ).first()
-            
-            # Get associated projects
-            projects = subcontractor.projects if subcontractor else []
-            
-            # Store for email
-            expiring_docs_with_details.append((doc, subcontractor, projects))
-            
-            # Log to console
-            status_color, status_text, days_until = get_document_status(doc.expiry_date)
-            project_names = ", ".join([p.name for p in projects]) if projects else "No projects"
-            
-            print(f"  • {subcontractor.name if subcontractor else 'Unknown'}")
-            print(f"    Document: {doc.document_type}")
-            print(f"    Expiry: {doc.expiry_date.strftime('%Y-%m-%d')} ({status_text})")
-            print(f"    Days: {days_until}")
-            print(f"    Projects: {project_names}")
-            print()
+        print(f"\nChecking {shards} shard(s) with {workers} worker(s) for documents expiring within 30 days...")
+        if workers == 1:
+            results = [run_worker(shards)]
+        else:
+            # Spawned workers open their own database connections
+            with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+                results = list(pool.map(run_worker, [shards] * workers))
         
-        # Send email notification
-        print("Sending email notification...")
-        email_sent = send_email_notification(config, expiring_docs_with_details)
+        checked = sum(result[0] for result in results)
+        documents = sum(result[1] for result in results)
+        digests = [result[2] for result in results if result[2] is not None]
         
-        if email_sent:
-            print("\n✓ Compliance check completed successfully.")
+        if checked == 0:
+            print("✓ No shards left to check today; other nodes have checked them.")
+        elif documents == 0:
+            print(f"✓ {checked} shard(s) checked. No expiring documents found.")
         else:
-            print("\n⚠️  Compliance check completed with email notification failure.")
+            print(f"\n✓ Compliance check completed successfully: {checked} shard(s), {documents} document(s).")
+        if digests and digests[0]:
+            print(f"Digest email of {digests[0]} document(s) queued for the job workers.")
+        elif not digests:
+            print("Digest email queued by another worker, or left to the one that finishes the last shard.")
             
     except Exception as e:
         print(f"\n✗ ERROR: Compliance check failed: {str(e)}")
@@ -275,7 +400,6 @@ def main():
         sys.exit(1)
         
     finally:
-        db_session.close()
         print("=" * 80)
 
 
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Compliance Document Expiry Scheduler
+
+Long-running replacement for the daily check_expiry.py cron job. Queues
+an alert email as each document comes within 30 days, 7 days and 0 days
+of expiry, within seconds of the threshold, and sleeps in between. The
+emails are sent by the background job workers (scripts/job_worker.py). New and
+updated documents are picked up as they are uploaded (LISTEN/NOTIFY on
+PostgreSQL, a change log poll every EXPIRY_POLL_SECONDS elsewhere).
+Alerts already sent are recorded in expiry_alerts, so restarts do not
+repeat them.
+
+Usage:
+    python scripts/expiry_scheduler.py
+"""
+import logging
+import os
+import sys
+from datetime import datetime
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.db import SessionLocal, engine
+from database.models import ExpiryAlertORM, JobORM
+from services.expiry_scheduler import ExpiryScheduler
+from services.job_queue import enqueue
+from api.config import get_config
+from check_expiry import EXPIRY_EMAIL_JOB, email_job_payload
+
+# Threshold alerts go ahead of the daily report's emails
+ALERT_PRIORITY = 10
+
+
+def main():
+    """Run the expiry scheduler until interrupted."""
+    config = get_config()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    print("=" * 80)
+    print("Site-Steward Compliance Expiry Scheduler")
+    print(f"Start Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print("=" * 80)
+
+    def notify(db, alerts):
+        print(f"⚠️  {len(alerts)} document(s) crossed an expiry threshold:")
+        for doc, threshold_days in alerts:
+            name = doc.subcontractor.name if doc.subcontractor else 'Unknown'
+            print(f"  • {name}: {doc.document_type} expires {doc.expiry_date} (T-{threshold_days})")
+        # Committed with the expiry_alerts rows, so the email is queued exactly once
+        enqueue(db, EXPIRY_EMAIL_JOB, email_job_payload([doc for doc, threshold_days in alerts]),
+                priority=ALERT_PRIORITY)
+        return True
+
+    # Databases created before the scheduler and background jobs existed lack these tables
+    ExpiryAlertORM.__table__.create(engine, checkfirst=True)
+    JobORM.__table__.create(engine, checkfirst=True)
+
+    scheduler = ExpiryScheduler(SessionLocal, notify, engine=engine, poll_seconds=config.EXPIRY_POLL_SECONDS)
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        print("\nStopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Background Job Worker
+
+Runs jobs queued in the jobs table (services/job_queue.py): currently the
+compliance expiry emails queued by check_expiry.py and
+expiry_scheduler.py. Workers claim jobs with SELECT ... FOR UPDATE SKIP
+LOCKED, so any number of worker processes on any number of nodes can run
+side by side. Failed jobs are retried with exponential backoff, and a job
+held by a worker that died is retried once JOB_VISIBILITY_TIMEOUT_SECONDS
+have passed.
+
+Usage:
+    python scripts/job_worker.py [--workers N]
+"""
+import argparse
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.db import SessionLocal, engine
+from database.models import JobORM
+from services.job_queue import JobWorker
+from api.config import get_config
+from check_expiry import EXPIRY_EMAIL_JOB, send_expiry_email
+
+# Job kind -> handler(db, payload)
+HANDLERS = {
+    EXPIRY_EMAIL_JOB: send_expiry_email,
+}
+
+
+def run_worker(worker_number):
+    """Run one worker process until interrupted."""
+    config = get_config()
+    logging.basicConfig(level=logging.INFO, format=f"%(asctime)s %(levelname)s [worker {worker_number}] %(message)s")
+    worker = JobWorker(
+        SessionLocal,
+        HANDLERS,
+        visibility_timeout=config.JOB_VISIBILITY_TIMEOUT_SECONDS,
+        poll_seconds=config.JOB_POLL_SECONDS
+    )
+    try:
+        worker.run_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+def main():
+    """Start the job workers."""
+    parser = argparse.ArgumentParser(description="Run background jobs")
+    parser.add_argument("--workers", type=int, default=2, help="Worker processes (default: 2)")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("Site-Steward Background Job Worker")
+    print(f"Start Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print("=" * 80)
+
+    # Databases created before background jobs existed lack this table
+    JobORM.__table__.create(engine, checkfirst=True)
+
+    workers = max(1, args.workers)
+    if workers == 1:
+        run_worker(0)
+        return
+    # Spawned workers open their own database connections
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+        try:
+            list(pool.map(run_worker, range(workers)))
+        except KeyboardInterrupt:
+            print("\nStopped.")
+
+
+if __name__ == "__main__":
+    main()
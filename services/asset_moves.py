@@ -0,0 +1,127 @@
+"""
+Asset moves with optimistic locking.
+Every move increments the asset's version with a compare-and-swap UPDATE
+(... WHERE id = ? AND version = ?), so of two foremen moving the same
+asset from the same version only one succeeds, and asset_history always
+agrees with assets.project_id.
+"""
+import uuid
+from datetime import datetime
+
+from sqlalchemy import case
+from sqlalchemy.orm import joinedload
+
+from database.change_feed import record_changes
+from database.models import AssetHistoryORM, AssetORM
+
+
+class MoveConflict(Exception):
+    """Raised when assets changed since the versions a move was based on."""
+
+    def __init__(self, assets):
+        """
+        Args:
+            assets: Current state of the changed assets (see asset_state)
+        """
+        super().__init__(f"{len(assets)} asset(s) were changed by someone else")
+        self.assets = assets
+
+
+def asset_state(asset):
+    """Location and version of an asset, as returned with a conflict."""
+    return {
+        "id": asset.id,
+        "project_id": asset.project_id,
+        "project_name": asset.project.name if asset.project else None,
+        "version": asset.version,
+        "updated_at": asset.updated_at.isoformat() if asset.updated_at else None
+    }
+
+
+def swap_locations(db, expected, locations):
+    """
+    Set the project of several assets and bump their versions, in one
+    UPDATE that only touches assets whose version is still the expected
+    one. The bulk UPDATE bypasses the ORM, so the change log entries
+    are recorded here. Not committed.
+
+    Args:
+        db: SQLAlchemy session
+        expected: Dict of asset_id -> version the change is based on
+        locations: Dict of asset_id -> new project_id, same keys
+
+    Returns:
+        True if every asset was updated. If not, the others may have
+        been, and the caller must roll back.
+    """
+    if not expected:
+        return True
+    project_ids = set(locations.values())
+    if len(project_ids) == 1:
+        project_id = project_ids.pop()
+    else:
+        project_id = case(locations, value=AssetORM.id)
+    updated = db.query(AssetORM).filter(
+        AssetORM.id.in_(list(expected)),
+        AssetORM.version == case(expected, value=AssetORM.id)
+    ).update({
+        "project_id": project_id,
+        "version": AssetORM.version + 1
+    }, synchronize_session=False)
+    if updated != len(expected):
+        return False
+    record_changes(db, "asset", sorted(expected), "update")
+    return True
+
+
+def stale_assets(db, expected):
+    """IDs of assets whose version is no longer the expected one, or that are gone."""
+    current = dict(db.query(AssetORM.id, AssetORM.version).filter(AssetORM.id.in_(list(expected))).all())
+    return sorted(asset_id for asset_id, version in expected.items() if current.get(asset_id) != version)
+
+
+def current_state(db, asset_ids):
+    """asset_state() of each asset that still exists, read afresh."""
+    return [
+        asset_state(asset) for asset in
+        db.query(AssetORM).options(joinedload(AssetORM.project)).filter(
+            AssetORM.id.in_(asset_ids)
+        ).populate_existing().order_by(AssetORM.id)
+    ]
+
+
+def move_assets(db, expected, project_id, user_id, moved_at=None):
+    """
+    Move assets to a project and record the moves, all or nothing.
+
+    The versions of all assets are checked and bumped by a single
+    UPDATE, so the cost of a bulk move does not grow by one statement
+    per asset. Commits on success; on a conflict nothing is written.
+
+    Args:
+        db: SQLAlchemy session
+        expected: Dict of asset_id -> version the move is based on
+        project_id: Destination project
+        user_id: User making the move
+        moved_at: Time of the move (default: now, UTC)
+
+    Returns:
+        Dict of asset_id -> new version
+
+    Raises:
+        MoveConflict: An asset's version no longer matches (or it was deleted)
+    """
+    moved_at = moved_at or datetime.utcnow()
+    if not swap_locations(db, expected, dict.fromkeys(expected, project_id)):
+        db.rollback()
+        raise MoveConflict(current_state(db, stale_assets(db, expected)))
+
+    db.add_all(AssetHistoryORM(
+        id=str(uuid.uuid4()),
+        asset_id=asset_id,
+        project_id=project_id,
+        moved_by=user_id,
+        moved_at=moved_at
+    ) for asset_id in sorted(expected))
+    db.commit()
+    return {asset_id: version + 1 for asset_id, version in expected.items()}
@@ -4,6 +4,9 @@ Handles RED/GREEN status calculation based on expiry dates.
 """
 from datetime import datetime, timedelta
 
+import numpy as np
+import pandas as pd
+
 
 class ComplianceService:
     """
@@ -12,6 +15,19 @@ class ComplianceService:
     Requirements: 5.3, 5.4
     """
     
+    # Documents expiring within this many days are RED
+    WARNING_DAYS = 30
+    
+    # Days-remaining histogram buckets: (label, first day, last day), None = open
+    DAYS_REMAINING_BUCKETS = (
+        ("expired", None, -1),
+        ("0-7", 0, 7),
+        ("8-30", 8, 30),
+        ("31-90", 31, 90),
+        ("91-180", 91, 180),
+        ("181+", 181, None),
+    )
+    
     @staticmethod
     def calculate_status(expiry_date):
         """
@@ -31,7 +47,7 @@ class ComplianceService:
             return "RED"
         
         today = datetime.now().date()
-        threshold_date = today + timedelta(days=30)
+        threshold_date = today + timedelta(days=ComplianceService.WARNING_DAYS)
         
         # RED if expired or expiring within 30 days
         if expiry_date <= threshold_date:
@@ -59,3 +75,176 @@ class ComplianceService:
                 return "RED"
         
         return "GREEN"
+    
+    @staticmethod
+    def aggregate_status(documents, undated, soonest_expiry, today=None):
+        """
+        Subcontractor status from document aggregates rather than rows.
+        
+        Same rule as calculate_subcontractor_status: RED without documents,
+        with an undated document, or with any document expiring within
+        WARNING_DAYS.
+        
+        Args:
+            documents: Number of documents
+            undated: Number of documents without an expiry date
+            soonest_expiry: Earliest expiry date, or None
+            today: Date to count from (default: today)
+            
+        Returns:
+            str: "RED" or "GREEN"
+        """
+        today = today or datetime.now().date()
+        if not documents or undated or soonest_expiry is None:
+            return "RED"
+        if soonest_expiry <= today + timedelta(days=ComplianceService.WARNING_DAYS):
+            return "RED"
+        return "GREEN"
+    
+    @staticmethod
+    def bucket_ranges(today):
+        """
+        Expiry date range of each days-remaining bucket.
+        
+        Args:
+            today: Date the days are counted from
+            
+        Returns:
+            List of (label, first date, last date), None for an open end
+        """
+        return [
+            (label,
+             today + timedelta(days=low) if low is not None else None,
+             today + timedelta(days=high) if high is not None else None)
+            for label, low, high in ComplianceService.DAYS_REMAINING_BUCKETS
+        ]
+    
+    @staticmethod
+    def build_summary(subcontractors, soonest, today=None):
+        """
+        Build a project compliance summary from per-subcontractor aggregates.
+        
+        A subcontractor is GREEN when it has documents and every one of
+        them has an expiry date more than WARNING_DAYS away, the same rule
+        as calculate_subcontractor_status.
+        
+        Args:
+            subcontractors: One mapping per subcontractor on the project with
+                "documents" (count), "undated" (documents without an expiry
+                date), "soonest_expiry" (date or None) and one count per
+                DAYS_REMAINING_BUCKETS label
+            soonest: Documents with the nearest expiry dates, as mappings with
+                subcontractor_id, subcontractor_name, document_id,
+                document_type and expiry_date
+            today: Date to count from (default: today)
+            
+        Returns:
+            dict: Subcontractor and document counts, compliance rate,
+            days-remaining histogram and the soonest expiries
+        """
+        today = today or datetime.now().date()
+        threshold_date = today + timedelta(days=ComplianceService.WARNING_DAYS)
+        labels = [label for label, _, _ in ComplianceService.DAYS_REMAINING_BUCKETS]
+        
+        green_subcontractors = sum(
+            1 for sub in subcontractors
+            if ComplianceService.aggregate_status(
+                sub["documents"], sub["undated"], sub["soonest_expiry"], today
+            ) == "GREEN"
+        )
+        histogram = {label: sum(sub[label] or 0 for sub in subcontractors) for label in labels}
+        total_documents = sum(sub["documents"] for sub in subcontractors)
+        undated = sum(sub["undated"] for sub in subcontractors)
+        red_documents = histogram["expired"] + histogram["0-7"] + histogram["8-30"] + undated
+        
+        total = len(subcontractors)
+        return {
+            "subcontractors": {
+                "total": total,
+                "green": green_subcontractors,
+                "red": total - green_subcontractors
+            },
+            "compliance_rate": round(green_subcontractors / total * 100, 1) if total else 0.0,
+            "documents": {
+                "total": total_documents,
+                "green": total_documents - red_documents,
+                "red": red_documents,
+                "expired": histogram["expired"],
+                "no_expiry": undated
+            },
+            "days_remaining": [{"bucket": label, "count": histogram[label]} for label in labels],
+            "soonest_expiries": [
+                {
+                    "subcontractor_id": doc["subcontractor_id"],
+                    "subcontractor_name": doc["subcontractor_name"],
+                    "document_id": doc["document_id"],
+                    "document_type": doc["document_type"],
+                    "expiry_date": doc["expiry_date"].isoformat(),
+                    "days_remaining": (doc["expiry_date"] - today).days,
+                    "status": "RED" if doc["expiry_date"] <= threshold_date else "GREEN"
+                }
+                for doc in soonest
+            ]
+        }
+    
+    @staticmethod
+    def forecast_week_starts(today, weeks):
+        """
+        Start dates of the forecast weeks.
+        
+        Weeks start on Monday; week 0 is the current week.
+        
+        Returns:
+            List of weeks + 1 dates, the last one ending the final week
+        """
+        monday = today - timedelta(days=today.weekday())
+        return [monday + timedelta(weeks=week) for week in range(weeks + 1)]
+    
+    @staticmethod
+    def build_forecast(rows, weeks):
+        """
+        Arrange weekly expiry counts as sparse series for charting.
+        
+        Args:
+            rows: (week, document_type, project_id, documents) tuples, one
+                per non-empty combination, week being an index from 0
+            weeks: Number of weeks
+            
+        Returns:
+            tuple: (series, totals) where series is a list of dicts with
+            project_id, document_type and parallel "weeks" (week indices)
+            and "counts" arrays holding only the non-empty weeks, ordered
+            by project and document type, and totals is the document count
+            of every week
+        """
+        if not rows:
+            return [], [0] * weeks
+        
+        frame = pd.DataFrame(rows, columns=["week", "document_type", "project_id", "documents"])
+        frame = frame.sort_values(["project_id", "document_type", "week"], kind="stable")
+        week = frame["week"].to_numpy(dtype=np.int64)
+        documents = frame["documents"].to_numpy(dtype=np.int64)
+        project_ids = frame["project_id"].to_numpy(dtype=object)
+        document_types = frame["document_type"].to_numpy(dtype=object)
+        
+        # A new series starts wherever the project or document type changes
+        starts = np.flatnonzero(np.concatenate([
+            [True],
+            (project_ids[1:] != project_ids[:-1]) | (document_types[1:] != document_types[:-1])
+        ]))
+        series = [
+            {
+                "project_id": project_id,
+                "document_type": document_type,
+                "weeks": series_weeks,
+                "counts": series_counts
+            }
+            for project_id, document_type, series_weeks, series_counts in zip(
+                project_ids[starts].tolist(),
+                document_types[starts].tolist(),
+                [part.tolist() for part in np.split(week, starts[1:])],
+                [part.tolist() for part in np.split(documents, starts[1:])]
+            )
+        ]
+        totals = np.bincount(week, weights=documents, minlength=weeks).astype(np.int64)
+        return series, totals.tolist()
@@ -0,0 +1,133 @@
+"""
+In-process publish/subscribe bus for live updates.
+Routes publish events after committing a change and every subscriber
+(e.g. an SSE stream) receives them through its own bounded buffer.
+"""
+import itertools
+import threading
+from collections import deque
+from datetime import datetime
+
+
+class TooManySubscribers(Exception):
+    """Raised when the bus already serves its maximum number of subscribers."""
+
+
+class Subscription:
+    """
+    A subscriber's bounded event buffer.
+
+    Publishing never blocks on a slow subscriber: when the buffer is full the
+    oldest event is dropped and counted, and the next read returns a single
+    "resync" event so the client knows to refetch state instead of trusting
+    a stream with gaps.
+    """
+
+    def __init__(self, bus, buffer_size, event_types=None):
+        self.bus = bus
+        self.event_types = set(event_types) if event_types else None
+        self.dropped = 0
+        self.closed = False
+
+        self._events = deque(maxlen=buffer_size)
+        self._cond = threading.Condition()
+
+    def wants(self, event_type):
+        return self.event_types is None or event_type in self.event_types
+
+    def put(self, event):
+        with self._cond:
+            if len(self._events) == self._events.maxlen:
+                self.dropped += 1
+            self._events.append(event)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """
+        Wait for the next event.
+
+        Returns:
+            The next event dict, a resync event if events were dropped,
+            or None on timeout or once the subscription is closed
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._events or self.closed, timeout):
+                return None
+            if self.closed:
+                return None
+            if self.dropped:
+                dropped, self.dropped = self.dropped, 0
+                self._events.clear()
+                return self.bus.make_event("resync", {"dropped": dropped})
+            return self._events.popleft()
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+        self.bus.unsubscribe(self)
+
+
+class EventBus:
+    """Thread-safe fan-out of events to any number of subscriptions."""
+
+    def __init__(self, buffer_size=100, max_subscribers=1000):
+        self.buffer_size = buffer_size
+        self.max_subscribers = max_subscribers
+
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def make_event(self, event_type, data):
+        return {
+            "id": next(self._ids),
+            "type": event_type,
+            "timestamp": datetime.utcnow().isoformat(),
+            "data": data
+        }
+
+    def subscribe(self, event_types=None, buffer_size=None):
+        """
+        Register a new subscriber.
+
+        Args:
+            event_types: Only receive these event types (default: all)
+            buffer_size: Events buffered before the oldest are dropped
+
+        Raises:
+            TooManySubscribers: If the subscriber limit is reached
+        """
+        subscription = Subscription(self, buffer_size or self.buffer_size, event_types)
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                raise TooManySubscribers(
+                    f"Event stream is limited to {self.max_subscribers} subscribers"
+                )
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, event_type, data):
+        """Deliver an event to every interested subscriber without blocking."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        if not subscribers:
+            return None
+
+        event = self.make_event(event_type, data)
+        for subscription in subscribers:
+            if subscription.wants(event_type):
+                subscription.put(event)
+        return event
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+
+# Process-wide bus shared by the API routes
+event_bus = EventBus()
@@ -0,0 +1,332 @@
+"""
+Expiry alert scheduling for compliance documents.
+Keeps the next threshold crossings (30, 7 and 0 days before expiry) of
+every document in a min-heap and fires alerts as they come due, instead
+of scanning every document once a day.
+"""
+import heapq
+import logging
+import select
+import time
+from datetime import datetime, time as time_of_day, timedelta
+
+from sqlalchemy import func, insert
+from sqlalchemy.orm import selectinload
+
+from database.change_feed import DOCUMENT_CHANNEL
+from database.models import ChangeLogORM, ComplianceDocumentORM, ExpiryAlertORM, SubcontractorORM
+
+logger = logging.getLogger(__name__)
+
+# Days before expiry at which a document is alerted
+THRESHOLDS = (30, 7, 0)
+
+
+def crossing_time(expiry_date, threshold_days):
+    """Start of the day a document comes within threshold_days of expiry."""
+    return datetime.combine(expiry_date - timedelta(days=threshold_days), time_of_day.min)
+
+
+class ExpiryHeap:
+    """
+    Min-heap of (fire time, document, threshold) crossings.
+
+    When a document's expiry date changes, its new crossings are pushed
+    and the old ones are left in the heap: entries remember the expiry
+    date they were computed from and are dropped when they reach the top
+    if it is no longer the document's current one. The heap is rebuilt
+    once it holds more than twice the entries it needs.
+    """
+
+    def __init__(self, thresholds=THRESHOLDS):
+        self.thresholds = tuple(sorted(thresholds, reverse=True))
+        self._heap = []         # (fire_at, document_id, threshold_days, expiry_date)
+        self._expiry = {}       # document_id -> current expiry date
+
+    def __len__(self):
+        """Number of documents tracked."""
+        return len(self._expiry)
+
+    def schedule(self, document_id, expiry_date, sent=(), now=None):
+        """
+        Track a document's crossings. Does nothing if its expiry date is
+        unchanged.
+
+        Crossings already in the past collapse to the latest one, so a
+        document uploaded five days before expiry gets one 7-day alert,
+        not a 30-day alert as well. Thresholds in sent are skipped.
+
+        Args:
+            document_id: Document ID
+            expiry_date: Current expiry date
+            sent: Thresholds already alerted for this expiry date
+            now: Current time (default: now)
+        """
+        if self._expiry.get(document_id) == expiry_date:
+            return
+        now = now or datetime.now()
+        self._expiry[document_id] = expiry_date
+
+        crossings = [(crossing_time(expiry_date, days), days) for days in self.thresholds]
+        past = [days for fire_at, days in crossings if fire_at <= now]
+        for fire_at, days in crossings:
+            if days in sent:
+                continue
+            if fire_at > now or days == past[-1]:
+                heapq.heappush(self._heap, (fire_at, document_id, days, expiry_date))
+        self._compact()
+
+    def remove(self, document_id):
+        """Stop alerting a document, e.g. because it was deleted."""
+        self._expiry.pop(document_id, None)
+
+    def retry(self, document_id, threshold_days, expiry_date, fire_at):
+        """Push one popped crossing back, e.g. after a failed alert."""
+        if self._expiry.get(document_id) == expiry_date:
+            heapq.heappush(self._heap, (fire_at, document_id, threshold_days, expiry_date))
+
+    def next_time(self):
+        """Fire time of the earliest live crossing, or None."""
+        while self._heap and not self._is_live(self._heap[0]):
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now):
+        """
+        Remove and return every live crossing due at or before now.
+
+        A document with several crossings due (e.g. after the scheduler
+        was stopped for a while) is returned once, for the latest one.
+
+        Returns:
+            List of (document_id, threshold_days, expiry_date), earliest first
+        """
+        due = {}
+        while self.next_time() is not None and self._heap[0][0] <= now:
+            fire_at, document_id, days, expiry_date = heapq.heappop(self._heap)
+            due[document_id] = (document_id, days, expiry_date)
+        return list(due.values())
+
+    def _is_live(self, entry):
+        return self._expiry.get(entry[1]) == entry[3]
+
+    def _compact(self):
+        if len(self._heap) > 2 * len(self.thresholds) * len(self._expiry) + 1000:
+            self._heap = [entry for entry in self._heap if self._is_live(entry)]
+            heapq.heapify(self._heap)
+
+
+class ExpiryScheduler:
+    """
+    Long-running loop that alerts documents as they cross a threshold.
+
+    On start every document is loaded into an ExpiryHeap, skipping
+    alerts already recorded in expiry_alerts (see load for the first
+    start). The loop then sleeps until
+    the next crossing. Documents uploaded, changed or deleted meanwhile
+    are picked up from the change log: on PostgreSQL a NOTIFY sent with
+    each document write wakes the loop at once, elsewhere the change log
+    is polled every poll_seconds. An alert is recorded in the same
+    transaction that is committed once notify succeeds, so a failed
+    notification is retried rather than lost. notify gets that session,
+    so it can queue the email as a background job in the transaction.
+    """
+
+    LOAD_BATCH_SIZE = 10000
+    RETRY_SECONDS = 300
+    # Change log poll while listening, in case a notification is missed
+    LISTEN_POLL_SECONDS = 300
+
+    def __init__(self, session_factory, notify, engine=None, poll_seconds=5):
+        """
+        Args:
+            session_factory: Callable returning a SQLAlchemy session
+            notify: Callable taking the session and a list of
+                (ComplianceDocumentORM, threshold_days), returning True once
+                the alert is sent or queued
+            engine: Engine to LISTEN on (PostgreSQL with psycopg2 only)
+            poll_seconds: Change log poll interval without LISTEN
+        """
+        self.session_factory = session_factory
+        self.notify = notify
+        self.engine = engine
+        self.poll_seconds = poll_seconds
+        self.heap = ExpiryHeap()
+        self._cursor = 0
+        self._listener = None
+
+    def load(self, now=None):
+        """
+        Schedule every document, skipping alerts already sent.
+
+        On the first start (expiry_alerts empty) crossings dated before
+        today are recorded as sent rather than alerted: the daily
+        check_expiry.py run this replaces has reported them already.
+        Crossings falling today are still alerted.
+        """
+        now = now or datetime.now()
+        db = self.session_factory()
+        try:
+            # Take the cursor first so changes made during the load are replayed
+            self._cursor = db.query(func.coalesce(func.max(ChangeLogORM.seq), 0)).scalar()
+            sent = self._sent(db)
+            seed_before = None if sent else datetime.combine(now.date(), time_of_day.min)
+            seeded = []
+            documents = db.query(ComplianceDocumentORM.id, ComplianceDocumentORM.expiry_date).yield_per(
+                self.LOAD_BATCH_SIZE
+            )
+            for document_id, expiry_date in documents:
+                done = sent.get((document_id, expiry_date), ())
+                if seed_before is not None:
+                    done = [days for days in self.heap.thresholds if crossing_time(expiry_date, days) < seed_before]
+                    seeded.extend(
+                        {"document_id": document_id, "threshold_days": days, "expiry_date": expiry_date}
+                        for days in done
+                    )
+                self.heap.schedule(document_id, expiry_date, done, now)
+
+            for start in range(0, len(seeded), self.LOAD_BATCH_SIZE):
+                db.execute(insert(ExpiryAlertORM), seeded[start:start + self.LOAD_BATCH_SIZE])
+            db.commit()
+        finally:
+            db.close()
+        if seeded:
+            logger.info("First start: recorded %d crossings before today as already alerted", len(seeded))
+        logger.info("Scheduled %d documents", len(self.heap))
+
+    def refresh(self, db, now=None):
+        """Apply document writes recorded in the change log since the last call."""
+        changed = db.query(ChangeLogORM.seq, ChangeLogORM.entity_id).filter(
+            ChangeLogORM.seq > self._cursor,
+            ChangeLogORM.entity == "document"
+        ).order_by(ChangeLogORM.seq).all()
+        if not changed:
+            return
+        self._cursor = changed[-1].seq
+
+        ids = list({change.entity_id for change in changed})
+        for start in range(0, len(ids), self.LOAD_BATCH_SIZE):
+            batch = ids[start:start + self.LOAD_BATCH_SIZE]
+            current = dict(db.query(ComplianceDocumentORM.id, ComplianceDocumentORM.expiry_date).filter(
+                ComplianceDocumentORM.id.in_(batch)
+            ).all())
+            sent = self._sent(db, batch)
+            for document_id in batch:
+                if document_id in current:
+                    expiry_date = current[document_id]
+                    self.heap.schedule(document_id, expiry_date, sent.get((document_id, expiry_date), ()), now)
+                else:
+                    self.heap.remove(document_id)
+
+    def fire_due(self, db, now=None):
+        """
+        Alert every crossing due by now, in one notification.
+
+        Returns:
+            Number of documents alerted
+        """
+        now = now or datetime.now()
+        due = self.heap.pop_due(now)
+        if not due:
+            return 0
+
+        documents = {
+            doc.id: doc for doc in db.query(ComplianceDocumentORM).options(
+                selectinload(ComplianceDocumentORM.subcontractor).selectinload(SubcontractorORM.projects)
+            ).filter(ComplianceDocumentORM.id.in_({document_id for document_id, _, _ in due})).all()
+        }
+        alerts = []
+        for document_id, days, expiry_date in due:
+            doc = documents.get(document_id)
+            # A write the change log has not delivered yet; refresh() reschedules it
+            if doc is None or doc.expiry_date != expiry_date:
+                continue
+            alerts.append((doc, days))
+            db.add(ExpiryAlertORM(document_id=document_id, threshold_days=days, expiry_date=expiry_date))
+        if not alerts:
+            return 0
+
+        try:
+            sent = self.notify(db, alerts)
+        except Exception:
+            logger.exception("Expiry notification failed")
+            sent = False
+
+        if sent:
+            db.commit()
+            return len(alerts)
+
+        db.rollback()
+        retry_at = now + timedelta(seconds=self.RETRY_SECONDS)
+        for doc, days in alerts:
+            self.heap.retry(doc.id, days, doc.expiry_date, retry_at)
+        logger.warning("Could not send %d expiry alerts; retrying at %s", len(alerts), retry_at)
+        return 0
+
+    def run_once(self, now=None):
+        """
+        Pick up document changes and fire due alerts.
+
+        Returns:
+            Seconds to sleep before the next run
+        """
+        db = self.session_factory()
+        try:
+            self.refresh(db, now)
+            self.fire_due(db, now)
+        finally:
+            db.close()
+
+        poll = self.LISTEN_POLL_SECONDS if self._listener is not None else self.poll_seconds
+        next_time = self.heap.next_time()
+        if next_time is None:
+            return poll
+        return max(0.0, min(poll, (next_time - (now or datetime.now())).total_seconds()))
+
+    def run_forever(self):
+        """Load documents, then alert crossings as they come due until interrupted."""
+        self.load()
+        while True:
+            if self._listener is None:
+                self._listener = self._listen()
+            self._wait(self.run_once())
+
+    def _listen(self):
+        if self.engine is None or self.engine.dialect.driver != "psycopg2":
+            return None
+        try:
+            connection = self.engine.raw_connection()
+            connection.dbapi_connection.autocommit = True
+            cursor = connection.dbapi_connection.cursor()
+            cursor.execute(f"LISTEN {DOCUMENT_CHANNEL}")
+            cursor.close()
+            return connection
+        except Exception as e:
+            logger.warning("LISTEN failed, polling the change log instead: %s", e)
+            return None
+
+    def _wait(self, timeout):
+        """Sleep up to timeout seconds; a document notification ends the wait early."""
+        if self._listener is None:
+            time.sleep(timeout)
+            return
+        connection = self._listener.dbapi_connection
+        try:
+            if select.select([connection], [], [], timeout)[0]:
+                connection.poll()
+                connection.notifies.clear()
+        except Exception as e:
+            logger.warning("Lost the notification connection: %s", e)
+            self._listener.invalidate()
+            self._listener = None
+
+    @staticmethod
+    def _sent(db, document_ids=None):
+        """(document_id, expiry_date) -> thresholds already alerted."""
+        query = db.query(ExpiryAlertORM.document_id, ExpiryAlertORM.expiry_date, ExpiryAlertORM.threshold_days)
+        if document_ids is not None:
+            query = query.filter(ExpiryAlertORM.document_id.in_(document_ids))
+        sent = {}
+        for document_id, expiry_date, days in query:
+            sent.setdefault((document_id, expiry_date), set()).add(days)
+        return sent
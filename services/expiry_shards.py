@@ -0,0 +1,159 @@
+"""
+Sharding for the daily compliance expiry check.
+Documents are split into shards by a hash of their subcontractor ID, and
+each shard is checked by exactly one worker per day, whichever node it
+runs on, so the check can run on every node without duplicate alerts.
+The documents found by all shards go out in one digest a day, queued by
+whichever worker finds every shard done.
+"""
+import zlib
+from datetime import datetime
+
+from sqlalchemy import BigInteger, cast, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
+
+from database.models import ComplianceDocumentORM, ExpiryCheckRunORM, ExpiryCheckShardORM, SubcontractorORM
+
+# Subcontractor IDs per IN (...) list
+ID_BATCH_SIZE = 5000
+
+
+def shard_of(subcontractor_id, shards):
+    """
+    Shard of a subcontractor on databases other than PostgreSQL: CRC32 of
+    its ID, stable across processes and nodes.
+    """
+    return zlib.crc32(subcontractor_id.encode("utf-8")) % shards
+
+
+def shard_key(column, shards):
+    """
+    Shard of a subcontractor ID column, computed by PostgreSQL:
+    hashtext() of the ID modulo shards. hashtext() can be negative, so
+    the remainder is shifted into 0..shards-1.
+    """
+    return (cast(func.hashtext(column), BigInteger) % shards + shards) % shards
+
+
+def subcontractor_shards(db, shards):
+    """
+    Subcontractor IDs of every shard by shard_of(), for databases
+    without hashtext(). Read once per worker rather than once per shard.
+
+    Returns:
+        Dict of shard -> list of subcontractor IDs
+    """
+    by_shard = {}
+    for (sub_id,) in db.query(SubcontractorORM.id):
+        by_shard.setdefault(shard_of(sub_id, shards), []).append(sub_id)
+    return by_shard
+
+
+def ensure_shards(db, shards):
+    """
+    Make expiry_check_shards hold exactly shards 0..shards-1.
+
+    Every node must use the same EXPIRY_CHECK_SHARDS; changing it
+    redistributes subcontractors, so change it between daily runs.
+    """
+    existing = {shard for (shard,) in db.query(ExpiryCheckShardORM.shard)}
+    db.add_all(ExpiryCheckShardORM(shard=shard) for shard in range(shards) if shard not in existing)
+    db.query(ExpiryCheckShardORM).filter(ExpiryCheckShardORM.shard >= shards).delete(synchronize_session=False)
+    db.commit()
+
+
+def claim_shard(db, run_date):
+    """
+    Lock one shard not yet checked on run_date.
+
+    On PostgreSQL the row is locked with FOR UPDATE SKIP LOCKED, so
+    concurrent workers each get a different shard without waiting. The
+    lock lasts until db commits or rolls back: complete_shard() commits
+    once the shard is done, and a worker that dies mid-shard releases it
+    for another worker to pick up.
+
+    Returns:
+        ExpiryCheckShardORM, or None when every shard has been checked
+    """
+    return db.query(ExpiryCheckShardORM).filter(
+        (ExpiryCheckShardORM.last_run_date.is_(None)) | (ExpiryCheckShardORM.last_run_date < run_date)
+    ).order_by(ExpiryCheckShardORM.shard).limit(1).with_for_update(skip_locked=True).first()
+
+
+def complete_shard(db, shard, run_date, worker, documents=()):
+    """
+    Mark a claimed shard checked for run_date and release it.
+
+    Args:
+        documents: [document_id, expiry_date] pairs the shard found,
+            kept for the day's digest (see claim_digest)
+    """
+    shard.last_run_date = run_date
+    shard.checked_by = worker
+    shard.checked_at = datetime.utcnow()
+    shard.documents = [list(pair) for pair in documents]
+    db.commit()
+
+
+def claim_digest(db, run_date, worker):
+    """
+    Claim the digest of run_date once every shard has been checked.
+
+    Each worker calls this after its last shard. While another worker
+    still holds a shard, that worker is left to queue the digest when it
+    finishes. Workers that finish together both see every shard done;
+    the expiry_check_runs primary key lets only one of them claim it.
+    Not committed: the caller queues the digest in the same transaction,
+    so if it dies first the next run of the script queues it instead.
+
+    Returns:
+        List of [document_id, expiry_date] pairs from every shard, or
+        None when the digest is not this worker's to queue
+    """
+    pending = db.query(ExpiryCheckShardORM.shard).filter(
+        (ExpiryCheckShardORM.last_run_date.is_(None)) | (ExpiryCheckShardORM.last_run_date < run_date)
+    ).first()
+    if pending is not None:
+        return None
+
+    db.add(ExpiryCheckRunORM(run_date=run_date, queued_by=worker, queued_at=datetime.utcnow()))
+    try:
+        db.flush()
+    except IntegrityError:
+        db.rollback()
+        return None
+    rows = db.query(ExpiryCheckShardORM.documents).filter(
+        ExpiryCheckShardORM.last_run_date == run_date
+    ).order_by(ExpiryCheckShardORM.shard)
+    return [pair for (documents,) in rows for pair in documents or []]
+
+
+def shard_documents(db, shard, shards, through_date, subcontractor_ids=None):
+    """
+    Documents of one shard expiring on or before through_date, with
+    their subcontractors and projects loaded.
+
+    On PostgreSQL the shard is computed in the query from the documents'
+    subcontractor IDs, so only expiring documents are hashed. Elsewhere
+    the documents are selected by the shard's subcontractor IDs: pass
+    them from subcontractor_shards(), or they are read here.
+
+    Returns:
+        List of ComplianceDocumentORM ordered by expiry date
+    """
+    query = db.query(ComplianceDocumentORM).options(
+        selectinload(ComplianceDocumentORM.subcontractor).selectinload(SubcontractorORM.projects)
+    ).filter(ComplianceDocumentORM.expiry_date <= through_date)
+
+    if db.get_bind().dialect.name == "postgresql":
+        documents = query.filter(shard_key(ComplianceDocumentORM.subcontractor_id, shards) == shard).all()
+    else:
+        if subcontractor_ids is None:
+            subcontractor_ids = subcontractor_shards(db, shards).get(shard, [])
+        documents = []
+        for start in range(0, len(subcontractor_ids), ID_BATCH_SIZE):
+            documents.extend(query.filter(
+                ComplianceDocumentORM.subcontractor_id.in_(subcontractor_ids[start:start + ID_BATCH_SIZE])
+            ).all())
+    return sorted(documents, key=lambda doc: (doc.expiry_date, doc.id))
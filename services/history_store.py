@@ -0,0 +1,69 @@
+"""
+Asset movement history across the hot asset_history table and the
+Parquet archive. Callers get one list regardless of where rows live.
+"""
+from database.history_archive import HistoryArchive
+from database.models import AssetHistoryORM
+
+
+def _row(record):
+    return {
+        "id": record.id,
+        "asset_id": record.asset_id,
+        "project_id": record.project_id,
+        "moved_at": record.moved_at,
+        "moved_by": record.moved_by,
+    }
+
+
+class HistoryStore:
+    """
+    Union of hot and archived asset history.
+
+    Rows are dicts with id, asset_id, project_id, moved_at and moved_by.
+    A row present in both places (an archive run interrupted between
+    writing the file and dropping the month) is returned once.
+    """
+
+    def __init__(self, archive):
+        self.archive = archive
+
+    def history(self, db, asset_ids=None, start=None, end=None, newest_first=True):
+        """
+        Movements of some (or all) assets with moved_at in [start, end).
+
+        Args:
+            db: SQLAlchemy session for the hot rows
+            asset_ids: Asset IDs to include, or None for all assets
+            start, end: Optional moved_at bounds (naive UTC datetimes)
+            newest_first: Sort order by moved_at
+
+        Returns:
+            List of row dicts
+        """
+        query = db.query(AssetHistoryORM)
+        if asset_ids is not None:
+            query = query.filter(AssetHistoryORM.asset_id.in_(list(asset_ids)))
+        if start is not None:
+            query = query.filter(AssetHistoryORM.moved_at >= start)
+        if end is not None:
+            query = query.filter(AssetHistoryORM.moved_at < end)
+
+        rows = {record.id: _row(record) for record in query}
+        for record in self.archive.read(asset_ids=asset_ids, start=start, end=end):
+            rows.setdefault(record["id"], record)
+
+        return sorted(rows.values(), key=lambda r: (r["moved_at"], r["id"]), reverse=newest_first)
+
+    def asset_history(self, db, asset_id):
+        """One asset's full movement history, newest first."""
+        return self.history(db, asset_ids=[asset_id])
+
+
+def _create_store():
+    from api.config import get_config
+    return HistoryStore(HistoryArchive(get_config().HISTORY_ARCHIVE_DIR))
+
+
+# Shared store used by the API
+history_store = _create_store()
@@ -0,0 +1,150 @@
+"""
+Stored responses for idempotent retries.
+Keeps the response to each request sent with an Idempotency-Key in the
+idempotency_keys table, shared by every API process and node, so a retry
+gets the original response back instead of repeating the write.
+"""
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from sqlalchemy.exc import IntegrityError
+
+from database.models import IdempotencyKeyORM
+
+StoredResponse = namedtuple("StoredResponse", ["status_code", "content_type", "body"])
+
+
+class IdempotencyKeyInUse(Exception):
+    """Raised when the original request with a key has not finished yet."""
+
+
+class IdempotencyKeyMismatch(Exception):
+    """Raised when a key is reused for a different request."""
+
+
+class IdempotencyStore:
+    """
+    Keyed store of responses with expiry.
+
+    begin() reserves a key by inserting its row before the request runs,
+    so of two concurrent requests with the same key only one runs; the
+    other is told the key is in use. finish() records the response and
+    release() drops the reservation so the request can be retried.
+    Entries expire ttl seconds after they were created and are purged at
+    most once per PURGE_INTERVAL_SECONDS. A reservation older than
+    lock_timeout is taken to belong to a request that died and can be
+    taken over.
+    """
+
+    PURGE_INTERVAL_SECONDS = 300
+
+    def __init__(self, session_factory, ttl=86400, lock_timeout=60):
+        """
+        Args:
+            session_factory: Callable returning a SQLAlchemy session
+            ttl: Seconds a response is replayed for
+            lock_timeout: Seconds before an unfinished request's key can be reused
+        """
+        self.session_factory = session_factory
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self._last_purge = None
+
+    def begin(self, key, request_hash, now=None):
+        """
+        Reserve a key, or return the response already stored for it.
+
+        Args:
+            key: Scoped key (see api/middleware/idempotency.py)
+            request_hash: Fingerprint of the request body
+            now: Current UTC time (default: now)
+
+        Returns:
+            None if the key was reserved and the request should run,
+            otherwise the StoredResponse to replay
+
+        Raises:
+            IdempotencyKeyInUse: The first request with the key is still running
+            IdempotencyKeyMismatch: The key was used for a different request
+        """
+        now = now or datetime.utcnow()
+        db = self.session_factory()
+        try:
+            self._purge(db, now)
+            # Two rounds: the existing row may expire or be released in between
+            for _ in range(2):
+                db.add(IdempotencyKeyORM(key=key, request_hash=request_hash, created_at=now))
+                try:
+                    db.commit()
+                    return None
+                except IntegrityError:
+                    db.rollback()
+
+                record = db.get(IdempotencyKeyORM, key)
+                if record is None:
+                    continue
+                if record.created_at <= now - timedelta(seconds=self.ttl):
+                    self._delete(db, key, record.created_at)
+                    continue
+                if record.request_hash != request_hash:
+                    raise IdempotencyKeyMismatch("Idempotency-Key was already used for a different request")
+                if record.status_code is not None:
+                    return StoredResponse(record.status_code, record.content_type, record.body)
+                if record.created_at <= now - timedelta(seconds=self.lock_timeout):
+                    # Take over from a request that never finished
+                    taken = db.query(IdempotencyKeyORM).filter(
+                        IdempotencyKeyORM.key == key,
+                        IdempotencyKeyORM.created_at == record.created_at,
+                        IdempotencyKeyORM.status_code.is_(None)
+                    ).update({"created_at": now}, synchronize_session=False)
+                    db.commit()
+                    if taken:
+                        return None
+                    continue
+                raise IdempotencyKeyInUse("A request with this Idempotency-Key is still in progress")
+            raise IdempotencyKeyInUse("A request with this Idempotency-Key is still in progress")
+        finally:
+            db.close()
+
+    def finish(self, key, status_code, content_type, body):
+        """Store the response to a reserved key."""
+        db = self.session_factory()
+        try:
+            db.query(IdempotencyKeyORM).filter(IdempotencyKeyORM.key == key).update({
+                "status_code": status_code,
+                "content_type": content_type,
+                "body": body
+            }, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def release(self, key):
+        """Drop a reservation without storing a response, so the request can be retried."""
+        db = self.session_factory()
+        try:
+            db.query(IdempotencyKeyORM).filter(
+                IdempotencyKeyORM.key == key,
+                IdempotencyKeyORM.status_code.is_(None)
+            ).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    @staticmethod
+    def _delete(db, key, created_at):
+        db.query(IdempotencyKeyORM).filter(
+            IdempotencyKeyORM.key == key,
+            IdempotencyKeyORM.created_at == created_at
+        ).delete(synchronize_session=False)
+        db.commit()
+
+    def _purge(self, db, now):
+        if self._last_purge is not None and time.monotonic() - self._last_purge < self.PURGE_INTERVAL_SECONDS:
+            return
+        self._last_purge = time.monotonic()
+        db.query(IdempotencyKeyORM).filter(
+            IdempotencyKeyORM.created_at <= now - timedelta(seconds=self.ttl)
+        ).delete(synchronize_session=False)
+        db.commit()
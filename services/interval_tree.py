@@ -0,0 +1,126 @@
+"""
+Static interval tree over NumPy arrays.
+Answers "which intervals contain time t" in O(log n + k) for half-open
+integer intervals [start, end), such as asset residency periods.
+"""
+import numpy as np
+
+# Stand-in end for intervals that are still open
+OPEN_END = np.iinfo(np.int64).max
+
+
+class IntervalTree:
+    """
+    Centered interval tree.
+
+    Each node splits its intervals at the median endpoint ("center"):
+    intervals ending at or before the center go left, intervals starting
+    after it go right, and the ones containing it stay in the node, kept
+    twice, sorted by start and sorted by end. A stab query walks one path
+    from the root and takes a prefix or suffix of each node's sorted
+    arrays with searchsorted, so nothing is scanned one interval at a time
+    except in leaves of at most LEAF_SIZE intervals.
+    """
+
+    LEAF_SIZE = 256
+
+    def __init__(self, starts, ends):
+        """
+        Build the tree.
+
+        Args:
+            starts, ends: int64 arrays of equal length; interval i is
+                [starts[i], ends[i]) and must not be empty
+        """
+        self.starts = np.asarray(starts, dtype=np.int64)
+        self.ends = np.asarray(ends, dtype=np.int64)
+
+        # Node arrays: center, left and right child (-1 for none), and the
+        # node's interval indices by start and by end (a leaf uses by_start)
+        self._center = []
+        self._left = []
+        self._right = []
+        self._by_start = []
+        self._by_end = []
+
+        self._root = self._build(np.arange(len(self.starts)))
+
+    def __len__(self):
+        return len(self.starts)
+
+    def _new_node(self, center, by_start, by_end):
+        self._center.append(center)
+        self._left.append(-1)
+        self._right.append(-1)
+        self._by_start.append(by_start)
+        self._by_end.append(by_end)
+        return len(self._center) - 1
+
+    def _build(self, indices):
+        root = -1
+        stack = [(indices, None, None)]     # (intervals, parent node, side)
+        while stack:
+            indices, parent, side = stack.pop()
+            node = self._split(indices, stack)
+            if parent is None:
+                root = node
+            elif side == "left":
+                self._left[parent] = node
+            else:
+                self._right[parent] = node
+        return root
+
+    def _split(self, indices, stack):
+        starts, ends = self.starts[indices], self.ends[indices]
+        if len(indices) <= self.LEAF_SIZE:
+            return self._new_node(None, indices, None)
+
+        endpoints = np.concatenate([starts, ends])
+        middle = len(endpoints) // 2
+        center = np.partition(endpoints, middle)[middle]
+
+        left = ends <= center
+        right = starts > center
+        here = ~(left | right)
+        if left.all() or right.all():
+            # Every endpoint sits on the center; nothing left to split
+            return self._new_node(None, indices, None)
+
+        mine = indices[here]
+        by_start = mine[np.argsort(self.starts[mine], kind="stable")]
+        by_end = mine[np.argsort(self.ends[mine], kind="stable")]
+        node = self._new_node(center, by_start, by_end)
+
+        if left.any():
+            stack.append((indices[left], node, "left"))
+        if right.any():
+            stack.append((indices[right], node, "right"))
+        return node
+
+    def stab(self, t):
+        """
+        Indices of the intervals that contain t.
+
+        Returns:
+            int array of positions in the starts/ends arrays, unordered
+        """
+        found = []
+        node = self._root
+        while node != -1:
+            center = self._center[node]
+            if center is None:
+                leaf = self._by_start[node]
+                found.append(leaf[(self.starts[leaf] <= t) & (self.ends[leaf] > t)])
+                break
+            if t < center:
+                # Every interval here ends after the center, so after t
+                by_start = self._by_start[node]
+                found.append(by_start[:np.searchsorted(self.starts[by_start], t, side="right")])
+                node = self._left[node]
+            else:
+                # Every interval here starts at or before the center, so by t
+                by_end = self._by_end[node]
+                found.append(by_end[np.searchsorted(self.ends[by_end], t, side="right"):])
+                node = self._right[node]
+
+        return np.concatenate(found) if found else np.empty(0, dtype=np.int64)
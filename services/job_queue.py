@@ -0,0 +1,216 @@
+"""
+Database-backed background jobs.
+Work is queued as rows in the jobs table, in the caller's transaction, and
+run by worker processes (scripts/job_worker.py) that claim rows with
+SELECT ... FOR UPDATE SKIP LOCKED, so no broker is needed and any number
+of workers on any number of nodes can share the queue.
+"""
+import logging
+import os
+import socket
+import time
+from datetime import datetime, timedelta
+
+from database.models import JobORM
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ATTEMPTS = 5
+
+# Retry delay after the nth failed attempt: BASE * 2 ** (n - 1), capped
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 3600
+
+
+def enqueue(db, kind, payload=None, priority=0, delay_seconds=0, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """
+    Queue a job. It is added to db but not committed, so it is queued
+    exactly when the caller's own writes are.
+
+    Args:
+        db: SQLAlchemy session
+        kind: Name of the handler that runs the job
+        payload: JSON-serialisable arguments for the handler
+        priority: Higher priorities are dequeued first
+        delay_seconds: Do not run before this many seconds from now
+        max_attempts: Attempts before the job is marked failed
+
+    Returns:
+        JobORM
+    """
+    job = JobORM(
+        kind=kind,
+        payload=payload if payload is not None else {},
+        priority=priority,
+        status="queued",
+        attempts=0,
+        max_attempts=max_attempts,
+        run_at=datetime.utcnow() + timedelta(seconds=delay_seconds)
+    )
+    db.add(job)
+    return job
+
+
+def backoff_seconds(attempts):
+    """Delay before retrying a job that has failed attempts times."""
+    return min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** max(0, attempts - 1))
+
+
+class JobWorker:
+    """
+    Claims jobs one at a time and runs their handlers.
+
+    A claim marks the job running and moves its run_at to the end of the
+    visibility timeout, in a short transaction, so other workers skip it
+    while it runs. If the worker dies, the job becomes visible again when
+    the timeout passes and is retried by another worker. The handler runs
+    with the worker's session, and its writes are committed together with
+    the job's completion; an exception rolls them back and schedules a
+    retry with exponential backoff, until max_attempts is reached.
+    Settling a job only succeeds while the worker still holds it, so a
+    job whose timeout ran out is not completed twice.
+    """
+
+    POLL_SECONDS = 1
+    PURGE_INTERVAL_SECONDS = 3600
+    # Finished jobs kept for inspection; failed jobs are kept until removed
+    KEEP_DONE_DAYS = 7
+
+    def __init__(self, session_factory, handlers, visibility_timeout=300, poll_seconds=POLL_SECONDS, worker_id=None):
+        """
+        Args:
+            session_factory: Callable returning a SQLAlchemy session
+            handlers: Dict of kind -> callable(db, payload); raising
+                an exception fails the attempt
+            visibility_timeout: Seconds a claimed job is hidden from other workers
+            poll_seconds: Sleep between polls while the queue is empty
+            worker_id: Name recorded on claimed jobs (default: host:pid)
+        """
+        self.session_factory = session_factory
+        self.handlers = handlers
+        self.visibility_timeout = visibility_timeout
+        self.poll_seconds = poll_seconds
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self._last_purge = None
+
+    def claim(self, db, now=None):
+        """
+        Take the next visible job and commit the claim.
+
+        Returns:
+            (job id, attempt number), or None when nothing is due
+        """
+        now = now or datetime.utcnow()
+        while True:
+            job = db.query(JobORM).filter(
+                JobORM.status.in_(("queued", "running")),
+                JobORM.run_at <= now
+            ).order_by(
+                JobORM.priority.desc(), JobORM.run_at, JobORM.id
+            ).limit(1).with_for_update(skip_locked=True).first()
+            if job is None:
+                db.commit()
+                return None
+
+            # A running job seen here outlived its visibility timeout
+            if job.status == "running" and job.attempts >= job.max_attempts:
+                job.status = "failed"
+                job.last_error = f"Visibility timeout expired on {job.locked_by}"
+                job.finished_at = now
+                db.commit()
+                continue
+
+            job.status = "running"
+            job.attempts += 1
+            job.locked_by = self.worker_id
+            job.run_at = now + timedelta(seconds=self.visibility_timeout)
+            claimed = (job.id, job.attempts)
+            db.commit()
+            return claimed
+
+    def run_once(self, now=None):
+        """
+        Claim and run one job.
+
+        Returns:
+            True if a job was run, False if the queue had nothing due
+        """
+        db = self.session_factory()
+        try:
+            claimed = self.claim(db, now)
+            if claimed is None:
+                return False
+            job_id, attempt = claimed
+            job = db.get(JobORM, job_id)
+
+            handler = self.handlers.get(job.kind)
+            try:
+                if handler is None:
+                    raise LookupError(f"No handler for job kind {job.kind!r}")
+                handler(db, job.payload)
+            except Exception as e:
+                db.rollback()
+                logger.warning("Job %s (%s) attempt %d failed: %s", job_id, job.kind, attempt, e)
+                self._settle(db, job_id, attempt, error=f"{type(e).__name__}: {e}", now=now)
+                return True
+
+            if not self._settle(db, job_id, attempt, now=now):
+                logger.warning("Job %s (%s) was taken over before it finished", job_id, job.kind)
+            return True
+        finally:
+            db.close()
+
+    def run_forever(self):
+        """Run jobs as they come due until interrupted."""
+        logger.info("Job worker %s started", self.worker_id)
+        while True:
+            if not self.run_once():
+                self._purge()
+                time.sleep(self.poll_seconds)
+
+    def _settle(self, db, job_id, attempt, error=None, now=None):
+        """
+        Complete or reschedule a job this worker holds, together with any
+        writes pending in db.
+
+        Returns:
+            False if the job was claimed again meanwhile (nothing written)
+        """
+        now = now or datetime.utcnow()
+        job = db.get(JobORM, job_id, with_for_update=True, populate_existing=True)
+        if job is None or job.status != "running" or job.attempts != attempt or job.locked_by != self.worker_id:
+            db.rollback()
+            return False
+
+        if error is None:
+            job.status = "done"
+            job.finished_at = now
+            job.last_error = None
+        elif job.attempts >= job.max_attempts:
+            job.status = "failed"
+            job.finished_at = now
+            job.last_error = error
+        else:
+            job.status = "queued"
+            job.run_at = now + timedelta(seconds=backoff_seconds(job.attempts))
+            job.last_error = error
+        job.locked_by = None
+        db.commit()
+        return True
+
+    def _purge(self):
+        """Delete old finished jobs, at most once per PURGE_INTERVAL_SECONDS."""
+        if self._last_purge is not None and time.monotonic() - self._last_purge < self.PURGE_INTERVAL_SECONDS:
+            return
+        self._last_purge = time.monotonic()
+        db = self.session_factory()
+        try:
+            deleted = db.query(JobORM).filter(
+                JobORM.status == "done",
+                JobORM.finished_at < datetime.utcnow() - timedelta(days=self.KEEP_DONE_DAYS)
+            ).delete(synchronize_session=False)
+            db.commit()
+            if deleted:
+                logger.info("Purged %d finished jobs", deleted)
+        finally:
+            db.close()
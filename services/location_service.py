@@ -0,0 +1,277 @@
+"""
+Point-in-time asset locations ("where was asset A at time T", "which
+assets were on project P at time T") over hot and archived history.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import String, func, select, type_coerce
+
+from database.models import AssetHistoryORM, ChangeLogORM
+from database.partitions import add_months
+from services.interval_tree import IntervalTree, OPEN_END
+
+
+def to_micros(values):
+    """datetimes, ISO strings or datetime64 values as int64 microseconds."""
+    return pd.to_datetime(values, format="ISO8601").to_numpy(dtype="datetime64[us]").astype(np.int64)
+
+
+def from_micros(values):
+    """int64 microseconds as naive datetimes, None for open ends."""
+    values = np.asarray(values, dtype=np.int64)
+    open_end = values == OPEN_END
+    datetimes = np.where(open_end, 0, values).astype("datetime64[us]").tolist()
+    return [None if is_open else value for value, is_open in zip(datetimes, open_end.tolist())]
+
+
+class LocationIndex:
+    """
+    Residency intervals of every asset, indexed by asset and by project.
+
+    Moves are kept sorted by (asset, moved_at); interval i runs from move
+    i to the same asset's next move, or is open if there is none. An
+    asset's moves are a contiguous slice found through its offset, and
+    each project has an IntervalTree over the intervals spent there.
+    """
+
+    def __init__(self, asset_ids, project_ids, moved_at):
+        """
+        Args:
+            asset_ids, project_ids: Arrays with one entry per move
+                (project None for an unassignment)
+            moved_at: int64 microsecond times of the moves
+        """
+        moves = pd.DataFrame({
+            "asset_id": np.asarray(asset_ids, dtype=object),
+            "project_id": pd.Series(project_ids, dtype=object).fillna("").to_numpy(),
+            "moved_at": np.asarray(moved_at, dtype=np.int64),
+        }).drop_duplicates().sort_values(["asset_id", "moved_at"], kind="stable")
+
+        self.asset_codes, assets = pd.factorize(moves["asset_id"], sort=True)
+        self.project_codes, projects = pd.factorize(moves["project_id"], sort=True)
+        self.assets = assets.to_numpy(dtype=object)
+        self.projects = projects.to_numpy(dtype=object)
+        self.starts = moves["moved_at"].to_numpy()
+        self._asset_lookup = {asset_id: code for code, asset_id in enumerate(self.assets)}
+
+        self.offsets = np.searchsorted(self.asset_codes, np.arange(len(self.assets) + 1))
+        self.ends = np.full(len(self.starts), OPEN_END)
+        if len(self.starts) > 1:
+            same_asset = self.asset_codes[1:] == self.asset_codes[:-1]
+            self.ends[:-1] = np.where(same_asset, self.starts[1:], OPEN_END)
+
+        # One tree per project over its non-empty intervals
+        self._trees = {}
+        usable = np.flatnonzero(self.ends > self.starts)
+        order = usable[np.argsort(self.project_codes[usable], kind="stable")]
+        bounds = np.searchsorted(self.project_codes[order], np.arange(len(self.projects) + 1))
+        for code in range(len(self.projects)):
+            rows = order[bounds[code]:bounds[code + 1]]
+            if len(rows) and self.projects[code] != "":
+                self._trees[self.projects[code]] = (rows, IntervalTree(self.starts[rows], self.ends[rows]))
+
+    def __len__(self):
+        return len(self.starts)
+
+    def moves_of(self, asset_id):
+        """(moved_at, project_id) pairs of one asset, oldest first."""
+        code = self._asset_lookup.get(asset_id)
+        if code is None:
+            return []
+        lo, hi = self.offsets[code], self.offsets[code + 1]
+        projects = self.projects[self.project_codes[lo:hi]]
+        return list(zip(self.starts[lo:hi].tolist(), projects.tolist()))
+
+    def assets_at(self, project_id, t):
+        """(asset_ids, since, until) arrays of the intervals at project_id containing t."""
+        entry = self._trees.get(project_id)
+        if entry is None:
+            return np.array([], dtype=object), np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+        rows, tree = entry
+        hits = rows[tree.stab(t)]
+        return self.assets[self.asset_codes[hits]], self.starts[hits], self.ends[hits]
+
+    def merged(self, recent):
+        """New index with the moves from a {asset_id: [(moved_at, project_id)]} dict added."""
+        extra = [(asset_id, project_id, moved_at)
+                 for asset_id, moves in recent.items() for moved_at, project_id in moves]
+        if not extra:
+            return self
+        asset_ids, project_ids, moved_at = zip(*extra)
+        return LocationIndex(
+            np.concatenate([self.assets[self.asset_codes], np.array(asset_ids, dtype=object)]),
+            np.concatenate([self.projects[self.project_codes], np.array(project_ids, dtype=object)]),
+            np.concatenate([self.starts, np.array(moved_at, dtype=np.int64)]),
+        )
+
+
+def _locate(moves, t):
+    """(project_id, since, until) from (moved_at, project_id) pairs, or None before the first move."""
+    moves = sorted(moves, key=lambda move: move[0])
+    times = [moved_at for moved_at, _ in moves]
+    position = int(np.searchsorted(times, t, side="right")) - 1
+    if position < 0:
+        return None
+    until = times[position + 1] if position + 1 < len(times) else OPEN_END
+    return moves[position][1] or None, moves[position][0], until
+
+
+class LocationService:
+    """
+    Time-travel queries over asset movement history.
+
+    A single asset's location is answered from the (asset_id, moved_at)
+    index, plus the archive when the time falls in an archived month. The
+    project query needs every asset's intervals, so it uses a LocationIndex
+    built from hot and archived history on first use. Moves recorded after
+    that are read from the change log on each query and overlaid, and
+    folded into a rebuilt index once there are REBUILD_AFTER of them.
+    """
+
+    LOAD_BATCH_SIZE = 100000
+    # History IDs per IN (...) list; PostgreSQL allows 65535 bind parameters per statement
+    ID_BATCH_SIZE = 5000
+    REBUILD_AFTER = 50000
+
+    def __init__(self, archive):
+        self.archive = archive
+        self._index = None
+        self._recent = {}       # asset_id -> [(moved_at, project_id)] since the build
+        self._recent_count = 0
+        self._cursor = 0
+        self._lock = threading.Lock()
+
+    def location_at(self, db, asset_id, at):
+        """
+        Where an asset was at a point in time.
+
+        Args:
+            db: SQLAlchemy session
+            asset_id: Asset ID
+            at: Naive UTC datetime
+
+        Returns:
+            Dict with project_id, since and until (None if still there),
+            or None if the asset has no recorded move at or before at
+        """
+        history = AssetHistoryORM
+        before = db.query(history.moved_at, history.project_id).filter(
+            history.asset_id == asset_id, history.moved_at <= at
+        ).order_by(history.moved_at.desc(), history.id.desc()).first()
+        after = db.query(history.moved_at, history.project_id).filter(
+            history.asset_id == asset_id, history.moved_at > at
+        ).order_by(history.moved_at, history.id).first()
+        moves = [(to_micros([row.moved_at])[0], row.project_id) for row in (before, after) if row]
+
+        # Archived months only matter if the answer could lie in one of them
+        months = self.archive.months()
+        if months:
+            archived_until = add_months(pd.Timestamp(max(months) + "-01").to_pydatetime(), 1)
+            if before is None or before.moved_at < archived_until or at < archived_until:
+                table = self.archive.read_table(asset_range=(asset_id, asset_id + "\0"))
+                if table is not None:
+                    moves.extend(zip(to_micros(table["moved_at"].to_pandas()).tolist(),
+                                     table["project_id"].to_pylist()))
+
+        found = _locate(moves, to_micros([at])[0])
+        if found is None:
+            return None
+        project_id, since, until = found
+        since, until = from_micros([since, until])
+        return {"project_id": project_id, "since": since, "until": until}
+
+    def assets_at(self, db, project_id, at):
+        """
+        Assets that were at a project at a point in time.
+
+        Returns:
+            List of dicts with asset_id, since and until (None if still
+            there), ordered by since
+        """
+        t = to_micros([at])[0]
+        with self._lock:
+            if self._index is None:
+                self._build(db)
+            else:
+                self._refresh(db)
+            index, recent = self._index, self._recent
+
+            asset_ids, since, until = index.assets_at(project_id, t)
+            if recent:
+                keep = ~np.isin(asset_ids, list(recent))
+                asset_ids, since, until = asset_ids[keep], since[keep], until[keep]
+                overlaid = []
+                for asset_id, moves in recent.items():
+                    located = _locate(index.moves_of(asset_id) + moves, t)
+                    if located and located[0] == project_id:
+                        overlaid.append((asset_id,) + located[1:])
+                if overlaid:
+                    extra_ids, extra_since, extra_until = zip(*overlaid)
+                    asset_ids = np.concatenate([asset_ids, np.array(extra_ids, dtype=object)])
+                    since = np.concatenate([since, np.array(extra_since, dtype=np.int64)])
+                    until = np.concatenate([until, np.array(extra_until, dtype=np.int64)])
+
+        order = np.lexsort((asset_ids, since))
+        return [
+            {"asset_id": asset_id, "since": start, "until": end}
+            for asset_id, start, end in zip(asset_ids[order].tolist(), from_micros(since[order]), from_micros(until[order]))
+        ]
+
+    def _build(self, db):
+        # Take the cursor first so moves recorded during the load are replayed
+        self._cursor = db.query(func.coalesce(func.max(ChangeLogORM.seq), 0)).scalar()
+
+        table = AssetHistoryORM.__table__
+        asset_ids, project_ids, moved_at = [np.array([], dtype=object)], [np.array([], dtype=object)], []
+        result = db.connection().execution_options(yield_per=self.LOAD_BATCH_SIZE).execute(
+            select(table.c.asset_id, table.c.project_id, type_coerce(table.c.moved_at, String))
+        )
+        for rows in result.partitions():
+            batch_assets, batch_projects, batch_times = zip(*rows)
+            asset_ids.append(np.array(batch_assets, dtype=object))
+            project_ids.append(np.array(batch_projects, dtype=object))
+            moved_at.append(to_micros(batch_times))
+
+        archived = self.archive.read_table()
+        if archived is not None:
+            asset_ids.append(np.array(archived["asset_id"].to_pylist(), dtype=object))
+            project_ids.append(np.array(archived["project_id"].to_pylist(), dtype=object))
+            moved_at.append(to_micros(archived["moved_at"].to_pandas()))
+
+        moved_at = np.concatenate(moved_at) if moved_at else np.array([], dtype=np.int64)
+        self._index = LocationIndex(np.concatenate(asset_ids), np.concatenate(project_ids), moved_at)
+        self._recent, self._recent_count = {}, 0
+
+    def _refresh(self, db):
+        changed = db.query(ChangeLogORM.seq, ChangeLogORM.entity_id).filter(
+            ChangeLogORM.seq > self._cursor,
+            ChangeLogORM.entity == "asset_history",
+            ChangeLogORM.operation == "insert"
+        ).order_by(ChangeLogORM.seq).all()
+        if not changed:
+            return
+        self._cursor = changed[-1].seq
+
+        ids = [change.entity_id for change in changed]
+        for start in range(0, len(ids), self.ID_BATCH_SIZE):
+            rows = db.query(AssetHistoryORM.asset_id, AssetHistoryORM.project_id, AssetHistoryORM.moved_at).filter(
+                AssetHistoryORM.id.in_(ids[start:start + self.ID_BATCH_SIZE])
+            ).all()
+            for row in rows:
+                self._recent.setdefault(row.asset_id, []).append((to_micros([row.moved_at])[0], row.project_id))
+            self._recent_count += len(rows)
+
+        if self._recent_count >= self.REBUILD_AFTER:
+            self._index = self._index.merged(self._recent)
+            self._recent, self._recent_count = {}, 0
+
+
+def _create_service():
+    from services.history_store import history_store
+    return LocationService(history_store.archive)
+
+
+# Shared service used by the API
+location_service = _create_service()
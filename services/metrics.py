@@ -0,0 +1,200 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+Counters and histograms are sharded per thread so recording a value never
+takes a lock; shards are only summed when /metrics is scraped.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+
+
+class _ShardedMetric:
+    """
+    Base for metrics whose values live in one dict per thread.
+
+    Each thread only ever writes its own shard, so no lock is needed on
+    the hot path. Shards of finished threads are folded into _retired at
+    collection time; the WSGI server may start a thread per request, so
+    this keeps the shard list short.
+    """
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+        self._local = threading.local()
+        self._shards = []           # (thread, dict) pairs
+        self._shards_lock = threading.Lock()
+        self._retired = {}
+
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._shards_lock:
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def _merge(self, total, values):
+        raise NotImplementedError
+
+    def _collect(self):
+        """Sum all shards into {labels: value}."""
+        with self._shards_lock:
+            live = []
+            for thread, shard in self._shards:
+                if thread.is_alive():
+                    live.append((thread, shard))
+                else:
+                    for labels, values in list(shard.items()):
+                        self._retired[labels] = self._merge(self._retired.get(labels), values)
+            self._shards = live
+
+            totals = dict(self._retired)
+            for _, shard in live:
+                for labels, values in list(shard.items()):
+                    totals[labels] = self._merge(totals.get(labels), values)
+        return totals
+
+
+class Counter(_ShardedMetric):
+    """Monotonic counter, e.g. requests by status code."""
+
+    type = "counter"
+
+    def inc(self, labels=(), amount=1):
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def _merge(self, total, value):
+        return (total or 0) + value
+
+    def samples(self):
+        for labels, value in self._collect().items():
+            yield self.name, tuple(zip(self.labelnames, labels)), value
+
+
+class Histogram(_ShardedMetric):
+    """Cumulative-bucket histogram with _bucket, _sum and _count series."""
+
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, labels=()):
+        shard = self._shard()
+        values = shard.get(labels)
+        if values is None:
+            # One slot per bucket plus +Inf, then the sum
+            values = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        values[bisect.bisect_left(self.buckets, value)] += 1
+        values[-1] += value
+
+    @contextmanager
+    def time(self, labels=()):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, labels)
+
+    def _merge(self, total, values):
+        if total is None:
+            return list(values)
+        return [a + b for a, b in zip(total, values)]
+
+    def samples(self):
+        bounds = [_format_value(b) for b in self.buckets] + ["+Inf"]
+        for labels, values in self._collect().items():
+            pairs = tuple(zip(self.labelnames, labels))
+            cumulative = 0
+            for bound, count in zip(bounds, values):
+                cumulative += count
+                yield f"{self.name}_bucket", pairs + (("le", bound),), cumulative
+            yield f"{self.name}_sum", pairs, values[-1]
+            yield f"{self.name}_count", pairs, cumulative
+
+
+class GaugeCallback:
+    """Gauge whose samples are read from a callback at scrape time."""
+
+    type = "gauge"
+
+    def __init__(self, name, documentation, callback, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.callback = callback
+
+    def samples(self):
+        for labels, value in self.callback():
+            yield self.name, tuple(zip(self.labelnames, labels)), value
+
+
+class MetricsRegistry:
+    """Named set of metrics rendered together on /metrics."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge_callback(self, name, documentation, callback, labelnames=()):
+        """Register (or replace) a gauge read from callback() -> [(labels, value)]."""
+        metric = GaugeCallback(name, documentation, callback, labelnames)
+        with self._lock:
+            self._metrics[name] = metric
+        return metric
+
+    def render(self):
+        """All metrics in the Prometheus text format (version 0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels:
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        return "+Inf" if value == float("inf") else repr(value)
+    return str(value)
+
+
+# Process-wide registry shared by the API
+metrics = MetricsRegistry()
@@ -0,0 +1,212 @@
+"""
+In-memory fuzzy search index.
+Trigram similarity in the style of Postgres pg_trgm, plus an ID prefix index,
+used as the search backend when the database has no pg_trgm.
+"""
+import bisect
+import math
+import re
+
+import numpy as np
+
+_WORD_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+
+def trigrams(text):
+    """
+    Split text into the set of trigrams pg_trgm would produce.
+
+    Each lower-cased word is padded with two spaces in front and one
+    behind, so prefixes weigh more than the middle of a word.
+    """
+    grams = set()
+    for word in _WORD_RE.findall((text or "").lower()):
+        padded = f"  {word} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+
+class NGramIndex:
+    """
+    Trigram inverted index with ranked top-k search.
+
+    Documents are scored like pg_trgm's word_similarity: the share of
+    query trigrams |Q ∩ D| / |Q| found in the document, so a short query
+    matches inside a long name. Ties go to the closer overall match
+    |Q ∩ D| / |Q ∪ D|.
+
+    Postings are Python sets, so adds and removes stay cheap, and each one
+    is copied to a NumPy array the first time a query needs it after a
+    change. A search counts shared trigrams for all documents with a single
+    bincount over the query's postings and picks the top k with
+    argpartition, so no per-document Python code runs on the hot path.
+    """
+
+    def __init__(self, threshold=0.5):
+        self.threshold = threshold
+
+        self._postings = {}     # trigram -> set of doc numbers
+        self._arrays = {}       # trigram -> np.int32 copy of the posting
+        self._docs = {}         # doc number -> (key, payload, text, doc_id)
+        self._doc_numbers = {}  # key -> doc number
+        self._next_number = 0
+
+        # Trigram count and kind code per doc number, grown by doubling
+        self._gram_counts = np.zeros(1024, dtype=np.int32)
+        self._kind_codes = np.zeros(1024, dtype=np.int16)
+        self._kinds = {}        # kind -> code (0 marks a removed doc)
+
+        # (id, doc number) pairs for exact/prefix ID lookups, sorted lazily
+        # so bulk loads append in O(1). Removed doc numbers stay in the list
+        # until the next sort, so a remove does not shift it either
+        self._ids = []
+        self._ids_sorted = True
+        self._removed_ids = set()
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add(self, key, text, payload=None, doc_id=None):
+        """
+        Index a document, replacing any previous version with the same key.
+
+        Args:
+            key: Unique (kind, id) key, e.g. ("asset", asset_id)
+            text: Searchable text (name, category, email, ...)
+            payload: Value returned with search hits
+            doc_id: ID to make searchable by prefix
+        """
+        self.remove(key)
+
+        number = self._next_number
+        self._next_number += 1
+        if number >= len(self._gram_counts):
+            self._gram_counts = np.resize(self._gram_counts, number * 2)
+            self._kind_codes = np.resize(self._kind_codes, number * 2)
+
+        grams = trigrams(text)
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(number)
+            self._arrays.pop(gram, None)
+
+        self._gram_counts[number] = len(grams)
+        self._kind_codes[number] = self._kinds.setdefault(key[0], len(self._kinds) + 1)
+        self._docs[number] = (key, payload, text, doc_id)
+        self._doc_numbers[key] = number
+
+        if doc_id:
+            self._ids.append((doc_id.lower(), number))
+            self._ids_sorted = False
+
+    def remove(self, key):
+        """Drop a document from the index if present."""
+        number = self._doc_numbers.pop(key, None)
+        if number is None:
+            return
+
+        _, _, text, doc_id = self._docs.pop(number)
+        for gram in trigrams(text):
+            posting = self._postings.get(gram)
+            if posting is not None:
+                posting.discard(number)
+                self._arrays.pop(gram, None)
+                if not posting:
+                    del self._postings[gram]
+        self._gram_counts[number] = 0
+        self._kind_codes[number] = 0
+
+        if doc_id:
+            # Doc numbers are never reused, so the tombstone cannot hide a later add
+            self._removed_ids.add(number)
+
+    def _posting_array(self, gram):
+        array = self._arrays.get(gram)
+        if array is None:
+            posting = self._postings.get(gram, ())
+            array = np.fromiter(posting, dtype=np.int32, count=len(posting))
+            self._arrays[gram] = array
+        return array
+
+    def _sort_ids(self):
+        """Sort the ID list after adds, dropping removed entries on the way."""
+        # Also compact a sorted list once most of it is tombstones
+        if self._ids_sorted and len(self._removed_ids) * 2 <= len(self._ids):
+            return
+        if self._removed_ids:
+            self._ids = [entry for entry in self._ids if entry[1] not in self._removed_ids]
+            self._removed_ids = set()
+        if not self._ids_sorted:
+            self._ids.sort()
+            self._ids_sorted = True
+
+    def _prefix_matches(self, prefix, limit):
+        self._sort_ids()
+        prefix = prefix.lower()
+        i = bisect.bisect_left(self._ids, (prefix, -1))
+        matches = []
+        while i < len(self._ids) and len(matches) < limit and self._ids[i][0].startswith(prefix):
+            if self._ids[i][1] not in self._removed_ids:
+                matches.append(self._ids[i][1])
+            i += 1
+        return matches
+
+    def search(self, query, limit=10, kinds=None):
+        """
+        Return the top matches for a query.
+
+        Args:
+            query: Free-text query
+            limit: Maximum number of hits
+            kinds: Only return keys whose first element is in this set
+
+        Returns:
+            List of (score, key, payload) tuples, best first
+        """
+        codes = None
+        if kinds is not None:
+            codes = [self._kinds[kind] for kind in kinds if kind in self._kinds]
+            if not codes:
+                return []
+
+        scores = {}  # doc number -> (score, tie-breaker)
+
+        # ID prefix hits rank above any fuzzy text match
+        query = query.strip()
+        if len(query) >= 4:
+            for number in self._prefix_matches(query, limit * 4):
+                if codes is None or self._kind_codes[number] in codes:
+                    scores[number] = (1.0 + len(query) / 36.0, 1.0)
+
+        q_grams = trigrams(query)
+        postings = [self._posting_array(gram) for gram in q_grams]
+        postings = [posting for posting in postings if len(posting)]
+
+        if postings:
+            q_size = len(q_grams)
+            shared = np.bincount(np.concatenate(postings), minlength=self._next_number)
+            candidates = np.flatnonzero(shared >= max(1, math.ceil(self.threshold * q_size)))
+            if codes is not None:
+                candidates = candidates[np.isin(self._kind_codes[candidates], codes)]
+
+            counts = shared[candidates].astype(np.float64)
+            coverage = counts / q_size
+            jaccard = counts / (q_size + self._gram_counts[candidates] - counts)
+
+            # Coverage moves in steps of 1/|Q|, far above the tie-breaker's weight
+            rank = coverage + jaccard * 1e-3
+            if len(candidates) > limit:
+                top = np.argpartition(-rank, limit)[:limit]
+            else:
+                top = np.arange(len(candidates))
+
+            for i in top:
+                number = int(candidates[i])
+                if number not in scores:
+                    scores[number] = (float(coverage[i]), float(jaccard[i]))
+
+        best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [
+            (score, self._docs[number][0], self._docs[number][1])
+            for number, (score, _) in best
+        ]
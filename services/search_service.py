@@ -0,0 +1,155 @@
+"""
+Search service for assets, subcontractors and projects.
+Uses pg_trgm indexes on Postgres and an in-memory trigram index elsewhere.
+"""
+import threading
+from sqlalchemy import func, literal, or_
+from database.models import AssetORM, SubcontractorORM, ProjectORM, ChangeLogORM
+from services.search_index import NGramIndex
+
+
+def _asset_document(asset):
+    return (
+        f"{asset.name} {asset.category}",
+        {"type": "asset", "id": asset.id, "name": asset.name,
+         "category": asset.category, "project_id": asset.project_id}
+    )
+
+
+def _subcontractor_document(sub):
+    return (
+        f"{sub.name} {sub.email or ''}",
+        {"type": "subcontractor", "id": sub.id, "name": sub.name, "email": sub.email}
+    )
+
+
+def _project_document(project):
+    return (
+        f"{project.name} {project.location or ''}",
+        {"type": "project", "id": project.id, "name": project.name, "location": project.location}
+    )
+
+
+# Searchable kind -> (ORM class, text columns, document builder)
+SEARCHABLE = {
+    "asset": (AssetORM, ("name", "category"), _asset_document),
+    "subcontractor": (SubcontractorORM, ("name", "email"), _subcontractor_document),
+    "project": (ProjectORM, ("name", "location"), _project_document),
+}
+
+
+class SearchService:
+    """
+    Ranked top-k search across assets, subcontractors and projects.
+
+    On Postgres the query runs against GIN trigram indexes. On other
+    databases an in-memory NGramIndex is built on first use and then kept
+    current from the change log, so each search only reloads rows that
+    changed since the previous one.
+    """
+
+    LOAD_BATCH_SIZE = 10000
+
+    def __init__(self):
+        self._index = None
+        self._cursor = 0
+        self._lock = threading.Lock()
+
+    def search(self, db, query, limit=10, kinds=None):
+        """
+        Search for a query string.
+
+        Args:
+            db: SQLAlchemy session
+            query: Free-text query, or the start of an ID
+            limit: Maximum number of results
+            kinds: Subset of SEARCHABLE keys to search (default: all)
+
+        Returns:
+            List of result dicts with a "score", best first
+        """
+        kinds = set(kinds or SEARCHABLE)
+
+        if db.get_bind().dialect.name == "postgresql":
+            return self._search_postgres(db, query, limit, kinds)
+        return self._search_memory(db, query, limit, kinds)
+
+    def _search_postgres(self, db, query, limit, kinds):
+        results = []
+        term = literal(query)
+
+        for kind in kinds:
+            model, columns, build = SEARCHABLE[kind]
+            text_columns = [getattr(model, column) for column in columns]
+
+            # word_similarity matches a short query inside a longer name,
+            # and "<%" lets Postgres answer it from the gin_trgm_ops indexes
+            score = func.greatest(*[
+                func.word_similarity(term, func.coalesce(column, ""))
+                for column in text_columns
+            ])
+            rows = db.query(model, score.label("score")).filter(or_(
+                model.id.startswith(query, autoescape=True),
+                *[term.op("<%")(column) for column in text_columns]
+            )).order_by(score.desc()).limit(limit).all()
+
+            for row, row_score in rows:
+                _, payload = build(row)
+                if row.id.startswith(query):
+                    row_score = 1.0 + len(query) / 36.0
+                results.append(dict(payload, score=round(float(row_score), 3)))
+
+        results.sort(key=lambda r: r["score"], reverse=True)
+        return results[:limit]
+
+    def _search_memory(self, db, query, limit, kinds):
+        with self._lock:
+            if self._index is None:
+                self._build(db)
+            else:
+                self._refresh(db)
+            hits = self._index.search(query, limit=limit, kinds=kinds)
+
+        return [dict(payload, score=round(score, 3)) for score, _, payload in hits]
+
+    def _build(self, db):
+        index = NGramIndex()
+
+        # Take the cursor first so changes made during the load are replayed
+        self._cursor = db.query(func.coalesce(func.max(ChangeLogORM.seq), 0)).scalar()
+
+        for kind, (model, _, build) in SEARCHABLE.items():
+            for row in db.query(model).yield_per(self.LOAD_BATCH_SIZE):
+                text, payload = build(row)
+                index.add((kind, row.id), text, payload, doc_id=row.id)
+
+        self._index = index
+
+    def _refresh(self, db):
+        changes = db.query(ChangeLogORM.seq, ChangeLogORM.entity, ChangeLogORM.entity_id).filter(
+            ChangeLogORM.seq > self._cursor,
+            ChangeLogORM.entity.in_(list(SEARCHABLE))
+        ).order_by(ChangeLogORM.seq).all()
+
+        if not changes:
+            return
+
+        self._cursor = changes[-1].seq
+
+        changed = {}
+        for change in changes:
+            changed.setdefault(change.entity, set()).add(change.entity_id)
+
+        for kind, ids in changed.items():
+            model, _, build = SEARCHABLE[kind]
+            found = set()
+            for row in db.query(model).filter(model.id.in_(ids)).all():
+                text, payload = build(row)
+                self._index.add((kind, row.id), text, payload, doc_id=row.id)
+                found.add(row.id)
+            for deleted_id in ids - found:
+                self._index.remove((kind, deleted_id))
+
+
+# Process-wide search service shared by the API routes
+search_service = SearchService()
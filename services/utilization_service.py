@@ -0,0 +1,301 @@
+"""
+Asset utilization analytics.
+Turns the asset_history move log into residency intervals (an asset is
+at a project from one move until its next move) and sums asset-days by
+project, category and period. Hot and archived history are both read.
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import String, and_, func, select, type_coerce
+
+from database.models import AssetORM, AssetHistoryORM, ProjectORM
+from database.partitions import add_months, month_start
+
+PERIODS = ("day", "week", "month", "quarter")
+GROUP_KEYS = ("project", "category", "period")
+MOVE_COLUMNS = ["asset_id", "project_id", "moved_at"]
+CHUNK_ASSETS = 50000
+MAX_PERIODS = 1000
+
+_DAY = np.timedelta64(1, "D")
+
+
+def _period_floor(value, period):
+    day = datetime(value.year, value.month, value.day)
+    if period == "day":
+        return day
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    if period == "month":
+        return month_start(value)
+    return datetime(value.year, (value.month - 1) // 3 * 3 + 1, 1)
+
+
+def _next_period(value, period):
+    if period == "day":
+        return value + timedelta(days=1)
+    if period == "week":
+        return value + timedelta(weeks=1)
+    return add_months(value, 1 if period == "month" else 3)
+
+
+def period_edges(start, end, period=None):
+    """
+    Split [start, end) at period boundaries.
+
+    Returns:
+        (edges, labels): len(labels) + 1 edges, starting at start and ending
+        at end; labels[i] is the start of the calendar period holding
+        [edges[i], edges[i + 1]), or None when period is None
+    """
+    if period is None:
+        return [start, end], [None]
+    label = _period_floor(start, period)
+    edges, labels = [start], [label]
+    label = _next_period(label, period)
+    while label < end:
+        edges.append(label)
+        labels.append(label)
+        label = _next_period(label, period)
+    edges.append(end)
+    return edges, labels
+
+
+def residency_days(asset_ids, moved_at, edges):
+    """
+    Per-period residency of every move, vectorized.
+
+    Each move starts a stay that lasts until the same asset's next move
+    (or edges[-1]). Stays are clipped to [edges[0], edges[-1]) and split
+    where they cross an edge.
+
+    Args:
+        asset_ids: Array with one entry per move, sorted by
+            (asset_id, moved_at)
+        moved_at: datetime64 array in the same order
+        edges: Sorted period edges (datetimes)
+
+    Returns:
+        (rows, periods, days): for each stay segment the index of its move,
+        its period index and its length in days
+    """
+    edges = np.array(edges, dtype="datetime64[us]")
+    start, end = edges[0], edges[-1]
+    moved_at = moved_at.astype("datetime64[us]")
+
+    following = np.full(len(moved_at), end)
+    if len(moved_at) > 1:
+        same_asset = asset_ids[1:] == asset_ids[:-1]
+        following[:-1] = np.where(same_asset, moved_at[1:], end)
+
+    begin = np.maximum(moved_at, start)
+    stop = np.minimum(following, end)
+    rows = np.flatnonzero(stop > begin)
+    begin, stop = begin[rows], stop[rows]
+
+    # Most stays fall inside one period; the rest are repeated once per
+    # period they touch and clipped to that period
+    first = np.searchsorted(edges, begin, side="right") - 1
+    last = np.searchsorted(edges, stop, side="left") - 1
+    spans = last - first + 1
+    segment = np.repeat(np.arange(len(rows)), spans)
+    offset = np.arange(len(segment)) - np.repeat(np.cumsum(spans) - spans, spans)
+    periods = first[segment] + offset
+
+    seg_begin = np.maximum(begin[segment], edges[periods])
+    seg_stop = np.minimum(stop[segment], edges[periods + 1])
+    days = (seg_stop - seg_begin) / _DAY
+    return rows[segment], periods, days
+
+
+def _id_range(column, low, high):
+    """Conditions keeping column in [low, high) (either side None for unbounded)."""
+    conditions = []
+    if low is not None:
+        conditions.append(column >= low)
+    if high is not None:
+        conditions.append(column < high)
+    return conditions
+
+
+def _frame(rows):
+    """DataFrame of (asset_id, project_id, moved_at) rows, moved_at parsed."""
+    moves = pd.DataFrame(dict(zip(MOVE_COLUMNS, zip(*rows))) if rows else {c: [] for c in MOVE_COLUMNS})
+    moves["moved_at"] = pd.to_datetime(moves["moved_at"], format="ISO8601")
+    return moves
+
+
+class UtilizationService:
+    """
+    Asset-days by project, category and period.
+
+    History is processed one range of asset IDs at a time (CHUNK_ASSETS
+    assets per range). Of the moves before start only each asset's last
+    one is fetched, so memory is bounded by the largest range's moves in
+    the window plus the running totals, not by the size of asset_history.
+    """
+
+    def __init__(self, archive, chunk_assets=CHUNK_ASSETS):
+        self.archive = archive
+        self.chunk_assets = chunk_assets
+
+    def _asset_ranges(self, db):
+        """Contiguous [low, high) asset_id ranges covering every asset ID."""
+        numbered = select(
+            AssetORM.id, func.row_number().over(order_by=AssetORM.id).label("n")
+        ).subquery()
+        bounds = db.connection().execute(
+            select(numbered.c.id).where(numbered.c.n % self.chunk_assets == 1).order_by(numbered.c.id)
+        ).scalars().all()
+        bounds = [None] + bounds[1:] + [None]
+        return list(zip(bounds, bounds[1:]))
+
+    def _moves(self, db, low, high, start, end):
+        """
+        Moves of one asset range that count towards [start, end): every
+        move in the window and each asset's last move before start, hot
+        and archived, sorted by (asset_id, moved_at).
+        """
+        table = AssetHistoryORM.__table__
+        assets = AssetORM.__table__
+        # moved_at is fetched as the driver returns it (a string on SQLite)
+        # and parsed in one vectorized step in _frame
+        columns = (table.c.asset_id, table.c.project_id, type_coerce(table.c.moved_at, String))
+
+        # One (asset_id, moved_at) index lookup per asset rather than a scan
+        # of everything the range ever did before start
+        earlier = table.alias("earlier")
+        last_before = select(
+            assets.c.id,
+            select(func.max(earlier.c.moved_at))
+            .where(earlier.c.asset_id == assets.c.id, earlier.c.moved_at < start)
+            .scalar_subquery().label("moved_at"),
+        ).where(*_id_range(assets.c.id, low, high)).subquery()
+        prior = select(*columns).join_from(last_before, table, and_(
+            table.c.asset_id == last_before.c.id, table.c.moved_at == last_before.c.moved_at
+        ))
+        window = select(*columns).where(
+            table.c.moved_at >= start, table.c.moved_at < end, *_id_range(table.c.asset_id, low, high)
+        )
+        connection = db.connection()
+        priors = [_frame(connection.execute(prior).all())]
+        moves = [_frame(connection.execute(window).all())]
+
+        archived = self.archive.read_table(asset_range=(low, high), end=start)
+        if archived is not None:
+            priors.append(archived.select(MOVE_COLUMNS).to_pandas())
+        archived = self.archive.read_table(asset_range=(low, high), start=start, end=end)
+        if archived is not None:
+            moves.append(archived.select(MOVE_COLUMNS).to_pandas())
+
+        priors = pd.concat(priors, ignore_index=True)
+        latest = priors.groupby("asset_id")["moved_at"].transform("max")
+        moves = pd.concat([priors[priors["moved_at"] == latest], *moves], ignore_index=True)
+        # A month still in the table after being archived (interrupted
+        # run) would otherwise count twice
+        return moves.drop_duplicates().sort_values(["asset_id", "moved_at"], kind="stable")
+
+    def _categories(self, db, asset_ids):
+        """Category of each asset in a sorted asset_ids array ("" if unknown)."""
+        firsts = np.flatnonzero(np.r_[True, asset_ids[1:] != asset_ids[:-1]])
+        query = select(AssetORM.id, AssetORM.category).where(
+            AssetORM.id >= asset_ids[0], AssetORM.id <= asset_ids[-1]
+        )
+        known = pd.Series(dict(db.connection().execute(query).all()), dtype=object)
+        per_asset = known.reindex(asset_ids[firsts]).fillna("").to_numpy()
+        return np.repeat(per_asset, np.diff(np.r_[firsts, len(asset_ids)]))
+
+    def utilization(self, db, start, end, period="month", group_by=GROUP_KEYS,
+                    project_id=None, category=None):
+        """
+        Asset-days spent in [start, end).
+
+        Time before an asset's first recorded move is not counted. Time
+        with no project (project_id None) is reported under project None.
+
+        Args:
+            db: SQLAlchemy session
+            start, end: Naive UTC datetimes
+            period: One of PERIODS; used when grouping by period
+            group_by: Subset of GROUP_KEYS
+            project_id: Only count time at this project
+            category: Only count assets in this category
+
+        Returns:
+            List of dicts with the group_by keys (project_id and
+            project_name for "project") and asset_days, sorted by period,
+            project name and category
+        """
+        group_by = [key for key in GROUP_KEYS if key in group_by]
+        by_category = "category" in group_by or category is not None
+        edges, labels = period_edges(start, end, period if "period" in group_by else None)
+        if len(labels) > MAX_PERIODS:
+            raise ValueError(f"Range spans more than {MAX_PERIODS} {period} periods")
+
+        # Missing projects and categories are grouped under "" so no key is NaN
+        keys = [{"project": "project_id", "category": "category", "period": "period"}[k] for k in group_by]
+        group_keys = keys or ["total"]
+        totals = None
+
+        for low, high in self._asset_ranges(db):
+            moves = self._moves(db, low, high, start, end)
+            if moves.empty:
+                continue
+
+            asset_ids = moves["asset_id"].to_numpy()
+            projects = moves["project_id"].fillna("").to_numpy()
+            rows, periods, days = residency_days(asset_ids, moves["moved_at"].to_numpy(), edges)
+            segments = pd.DataFrame({
+                "project_id": projects[rows],
+                "period": periods,
+                "asset_days": days,
+                "total": 0,
+            })
+            if by_category:
+                segments["category"] = self._categories(db, asset_ids)[rows]
+            if project_id is not None:
+                segments = segments[segments["project_id"] == project_id]
+            if category is not None:
+                segments = segments[segments["category"] == category]
+
+            chunk = segments.groupby(group_keys, sort=False)["asset_days"].sum()
+            totals = chunk if totals is None else totals.add(chunk, fill_value=0)
+
+        return self._rows(db, totals, keys, labels)
+
+    def _rows(self, db, totals, keys, labels):
+        if totals is None or totals.empty:
+            return []
+
+        names = {}
+        if "project_id" in keys:
+            ids = set(totals.index.get_level_values("project_id")) - {""}
+            if ids:
+                names = dict(db.query(ProjectORM.id, ProjectORM.name).filter(ProjectORM.id.in_(ids)).all())
+
+        frame = totals.reset_index(name="asset_days")
+        frame["asset_days"] = frame["asset_days"].round(2)
+        if "project_id" in keys:
+            frame.insert(1, "project_name", frame["project_id"].map(names))
+            frame["project_id"] = frame["project_id"].replace("", None)
+        if "category" in keys:
+            frame["category"] = frame["category"].replace("", None)
+        if "period" in keys:
+            dates = np.array([label.date().isoformat() for label in labels], dtype=object)
+            frame["period"] = dates[frame["period"].to_numpy()]
+        order = [k for k in ("period", "project_name", "category") if k in frame]
+        if order:
+            frame = frame.sort_values(order, na_position="first", kind="stable")
+        columns = [c for c in ("project_id", "project_name", "category", "period", "asset_days") if c in frame]
+        return frame[columns].astype(object).where(frame[columns].notna(), None).to_dict("records")
+
+
+def _create_service():
+    from services.history_store import history_store
+    return UtilizationService(history_store.archive)
+
+
+# Shared service used by the API
+utilization_service = _create_service()
@@ -0,0 +1,298 @@
+"""
+Unit tests for optimistic locking of asset moves: compare-and-swap on the
+asset version, conflicts carrying the current state, bulk moves without
+a statement per asset, many threads moving the same assets at once, and
+two syncs replaying the same offline queue, against a temporary SQLite
+database.
+"""
+import os
+import random
+import tempfile
+import threading
+from collections import Counter
+
+from datetime import datetime, timedelta
+
+from flask import Flask, jsonify, request
+from sqlalchemy import create_engine, event, func
+from sqlalchemy.orm import sessionmaker
+
+from api.config import TestConfig
+from api.middleware.query_counter import NPlusOneError, init_query_counter
+from api.routes.assets import _apply_sync
+from database.db import Base, configure_sqlite, engine_options
+from database.models import AssetHistoryORM, AssetORM, ChangeLogORM, ProjectORM, SyncKeyORM
+from services.asset_moves import MoveConflict, move_assets
+
+PROJECTS = ["p1", "p2", "p3"]
+
+
+def make_sessions(assets=3, serialized=True):
+    """Sessions on a new database; serialized=False leaves out BEGIN IMMEDIATE so reads can interleave."""
+    url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'assets.db')}"
+    if serialized:
+        engine = create_engine(url, **engine_options(url, TestConfig))
+        configure_sqlite(engine, TestConfig)
+    else:
+        engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    
+    db = Session()
+    db.add_all([ProjectORM(id=p, name=f"Project {p}") for p in PROJECTS])
+    db.add_all([AssetORM(id=f"a{i}", name=f"Pallet {i}", category="Materials") for i in range(assets)])
+    db.commit()
+    db.close()
+    return Session
+
+
+def history_agrees(db):
+    """Asset IDs whose version, history and project_id disagree."""
+    bad = []
+    for asset in db.query(AssetORM).order_by(AssetORM.id):
+        moves = db.query(AssetHistoryORM).filter(
+            AssetHistoryORM.asset_id == asset.id
+        ).order_by(AssetHistoryORM.moved_at.desc()).all()
+        latest = moves[0].project_id if moves else None
+        if len(moves) != asset.version - 1 or latest != asset.project_id:
+            bad.append(asset.id)
+    return bad
+
+
+def test_compare_and_swap():
+    """Test that a move based on a stale version is refused with the current state."""
+    print("\n=== Test: Compare-and-swap ===")
+    
+    Session = make_sessions()
+    db = Session()
+    
+    versions = move_assets(db, {"a0": 1}, "p1", "u1")
+    if versions == {"a0": 2}:
+        print("✓ Move based on the current version applied, version bumped")
+    else:
+        print(f"✗ Unexpected versions: {versions}")
+    
+    logged = db.query(ChangeLogORM.entity, ChangeLogORM.entity_id, ChangeLogORM.operation).filter(
+        ChangeLogORM.entity == "asset",
+        ChangeLogORM.operation == "update"
+    ).all()
+    if logged == [("asset", "a0", "update")]:
+        print("✓ Move recorded in the change log")
+    else:
+        print(f"✗ Unexpected change log entries: {logged}")
+    
+    try:
+        move_assets(db, {"a0": 1}, "p2", "u2")
+        print("✗ Move based on a stale version was applied")
+    except MoveConflict as conflict:
+        state = conflict.assets[0]
+        if state["project_id"] == "p1" and state["project_name"] == "Project p1" and state["version"] == 2:
+            print("✓ Stale move refused with the asset's current state")
+        else:
+            print(f"✗ Unexpected conflict state: {conflict.assets}")
+    
+    # a1 is current but a0 is stale: neither may move
+    try:
+        move_assets(db, {"a0": 1, "a1": 1}, "p3", "u2")
+        print("✗ Bulk move with a stale asset was applied")
+    except MoveConflict as conflict:
+        a1 = db.get(AssetORM, "a1")
+        moves = db.query(func.count(AssetHistoryORM.id)).scalar()
+        if [s["id"] for s in conflict.assets] == ["a0"] and a1.project_id is None and moves == 1:
+            print("✓ Bulk move is all or nothing")
+        else:
+            print(f"✗ Partial bulk move: a1 at {a1.project_id}, {moves} history rows")
+    
+    db.close()
+
+
+def test_bulk_move_in_strict_mode():
+    """Test that bulk moves and syncs check versions without a statement per asset."""
+    print("\n=== Test: Bulk move in strict mode ===")
+    
+    threshold = TestConfig.DB_QUERY_REPEAT_THRESHOLD
+    Session = make_sessions(assets=threshold + 5)
+    asset_ids = [f"a{i}" for i in range(threshold + 5)]
+    app = Flask(__name__)
+    app.config.update(TESTING=True, DB_QUERY_STRICT=True, DB_QUERY_REPEAT_THRESHOLD=threshold)
+    init_query_counter(app)
+    
+    @app.post("/move")
+    def move():
+        db = Session()
+        try:
+            expected = dict(db.query(AssetORM.id, AssetORM.version).filter(AssetORM.id.in_(asset_ids)).all())
+            expected.update(request.get_json().get("versions", {}))
+            try:
+                return jsonify(move_assets(db, expected, request.get_json()["project_id"], "u1")), 200
+            except MoveConflict as conflict:
+                return jsonify({"assets": conflict.assets}), 409
+        finally:
+            db.close()
+    
+    @app.post("/sync")
+    def sync():
+        db = Session()
+        try:
+            moved_at = datetime.utcnow()
+            moves = [{
+                "key": f"k{i}",
+                "asset_id": asset_id,
+                "project_id": PROJECTS[i % len(PROJECTS)],
+                "moved_at": moved_at + timedelta(seconds=i)
+            } for i, asset_id in enumerate(asset_ids)]
+            results, conflicted, previous = _apply_sync(db, moves, "u1")
+            return jsonify({"applied": sum(status == "applied" for status, _ in results.values()),
+                            "conflicted": conflicted,
+                            "left": sorted(set(previous.values()))}), 200
+        finally:
+            db.close()
+    
+    client = app.test_client()
+    try:
+        moved = client.post("/move", json={"project_id": "p1"})
+        stale = client.post("/move", json={"project_id": "p2", "versions": {"a0": 1}})
+        synced = client.post("/sync")
+    except NPlusOneError as e:
+        print(f"✗ {e}")
+        return
+    print(f"Move: {moved.headers.get('X-DB-Queries')} queries, sync: {synced.headers.get('X-DB-Queries')} queries")
+    
+    if moved.status_code == 200 and set(moved.get_json().values()) == {2}:
+        print(f"✓ {len(asset_ids)} assets moved without repeating a statement")
+    else:
+        print(f"✗ Bulk move failed: {moved.status_code}")
+    
+    if stale.status_code == 409 and [a["id"] for a in stale.get_json()["assets"]] == ["a0"]:
+        print("✓ Stale asset found after the single UPDATE missed")
+    else:
+        print(f"✗ Expected a conflict on a0: {stale.status_code} {stale.get_json()}")
+    
+    db = Session()
+    bad = history_agrees(db)
+    db.close()
+    if synced.get_json() == {"applied": len(asset_ids), "conflicted": [], "left": ["p1"]} and not bad:
+        print("✓ Sync applied every move from p1; history agrees with project_id and version")
+    else:
+        print(f"✗ Sync failed: {synced.get_json()}, disagreeing assets: {bad}")
+
+
+def test_concurrent_moves():
+    """Test that threads moving the same assets never leave history and location disagreeing."""
+    print("\n=== Test: Concurrent moves ===")
+    
+    Session = make_sessions()
+    outcomes = Counter()
+    errors = []
+    lock = threading.Lock()
+    
+    def foreman(seed):
+        rng = random.Random(seed)
+        for _ in range(40):
+            db = Session()
+            try:
+                # Scan: read the versions, then confirm the move a moment later
+                ids = rng.sample(["a0", "a1", "a2"], rng.randint(1, 2))
+                expected = dict(db.query(AssetORM.id, AssetORM.version).filter(AssetORM.id.in_(ids)).all())
+                db.commit()
+                try:
+                    move_assets(db, expected, rng.choice(PROJECTS), f"u{seed}")
+                    outcome = "moved"
+                except MoveConflict:
+                    outcome = "conflict"
+                with lock:
+                    outcomes[outcome] += 1
+            except Exception as e:
+                errors.append(e)
+            finally:
+                db.close()
+    
+    threads = [threading.Thread(target=foreman, args=(seed,)) for seed in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    db = Session()
+    bad = history_agrees(db)
+    total_versions = db.query(func.sum(AssetORM.version - 1)).scalar()
+    moves = db.query(func.count(AssetHistoryORM.id)).scalar()
+    db.close()
+    print(f"Moved: {outcomes['moved']}, conflicts: {outcomes['conflict']}, errors: {len(errors)}")
+    
+    if not errors and outcomes["moved"] + outcomes["conflict"] == 640:
+        print("✓ Every attempt either moved or got a conflict")
+    else:
+        print(f"✗ Attempts failed, first error: {errors[:1]}")
+    
+    if outcomes["conflict"] and outcomes["moved"]:
+        print("✓ Racing moves produced conflicts")
+    else:
+        print("✗ Expected both successful and conflicting moves")
+    
+    if not bad and moves == total_versions:
+        print(f"✓ History agrees with project_id and version on every asset ({moves} moves)")
+    else:
+        print(f"✗ History disagrees on {bad}: {moves} history rows, versions add up to {total_versions}")
+
+
+def test_concurrent_replays():
+    """Test that two syncs of the same offline queue record each move once."""
+    print("\n=== Test: Concurrent replays ===")
+    
+    Session = make_sessions(serialized=False)
+    engine = Session.kw["bind"]
+    moved_at = datetime.utcnow()
+    moves = [
+        {"key": "k0", "asset_id": "a0", "project_id": "p1", "moved_at": moved_at},
+        {"key": "k1", "asset_id": "a1", "project_id": "p2", "moved_at": moved_at}
+    ]
+    
+    # The other replay commits after this one has checked the keys but before it records them
+    other = []
+    
+    @event.listens_for(engine, "before_cursor_execute")
+    def replay_meanwhile(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("SELECT assets.id AS assets_id, assets.version") and not other:
+            other.append(None)
+            db = Session()
+            try:
+                other.append(_apply_sync(db, [dict(move) for move in moves], "u2"))
+            finally:
+                db.close()
+    
+    db = Session()
+    first = _apply_sync(db, [dict(move) for move in moves], "u1")
+    retry = _apply_sync(db, [dict(move) for move in moves], "u1")
+    event.remove(engine, "before_cursor_execute", replay_meanwhile)
+    
+    statuses = lambda attempt: sorted(status for status, _ in attempt[0].values())
+    if statuses(other[1]) == ["applied", "applied"] and first[1] == ["a0", "a1"] \
+            and statuses(retry) == ["duplicate", "duplicate"] and retry[1] == []:
+        print("✓ Losing replay rolled back on the sync key and found duplicates on retry")
+    else:
+        print(f"✗ Unexpected results: other {other[1:]}, first {first}, retry {retry}")
+    
+    moves_recorded = db.query(func.count(AssetHistoryORM.id)).scalar()
+    keys = db.query(func.count(SyncKeyORM.key)).scalar()
+    bad = history_agrees(db)
+    db.close()
+    if moves_recorded == 2 and keys == 2 and not bad:
+        print("✓ Each move recorded once")
+    else:
+        print(f"✗ {moves_recorded} history rows and {keys} sync keys for 2 moves, disagreeing: {bad}")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Asset Version Tests")
+    print("=" * 60)
+    
+    test_compare_and_swap()
+    test_bulk_move_in_strict_mode()
+    test_concurrent_moves()
+    test_concurrent_replays()
+    
+    print("\n" + "=" * 60)
+    print("All tests completed!")
+    print("=" * 60)
@@ -123,6 +123,57 @@ def test_move_asset(token, asset_id, project_id):
         print("✗ Failed to move asset")
 
 
+def test_bulk_move_assets(token, asset_ids, project_id):
+    """Test moving several assets to a project in one request."""
+    print(f"\n=== Test: Bulk move {len(asset_ids)} assets to project {project_id} ===")
+    
+    headers = {"Authorization": f"Bearer {token}"}
+    response = requests.post(
+        f"{API_BASE_URL}/assets/move",
+        json={
+            # Duplicate scan of the first asset should be ignored
+            "asset_ids": asset_ids + asset_ids[:1],
+            "project_id": project_id
+        },
+        headers=headers
+    )
+    
+    print(f"Status Code: {response.status_code}")
+    print(f"Response: {json.dumps(response.json(), indent=2)}")
+    
+    if response.status_code == 200:
+        data = response.json()
+        if data.get('moved') == len(asset_ids):
+            print("✓ Assets moved successfully")
+        else:
+            print("✗ Unexpected number of assets moved")
+    else:
+        print("✗ Failed to bulk move assets")
+
+
+def test_bulk_move_unknown_asset(token, project_id):
+    """Test that a bulk move with an unknown asset is rejected."""
+    print("\n=== Test: Bulk move with unknown asset ===")
+    
+    headers = {"Authorization": f"Bearer {token}"}
+    response = requests.post(
+        f"{API_BASE_URL}/assets/move",
+        json={
+            "asset_ids": ["nonexistent-id"],
+            "project_id": project_id
+        },
+        headers=headers
+    )
+    
+    print(f"Status Code: {response.status_code}")
+    print(f"Response: {json.dumps(response.json(), indent=2)}")
+    
+    if response.status_code == 404 and response.json().get('missing_ids') == ["nonexistent-id"]:
+        print("✓ Correctly rejected unknown asset")
+    else:
+        print("✗ Should have returned 404 with missing_ids")
+
+
 def test_create_asset_missing_fields(token):
     """Test creating asset with missing fields."""
     print("\n=== Test: Create asset with missing fields ===")
@@ -222,6 +273,8 @@ if __name__ == "__main__":
         print("Create a project first, then uncomment and update the test below")
         # if asset_id:
         #     test_move_asset(token, asset_id, "your-project-id-here")
+        #     test_bulk_move_assets(token, [asset_id], "your-project-id-here")
+        #     test_bulk_move_unknown_asset(token, "your-project-id-here")
         
         print("\n" + "=" * 60)
         print("Test suite completed")
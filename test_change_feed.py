@@ -0,0 +1,176 @@
+"""
+Unit tests for change log recording: entries are written when the
+transaction commits, dropped when it rolls back, and become visible in
+seq order even when two transactions interleave. The PostgreSQL tests
+(interleaving, and rows left pending by a writer that died) run against
+TEST_DATABASE_URL and are skipped when none is configured.
+"""
+import os
+import tempfile
+import uuid
+
+from sqlalchemy import create_engine, func
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from database.change_feed import record_changes
+from database.db import Base
+from database.models import ChangeLogORM, ChangeLogPendingORM, ProjectORM
+
+
+def make_sessions(url):
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)
+
+
+def postgres_sessions():
+    """Sessions on TEST_DATABASE_URL, or None when no PostgreSQL server is configured."""
+    url = os.environ.get("TEST_DATABASE_URL", "")
+    if not url.startswith("postgresql"):
+        return None
+    try:
+        return make_sessions(url)
+    except (ImportError, OperationalError):
+        return None
+
+
+def changes_after(Session, cursor):
+    """(seq, entity_id) of change log rows after cursor, as a new reader sees them."""
+    db = Session()
+    try:
+        return db.query(ChangeLogORM.seq, ChangeLogORM.entity_id).filter(
+            ChangeLogORM.seq > cursor
+        ).order_by(ChangeLogORM.seq).all()
+    finally:
+        db.close()
+
+
+def test_written_at_commit():
+    """Test that change log rows appear on commit and never for rolled back work."""
+    print("\n=== Test: Change log written at commit ===")
+    
+    Session = make_sessions(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'changes.db')}")
+    db = Session()
+    
+    db.add(ProjectORM(id="p1", name="Alpha"))
+    db.flush()
+    pending = db.query(func.count(ChangeLogORM.seq)).scalar()
+    db.commit()
+    committed = changes_after(Session, 0)
+    if pending == 0 and [entity_id for _, entity_id in committed] == ["p1"]:
+        print("✓ Flushed change logged only when the transaction committed")
+    else:
+        print(f"✗ Expected no row before commit and one after: {pending}, {committed}")
+    
+    db.add(ProjectORM(id="p2", name="Beta"))
+    db.flush()
+    record_changes(db, "asset", ["a1"], "update")
+    db.rollback()
+    db.add(ProjectORM(id="p3", name="Gamma"))
+    record_changes(db, "asset", ["a2"], "update")
+    db.commit()
+    later = [entity_id for _, entity_id in changes_after(Session, committed[-1].seq)]
+    if sorted(later) == ["a2", "p3"]:
+        print("✓ Rolled back changes dropped, record_changes entries written on commit")
+    else:
+        print(f"✗ Unexpected change log rows: {later}")
+    
+    db.close()
+
+
+def test_interleaved_transactions():
+    """Test that a reader at the latest seq still sees a transaction that committed later."""
+    print("\n=== Test: Interleaved transactions (PostgreSQL) ===")
+    
+    Session = postgres_sessions()
+    if Session is None:
+        print("- Skipped: TEST_DATABASE_URL is not a reachable PostgreSQL database")
+        return
+    
+    first_id, second_id = f"cf-{uuid.uuid4()}", f"cf-{uuid.uuid4()}"
+    reader = Session()
+    cursor = reader.query(func.coalesce(func.max(ChangeLogORM.seq), 0)).scalar()
+    reader.close()
+    
+    # The first transaction writes before the second, but commits after it
+    first, second = Session(), Session()
+    try:
+        first.add(ProjectORM(id=first_id, name="First"))
+        first.flush()
+        second.add(ProjectORM(id=second_id, name="Second"))
+        second.commit()
+        
+        seen = changes_after(Session, cursor)
+        cursor = seen[-1].seq if seen else cursor
+        first.commit()
+        later = changes_after(Session, cursor)
+    finally:
+        first.close()
+        second.close()
+        cleanup = Session()
+        cleanup.query(ProjectORM).filter(ProjectORM.id.in_([first_id, second_id])).delete(synchronize_session=False)
+        cleanup.query(ChangeLogORM).filter(ChangeLogORM.entity_id.in_([first_id, second_id])).delete(
+            synchronize_session=False
+        )
+        cleanup.commit()
+        cleanup.close()
+    
+    if [entity_id for _, entity_id in seen] == [second_id] and first_id in [entity_id for _, entity_id in later]:
+        print("✓ The later commit got a higher seq and was not skipped by the cursor")
+    else:
+        print(f"✗ Change lost behind the cursor: seen {seen}, after cursor {later}")
+
+
+def test_leftover_pending_rows():
+    """Test that rows a dead writer left unsequenced are moved by the next commit."""
+    print("\n=== Test: Leftover pending rows (PostgreSQL) ===")
+    
+    Session = postgres_sessions()
+    if Session is None:
+        print("- Skipped: TEST_DATABASE_URL is not a reachable PostgreSQL database")
+        return
+    
+    orphan_id, project_id = f"cf-{uuid.uuid4()}", f"cf-{uuid.uuid4()}"
+    db = Session()
+    try:
+        # Committed, but the process died before its sequencing pass
+        db.execute(ChangeLogPendingORM.__table__.insert(), {
+            "entity": "project", "entity_id": orphan_id, "operation": "update"
+        })
+        db.commit()
+        db.add(ProjectORM(id=project_id, name="Next"))
+        db.commit()
+        logged = db.query(ChangeLogORM.entity_id).filter(
+            ChangeLogORM.entity_id.in_([orphan_id, project_id])
+        ).order_by(ChangeLogORM.seq).all()
+        pending = db.query(ChangeLogPendingORM.id).filter(
+            ChangeLogPendingORM.entity_id.in_([orphan_id, project_id])
+        ).count()
+    finally:
+        db.rollback()
+        db.query(ProjectORM).filter(ProjectORM.id == project_id).delete(synchronize_session=False)
+        db.query(ChangeLogORM).filter(ChangeLogORM.entity_id.in_([orphan_id, project_id])).delete(
+            synchronize_session=False
+        )
+        db.commit()
+        db.close()
+    
+    if [entity_id for (entity_id,) in logged] == [orphan_id, project_id] and pending == 0:
+        print("✓ Leftover row sequenced ahead of the next write, nothing left pending")
+    else:
+        print(f"✗ Unexpected change log {logged}, {pending} rows still pending")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Change Feed Tests")
+    print("=" * 60)
+    
+    test_written_at_commit()
+    test_interleaved_transactions()
+    test_leftover_pending_rows()
+    
+    print("\n" + "=" * 60)
+    print("All tests completed!")
+    print("=" * 60)
@@ -0,0 +1,120 @@
+"""
+Unit tests for the domain-layer AssetCollection and PeopleCollection.
+Tests ordering, duplicate handling, removal, the secondary indexes and
+iterating without copying the members.
+"""
+from models.asset import Asset
+from models.asset_collection import AssetCollection
+from models.asset_history import AssetHistory
+from models.asset_media import AssetMedia
+from models.people_collection import PeopleCollection
+from models.user import User
+
+
+def make_asset(name, category="Power Tools"):
+    return Asset(name, category, AssetMedia(), AssetHistory())
+
+
+def test_asset_collection_add_remove():
+    """Test insertion order, duplicate adds and removal."""
+    print("\n=== Test: AssetCollection add/remove ===")
+    
+    collection = AssetCollection()
+    drill, saw, mixer = make_asset("Drill"), make_asset("Saw"), make_asset("Mixer")
+    for asset in (drill, saw, mixer, saw):
+        collection.add(asset)
+    
+    names = [a.name for a in collection]
+    print(f"Assets: {names}")
+    
+    if names == ["Drill", "Saw", "Mixer"] and len(collection) == 3:
+        print("✓ Insertion order kept and duplicate ignored")
+    else:
+        print("✗ Expected ['Drill', 'Saw', 'Mixer'] with no duplicates")
+    
+    collection.remove(saw)
+    collection.remove(saw)
+    if [a.name for a in collection.list()] == ["Drill", "Mixer"] and collection.get(saw.asset_id) is None:
+        print("✓ Removed asset is gone")
+    else:
+        print("✗ Removed asset should no longer be listed")
+    
+    # The assets property is a live view, not a list rebuilt on each access
+    view = collection.assets
+    collection.add(saw)
+    if list(view) == [drill, mixer, saw] and not hasattr(view, "append"):
+        print("✓ assets is a read-only view of the collection")
+    else:
+        print("✗ assets should be a read-only view that follows adds")
+
+
+def test_asset_collection_indexes():
+    """Test find_by_name and find_by_category, including after a rename."""
+    print("\n=== Test: AssetCollection indexes ===")
+    
+    collection = AssetCollection()
+    first, second = make_asset("Drill"), make_asset("Drill")
+    excavator = make_asset("Excavator", "Heavy Equipment")
+    for asset in (first, second, excavator):
+        collection.add(asset)
+    
+    if collection.find_by_name("Drill") == [first, second]:
+        print("✓ find_by_name returns every match in order")
+    else:
+        print("✗ find_by_name should return both drills")
+    
+    if collection.find_by_category("Heavy Equipment") == [excavator]:
+        print("✓ find_by_category uses the category index")
+    else:
+        print("✗ find_by_category should return the excavator")
+    
+    second.name = "Hammer Drill"
+    collection.reindex(second)
+    collection.remove(first)
+    print(f"Drill: {collection.find_by_name('Drill')}, Hammer Drill: {collection.find_by_name('Hammer Drill')}")
+    
+    if collection.find_by_name("Drill") == [] and collection.find_by_name("Hammer Drill") == [second]:
+        print("✓ Indexes follow renames and removals")
+    else:
+        print("✗ Indexes should reflect the rename and removal")
+
+
+def test_people_collection():
+    """Test add/remove and find_by_role on PeopleCollection."""
+    print("\n=== Test: PeopleCollection ===")
+    
+    collection = PeopleCollection()
+    admin = User("Ann", "ann@example.com", "Admin")
+    worker = User("Bob", "bob@example.com", "Worker")
+    for user in (admin, worker, admin):
+        collection.add(user)
+    
+    if len(collection) == 2 and list(collection.people) == [admin, worker] \
+            and collection.find_by_role("Worker") == [worker]:
+        print("✓ Duplicate ignored and role index works")
+    else:
+        print("✗ Expected two people and Bob as the only worker")
+    
+    worker.role = "Manager"
+    collection.reindex(worker)
+    collection.remove(admin)
+    print(f"People: {[str(p) for p in collection]}")
+    
+    if collection.find_by_role("Manager") == [worker] and not collection.find_by_role("Admin"):
+        print("✓ Role index follows role changes and removals")
+    else:
+        print("✗ Role index should reflect the change and removal")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Domain Collection Unit Tests")
+    print("=" * 60)
+    
+    test_asset_collection_add_remove()
+    test_asset_collection_indexes()
+    test_people_collection()
+    
+    print("\n" + "=" * 60)
+    print("Test suite completed")
+    print("=" * 60)
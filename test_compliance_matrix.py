@@ -0,0 +1,75 @@
+"""
+Unit tests for the organisation-wide compliance matrix: the grouped join
+and the streamed JSON encoding.
+"""
+import json
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database.db import Base
+from database.models import ProjectORM, SubcontractorORM, ComplianceDocumentORM
+from api.routes.compliance import generate_matrix, matrix_query
+
+
+def test_matrix_statuses():
+    """Test statuses per project, shared subcontractors and empty projects."""
+    print("\n=== Test: Compliance matrix ===")
+    
+    engine = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'matrix.db')}")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    today = datetime.now().date()
+    
+    valid = SubcontractorORM(id="s1", name="Valid Co")
+    expiring = SubcontractorORM(id="s2", name="Expiring Co")
+    missing = SubcontractorORM(id="s3", name="No Docs Co")
+    db.add_all([
+        ProjectORM(id="p1", name="Alpha", subcontractors=[valid, expiring]),
+        ProjectORM(id="p2", name="Beta", subcontractors=[valid, missing]),
+        ProjectORM(id="p3", name="Gamma"),
+        ComplianceDocumentORM(id="d1", subcontractor_id="s1", document_type="Insurance",
+                              file_path="x", expiry_date=today + timedelta(days=90)),
+        ComplianceDocumentORM(id="d2", subcontractor_id="s1", document_type="Safety",
+                              file_path="x", expiry_date=today + timedelta(days=60)),
+        ComplianceDocumentORM(id="d3", subcontractor_id="s2", document_type="Insurance",
+                              file_path="x", expiry_date=today + timedelta(days=10)),
+    ])
+    db.commit()
+    
+    result = db.connection().execution_options(yield_per=2).execute(matrix_query())
+    matrix = json.loads("".join(generate_matrix(result, today)))
+    db.close()
+    
+    projects = {project["name"]: project["statuses"] for project in matrix["projects"]}
+    print(f"Statuses: {projects}")
+    
+    if projects == {
+        "Alpha": {"s1": "GREEN", "s2": "RED"},
+        "Beta": {"s1": "GREEN", "s3": "RED"},
+        "Gamma": {}
+    }:
+        print("✓ One status per assignment, empty project included")
+    else:
+        print("✗ Unexpected statuses")
+    
+    if matrix["totals"] == {"projects": 3, "green": 2, "red": 2, "subcontractors": 3} \
+            and matrix["subcontractors"]["s3"] == "No Docs Co":
+        print("✓ Totals and subcontractor names correct")
+    else:
+        print(f"✗ Unexpected totals: {matrix['totals']}")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Compliance Matrix Tests")
+    print("=" * 60)
+    
+    test_matrix_statuses()
+    
+    print("\n" + "=" * 60)
+    print("All tests completed!")
+    print("=" * 60)
@@ -151,6 +151,115 @@ def test_calculate_subcontractor_status_no_documents():
         print("✗ Should be RED")
 
 
+def test_build_summary():
+    """Test project summary counts and days-remaining buckets."""
+    print("\n=== Test: Project compliance summary ===")
+    
+    today = datetime(2024, 6, 1).date()
+    ranges = {label: (first, last) for label, first, last in ComplianceService.bucket_ranges(today)}
+    print(f"8-30 bucket: {ranges['8-30']}")
+    
+    if ranges["expired"] == (None, today - timedelta(days=1)) and ranges["181+"][1] is None:
+        print("✓ Bucket ranges open-ended at both extremes")
+    else:
+        print("✗ Unexpected bucket ranges")
+    
+    empty = {"expired": 0, "0-7": 0, "8-30": 0, "31-90": 0, "91-180": 0, "181+": 0}
+    subcontractors = [
+        # Two documents, soonest 100 days out
+        {**empty, "documents": 2, "undated": 0, "soonest_expiry": today + timedelta(days=100),
+         "91-180": 1, "181+": 1},
+        # One expired document
+        {**empty, "documents": 1, "undated": 0, "soonest_expiry": today - timedelta(days=3), "expired": 1},
+        # No documents
+        {**empty, "documents": 0, "undated": 0, "soonest_expiry": None}
+    ]
+    soonest = [{
+        "subcontractor_id": "s2", "subcontractor_name": "Sub 2", "document_id": "d3",
+        "document_type": "Insurance", "expiry_date": today - timedelta(days=3)
+    }]
+    summary = ComplianceService.build_summary(subcontractors, soonest, today=today)
+    
+    print(f"Subcontractors: {summary['subcontractors']}")
+    print(f"Documents: {summary['documents']}")
+    
+    if summary["subcontractors"] == {"total": 3, "green": 1, "red": 2} and summary["compliance_rate"] == 33.3:
+        print("✓ Subcontractor counts and rate correct")
+    else:
+        print("✗ Subcontractor counts or rate incorrect")
+    
+    if summary["documents"]["red"] == 1 and summary["documents"]["green"] == 2 \
+            and [b["count"] for b in summary["days_remaining"]] == [1, 0, 0, 0, 1, 1]:
+        print("✓ Document counts and histogram correct")
+    else:
+        print(f"✗ Unexpected histogram: {summary['days_remaining']}")
+    
+    if summary["soonest_expiries"][0]["days_remaining"] == -3 and summary["soonest_expiries"][0]["status"] == "RED":
+        print("✓ Soonest expiry marked RED with days remaining")
+    else:
+        print(f"✗ Unexpected soonest expiries: {summary['soonest_expiries']}")
+
+
+def test_aggregate_status():
+    """Test subcontractor status from document counts and earliest expiry."""
+    print("\n=== Test: Status from aggregates ===")
+    
+    today = datetime(2024, 6, 1).date()
+    cases = [
+        ((2, 0, today + timedelta(days=31)), "GREEN"),
+        ((2, 0, today + timedelta(days=30)), "RED"),
+        ((2, 1, today + timedelta(days=100)), "RED"),
+        ((0, 0, None), "RED"),
+    ]
+    
+    wrong = [(args, expected) for args, expected in cases
+             if ComplianceService.aggregate_status(*args, today=today) != expected]
+    
+    if not wrong:
+        print("✓ Aggregates follow the 30-day rule, undated and empty are RED")
+    else:
+        print(f"✗ Wrong status for: {wrong}")
+
+
+def test_build_forecast():
+    """Test weekly forecast series and totals."""
+    print("\n=== Test: Expiry forecast ===")
+    
+    # A Wednesday: week 0 starts on the Monday before
+    week_starts = ComplianceService.forecast_week_starts(datetime(2024, 6, 5).date(), 4)
+    print(f"Week starts: {week_starts}")
+    
+    if week_starts[0] == datetime(2024, 6, 3).date() and len(week_starts) == 5:
+        print("✓ Weeks start on Monday, with an end boundary")
+    else:
+        print("✗ Unexpected week starts")
+    
+    rows = [
+        (3, "Insurance", "p2", 1),
+        (0, "Insurance", "p1", 2),
+        (2, "Insurance", "p1", 1),
+        (2, "Safety", "p1", 4),
+    ]
+    series, totals = ComplianceService.build_forecast(rows, 4)
+    print(f"Series: {series}")
+    print(f"Totals: {totals}")
+    
+    expected = [
+        {"project_id": "p1", "document_type": "Insurance", "weeks": [0, 2], "counts": [2, 1]},
+        {"project_id": "p1", "document_type": "Safety", "weeks": [2], "counts": [4]},
+        {"project_id": "p2", "document_type": "Insurance", "weeks": [3], "counts": [1]},
+    ]
+    if series == expected and totals == [2, 0, 5, 1]:
+        print("✓ Sparse series per project and type, dense weekly totals")
+    else:
+        print("✗ Unexpected forecast")
+    
+    if ComplianceService.build_forecast([], 3) == ([], [0, 0, 0]):
+        print("✓ Empty forecast has zero totals")
+    else:
+        print("✗ Empty forecast incorrect")
+
+
 if __name__ == "__main__":
     print("=" * 60)
     print("Compliance Service Unit Tests")
@@ -164,6 +273,9 @@ if __name__ == "__main__":
     test_calculate_subcontractor_status_all_green()
     test_calculate_subcontractor_status_one_red()
     test_calculate_subcontractor_status_no_documents()
+    test_build_summary()
+    test_aggregate_status()
+    test_build_forecast()
     
     print("\n" + "=" * 60)
     print("Test suite completed")
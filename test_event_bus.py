@@ -0,0 +1,94 @@
+"""
+Unit tests for the in-process EventBus.
+Tests fan-out, filtering and bounded per-subscriber buffers.
+"""
+from services.event_bus import EventBus, TooManySubscribers
+
+
+def test_publish_fans_out():
+    """Test that every subscriber receives a published event."""
+    print("\n=== Test: Publish fans out to all subscribers ===")
+    
+    bus = EventBus()
+    first = bus.subscribe()
+    second = bus.subscribe()
+    bus.publish("asset.moved", {"asset_ids": ["a1"], "project_id": "p1"})
+    
+    events = [first.get(timeout=1), second.get(timeout=1)]
+    print(f"Events: {events}")
+    
+    if all(e and e["type"] == "asset.moved" for e in events):
+        print("✓ Both subscribers received the event")
+    else:
+        print("✗ Every subscriber should receive the event")
+
+
+def test_event_type_filter():
+    """Test that subscribers only receive the event types they asked for."""
+    print("\n=== Test: Event type filter ===")
+    
+    bus = EventBus()
+    subscription = bus.subscribe(event_types={"document.uploaded"})
+    bus.publish("asset.created", {"id": "a1"})
+    bus.publish("document.uploaded", {"id": "d1"})
+    
+    event = subscription.get(timeout=1)
+    print(f"Event: {event}")
+    
+    if event["type"] == "document.uploaded" and subscription.get(timeout=0) is None:
+        print("✓ Only the requested event type was delivered")
+    else:
+        print("✗ Filtered event types should not be delivered")
+
+
+def test_slow_subscriber_gets_resync():
+    """Test that overflowing a subscriber's buffer yields a resync event."""
+    print("\n=== Test: Slow subscriber overflow ===")
+    
+    bus = EventBus(buffer_size=2)
+    subscription = bus.subscribe()
+    for i in range(5):
+        bus.publish("asset.created", {"id": f"a{i}"})
+    
+    event = subscription.get(timeout=1)
+    print(f"Event: {event}")
+    
+    if event["type"] == "resync" and event["data"]["dropped"] == 3:
+        print("✓ Overflow reported as a resync event")
+    else:
+        print("✗ Dropped events should be reported with a resync event")
+
+
+def test_subscriber_limit():
+    """Test that the bus refuses subscribers beyond its limit."""
+    print("\n=== Test: Subscriber limit ===")
+    
+    bus = EventBus(max_subscribers=1)
+    first = bus.subscribe()
+    
+    try:
+        bus.subscribe()
+        print("✗ Second subscriber should have been refused")
+    except TooManySubscribers:
+        print("✓ Subscriber limit enforced")
+    
+    first.close()
+    if bus.subscriber_count() == 0:
+        print("✓ Closed subscription removed from the bus")
+    else:
+        print("✗ Closed subscription should be removed")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Event Bus Unit Tests")
+    print("=" * 60)
+    
+    test_publish_fans_out()
+    test_event_type_filter()
+    test_slow_subscriber_gets_resync()
+    test_subscriber_limit()
+    
+    print("\n" + "=" * 60)
+    print("Test suite completed")
+    print("=" * 60)
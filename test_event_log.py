@@ -0,0 +1,93 @@
+"""
+Unit tests for the compact EventLog behind the *History models.
+Tests event format, ring-buffer eviction, spilling to disk and slots.
+"""
+import os
+import tempfile
+
+from models.asset import Asset
+from models.asset_history import AssetHistory
+from models.asset_media import AssetMedia
+from models.event_log import EventLog
+
+
+def test_events_format():
+    """Test that events keep the {"timestamp", "event"} shape."""
+    print("\n=== Test: Event format ===")
+    
+    history = AssetHistory()
+    history.log("Asset created")
+    history.log("QR code set: qr.png")
+    events = history.events
+    print(f"Events: {events}")
+    
+    if [e["event"] for e in events] == ["Asset created", "QR code set: qr.png"] and "T" in events[0]["timestamp"]:
+        print("✓ Events returned oldest first with ISO timestamps")
+    else:
+        print("✗ Events should be dicts with an ISO timestamp and the message")
+
+
+def test_ring_buffer():
+    """Test that a full log overwrites its oldest events."""
+    print("\n=== Test: Ring buffer ===")
+    
+    log = EventLog(max_events=3)
+    for i in range(5):
+        log.log(f"event {i}")
+    messages = [e["event"] for e in log.events]
+    print(f"Messages: {messages}, dropped: {log.dropped}")
+    
+    if messages == ["event 2", "event 3", "event 4"] and log.dropped == 2 and len(log) == 3:
+        print("✓ Oldest events evicted and counted")
+    else:
+        print("✗ Expected the last 3 events and 2 dropped")
+
+
+def test_spill_to_disk():
+    """Test that evicted events are appended to the spill file."""
+    print("\n=== Test: Spill to disk ===")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        log = EventLog(max_events=2, spill_path=os.path.join(tmp, "history.log"))
+        for i in range(4):
+            log.log(f"event {i}")
+        messages = [e["event"] for e in log.iter_all()]
+        print(f"All messages: {messages}")
+        
+        if messages == ["event 0", "event 1", "event 2", "event 3"] and log.dropped == 0:
+            print("✓ Spilled and in-memory events read back in order")
+        else:
+            print("✗ iter_all should return every event in order")
+
+
+def test_models_are_slotted():
+    """Test that the models no longer carry a per-instance __dict__."""
+    print("\n=== Test: Slotted models ===")
+    
+    asset = Asset("Drill", "Power Tools", AssetMedia(), AssetHistory())
+    
+    if not hasattr(asset, "__dict__") and not hasattr(asset.history, "__dict__"):
+        print("✓ Asset and AssetHistory use __slots__")
+    else:
+        print("✗ Models should not have a __dict__")
+    
+    try:
+        asset.colour = "yellow"
+        print("✗ Unknown attributes should be rejected")
+    except AttributeError:
+        print("✓ Unknown attributes rejected")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Event Log Unit Tests")
+    print("=" * 60)
+    
+    test_events_format()
+    test_ring_buffer()
+    test_spill_to_disk()
+    test_models_are_slotted()
+    
+    print("\n" + "=" * 60)
+    print("Test suite completed")
+    print("=" * 60)
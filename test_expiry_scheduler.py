@@ -0,0 +1,127 @@
+"""
+Unit tests for the expiry scheduler: the crossing heap and the alert
+loop over document uploads, changes and restarts.
+"""
+import os
+import tempfile
+from datetime import datetime, date, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database.db import Base
+from database.models import ProjectORM, SubcontractorORM, ComplianceDocumentORM, ExpiryAlertORM
+from services.expiry_scheduler import ExpiryHeap, ExpiryScheduler, crossing_time
+
+
+def test_heap_crossings():
+    """Test crossing order, collapsed past crossings and rescheduling."""
+    print("\n=== Test: Expiry heap ===")
+    
+    now = datetime(2024, 6, 1, 12, 0)
+    heap = ExpiryHeap()
+    heap.schedule("far", date(2024, 9, 1), now=now)
+    heap.schedule("soon", date(2024, 6, 5), now=now)                  # Past T-30 and T-7
+    heap.schedule("sent", date(2024, 6, 20), sent={30}, now=now)      # T-30 already alerted
+    
+    due = heap.pop_due(now)
+    print(f"Due now: {due}")
+    
+    if due == [("soon", 7, date(2024, 6, 5))]:
+        print("✓ Past crossings collapse to the latest, sent ones skipped")
+    else:
+        print("✗ Unexpected due crossings")
+    
+    if heap.next_time() == crossing_time(date(2024, 6, 5), 0):
+        print("✓ Next crossing is the soonest T-0")
+    else:
+        print(f"✗ Unexpected next crossing: {heap.next_time()}")
+    
+    # Renewal moves the expiry date; the old crossings must never fire
+    heap.schedule("soon", date(2025, 6, 5), now=now)
+    heap.remove("sent")
+    fired = [(document_id, days) for document_id, days, _ in heap.pop_due(datetime(2024, 8, 31))]
+    print(f"Fired by 2024-08-31: {fired}")
+    
+    if fired == [("far", 7)]:
+        print("✓ Renewed and removed documents dropped, overdue crossings collapsed")
+    else:
+        print("✗ Stale crossings fired")
+
+
+def test_scheduler_alerts_once():
+    """Test alerts for loaded and uploaded documents, the first start, retries and restarts."""
+    print("\n=== Test: Expiry scheduler ===")
+    
+    engine = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'expiry.db')}")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    today = date.today()
+    
+    db.add(ProjectORM(id="p1", name="Alpha", subcontractors=[SubcontractorORM(id="s1", name="Sub")]))
+    # Before the first start d1 passed its 30-day threshold, d2 all of them
+    # and d3 all but the 0-day one, which it reaches today
+    for i, days in enumerate([60, 20, -10, 0]):
+        db.add(ComplianceDocumentORM(id=f"d{i}", subcontractor_id="s1", document_type="Insurance",
+                                     file_path="x", expiry_date=today + timedelta(days=days)))
+    db.commit()
+    
+    sent = []
+    working = [False]
+    
+    def notify(db, alerts):
+        sent.append(sorted((doc.id, days) for doc, days in alerts))
+        return working[0]
+    
+    scheduler = ExpiryScheduler(Session, notify)
+    scheduler.load()
+    seeded = sorted((a.document_id, a.threshold_days) for a in db.query(ExpiryAlertORM))
+    if seeded == [("d1", 30), ("d2", 0), ("d2", 7), ("d2", 30), ("d3", 7), ("d3", 30)]:
+        print("✓ First start records crossings before today as sent")
+    else:
+        print(f"✗ Unexpected alerts recorded on first start: {seeded}")
+    
+    now = datetime.now()
+    scheduler.run_once(now)
+    working[0] = True
+    scheduler.run_once(now + timedelta(seconds=ExpiryScheduler.RETRY_SECONDS))
+    print(f"Notifications: {sent}")
+    
+    if sent == [[("d3", 0)]] * 2 and db.query(ExpiryAlertORM).count() == 7:
+        print("✓ Failed alert retried, then recorded")
+    else:
+        print("✗ Unexpected alerts")
+    
+    # An upload close to expiry is alerted on the next run
+    db.add(ComplianceDocumentORM(id="d4", subcontractor_id="s1", document_type="Safety",
+                                 file_path="x", expiry_date=today + timedelta(days=3)))
+    db.commit()
+    wait = scheduler.run_once()
+    if sent[-1] == [("d4", 7)] and wait <= scheduler.poll_seconds:
+        print("✓ Uploaded document alerted without a rescan")
+    else:
+        print(f"✗ Upload not alerted: {sent[-1]}")
+    
+    restarted = ExpiryScheduler(Session, notify)
+    restarted.load()
+    count = len(sent)
+    restarted.run_once()
+    if len(sent) == count:
+        print("✓ Restart does not repeat sent alerts")
+    else:
+        print(f"✗ Alerts repeated after restart: {sent[count:]}")
+    db.close()
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Expiry Scheduler Tests")
+    print("=" * 60)
+    
+    test_heap_crossings()
+    test_scheduler_alerts_once()
+    
+    print("\n" + "=" * 60)
+    print("All tests completed!")
+    print("=" * 60)
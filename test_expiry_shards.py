@@ -0,0 +1,212 @@
+"""
+Unit tests for the sharded expiry check: shard assignment, claiming
+shards once per day, splitting documents between shards, and queuing
+one digest once every shard is done.
+"""
+import os
+import tempfile
+from collections import Counter
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+
+from database.db import Base
+from database.models import (
+    ComplianceDocumentORM, ExpiryCheckRunORM, ExpiryCheckShardORM, ProjectORM, SubcontractorORM
+)
+from api.middleware.query_counter import count_queries
+from services.expiry_shards import (
+    claim_digest, claim_shard, complete_shard, ensure_shards, shard_documents, shard_key, shard_of,
+    subcontractor_shards
+)
+
+
+def make_session():
+    engine = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'shards.db')}")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)
+
+
+def test_shard_of():
+    """Test that shards are stable and spread subcontractors evenly."""
+    print("\n=== Test: Shard assignment ===")
+    
+    counts = Counter(shard_of(f"sub-{i}", 16) for i in range(16000))
+    if shard_of("sub-1", 16) == shard_of("sub-1", 16) and set(counts) == set(range(16)):
+        print("✓ Every shard used, same ID always in the same shard")
+    else:
+        print(f"✗ Unexpected shards: {sorted(counts)}")
+    
+    if min(counts.values()) > 800 and max(counts.values()) < 1200:
+        print(f"✓ Even spread: {min(counts.values())}-{max(counts.values())} per shard")
+    else:
+        print(f"✗ Uneven spread: {min(counts.values())}-{max(counts.values())} per shard")
+
+
+def test_claims_once_per_day():
+    """Test that each shard is claimed by one worker per day."""
+    print("\n=== Test: Shard claims ===")
+    
+    Session = make_session()
+    db = Session()
+    ensure_shards(db, 8)
+    ensure_shards(db, 4)
+    if [row.shard for row in db.query(ExpiryCheckShardORM).order_by(ExpiryCheckShardORM.shard)] == [0, 1, 2, 3]:
+        print("✓ Shard table resized to EXPIRY_CHECK_SHARDS")
+    else:
+        print("✗ Shard table not resized")
+    db.close()
+    
+    today = date(2024, 11, 13)
+    workers = [Session(), Session()]
+    
+    # A worker that fails mid-shard rolls back and leaves it for the others
+    crashed = claim_shard(workers[0], today)
+    workers[0].rollback()
+    
+    claimed = []
+    while True:
+        worker = workers[len(claimed) % 2]
+        shard = claim_shard(worker, today)
+        if shard is None:
+            break
+        claimed.append(shard.shard)
+        complete_shard(worker, shard, today, f"worker-{len(claimed) % 2}")
+    
+    if crashed.shard == 0 and sorted(claimed) == [0, 1, 2, 3]:
+        print("✓ Each shard claimed once, rolled-back claim released")
+    else:
+        print(f"✗ Unexpected claims: {claimed}")
+    
+    again = claim_shard(workers[1], today)
+    workers[1].rollback()
+    tomorrow = claim_shard(workers[1], today + timedelta(days=1))
+    if again is None and tomorrow.shard == 0:
+        print("✓ Nothing left today, all shards due again tomorrow")
+    else:
+        print("✗ Unexpected claims after the run")
+    for worker in workers:
+        worker.close()
+    
+    query = Session().query(ExpiryCheckShardORM).with_for_update(skip_locked=True)
+    if "FOR UPDATE SKIP LOCKED" in str(query.statement.compile(dialect=postgresql.dialect())):
+        print("✓ PostgreSQL claims use FOR UPDATE SKIP LOCKED")
+    else:
+        print("✗ PostgreSQL claims do not skip locked rows")
+
+
+def test_shard_documents():
+    """Test that every expiring document is in exactly one shard."""
+    print("\n=== Test: Shard documents ===")
+    
+    db = make_session()()
+    project = ProjectORM(id="p1", name="Alpha")
+    subcontractors = [SubcontractorORM(id=f"s{i}", name=f"Sub {i}") for i in range(50)]
+    project.subcontractors = subcontractors[:10]
+    db.add(project)
+    db.add_all(subcontractors)
+    today = date(2024, 11, 13)
+    for i in range(200):
+        db.add(ComplianceDocumentORM(
+            id=f"d{i}", subcontractor_id=f"s{i % 50}", document_type="Insurance", file_path=f"d{i}.pdf",
+            expiry_date=today + timedelta(days=i - 100)
+        ))
+    db.commit()
+    
+    found = [doc.id for shard in range(4) for doc in shard_documents(db, shard, 4, today + timedelta(days=30))]
+    if sorted(found) == sorted(f"d{i}" for i in range(131)):
+        print(f"✓ {len(found)} expiring documents, each in exactly one shard")
+    else:
+        print(f"✗ {len(found)} documents found, {len(set(found))} distinct")
+    
+    documents = shard_documents(db, shard_of("s0", 4), 4, today + timedelta(days=30))
+    sub = [doc for doc in documents if doc.subcontractor_id == "s0"]
+    if sub and [p.name for p in sub[0].subcontractor.projects] == ["Alpha"] \
+            and all(shard_of(doc.subcontractor_id, 4) == shard_of("s0", 4) for doc in documents):
+        print("✓ Documents come with their subcontractor and projects")
+    else:
+        print("✗ Wrong documents or relations for the shard")
+    
+    by_shard = subcontractor_shards(db, 4)
+    with count_queries() as stats:
+        shared = [
+            doc.id for shard in range(4)
+            for doc in shard_documents(db, shard, 4, today + timedelta(days=30), by_shard.get(shard, []))
+        ]
+    subcontractor_scans = stats.fingerprints["SELECT subcontractors.id AS subcontractors_id FROM subcontractors"]
+    if sorted(shared) == sorted(found) and subcontractor_scans == 0:
+        print("✓ Subcontractors read once per worker, not once per shard")
+    else:
+        print(f"✗ {subcontractor_scans} subcontractor scans, {len(shared)} documents")
+    
+    sql = str(shard_key(ComplianceDocumentORM.subcontractor_id, 16).compile(dialect=postgresql.dialect()))
+    if "hashtext(compliance_documents.subcontractor_id)" in sql:
+        print("✓ PostgreSQL computes the shard in the query")
+    else:
+        print(f"✗ Unexpected shard expression: {sql}")
+    db.close()
+
+
+def test_daily_digest():
+    """Test that only the worker finding every shard done gets the day's digest, once."""
+    print("\n=== Test: Daily digest ===")
+    
+    Session = make_session()
+    db = Session()
+    ensure_shards(db, 4)
+    db.close()
+    
+    today = date(2024, 11, 13)
+    workers = [Session(), Session()]
+    for shard_number in range(3):
+        shard = claim_shard(workers[0], today)
+        complete_shard(workers[0], shard, today, "worker-0", [[f"d{shard_number}", "2024-11-20"]])
+    
+    # Shard 3 is still being checked by the other worker
+    early = claim_digest(workers[0], today, "worker-0")
+    workers[0].rollback()
+    
+    last = claim_shard(workers[1], today)
+    complete_shard(workers[1], last, today, "worker-1")
+    digest = claim_digest(workers[1], today, "worker-1")
+    workers[1].commit()
+    
+    if early is None and digest == [[f"d{i}", "2024-11-20"] for i in range(3)]:
+        print("✓ Digest claimed by the worker that finished the last shard, with every shard's documents")
+    else:
+        print(f"✗ Unexpected digests: before the last shard {early}, after {digest}")
+    
+    # Both workers saw every shard done; only one may queue the digest
+    again = claim_digest(workers[0], today, "worker-0")
+    workers[0].commit()
+    runs = workers[0].query(ExpiryCheckRunORM.run_date, ExpiryCheckRunORM.queued_by).all()
+    if again is None and runs == [(today, "worker-1")]:
+        print("✓ Digest claimed once per day")
+    else:
+        print(f"✗ Digest claimed twice: {again}, runs {runs}")
+    
+    tomorrow = claim_digest(workers[0], today + timedelta(days=1), "worker-0")
+    workers[0].rollback()
+    if tomorrow is None:
+        print("✓ No digest for a day whose shards are not checked yet")
+    else:
+        print(f"✗ Digest for an unchecked day: {tomorrow}")
+    for worker in workers:
+        worker.close()
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Expiry Check Shard Tests")
+    print("=" * 60)
+    
+    test_shard_of()
+    test_claims_once_per_day()
+    test_shard_documents()
+    test_daily_digest()
+    
+    print("\n" + "=" * 60)
+    print("All tests completed!")
+    print("=" * 60)
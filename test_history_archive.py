@@ -0,0 +1,128 @@
+"""
+Unit tests for asset_history partitioning helpers, Parquet archival and
+the hot + archived HistoryStore, against a temporary SQLite database.
+"""
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from database.db import Base
+from database.history_archive import HistoryArchive, archive_history
+from database.models import AssetHistoryORM
+from database.partitions import add_months, month_start, partition_month, partition_name
+from services.history_store import HistoryStore
+
+
+def _history_database():
+    """Database with 3 assets moved once a week for 18 months."""
+    engine = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'history.db')}")
+    Base.metadata.create_all(engine)
+    now = datetime.utcnow()
+    rows = [
+        {"id": f"h-{asset}-{week}", "asset_id": f"a{asset}", "project_id": None,
+         "moved_at": now - timedelta(weeks=week, hours=asset), "moved_by": None}
+        for asset in range(3) for week in range(78)
+    ]
+    with engine.begin() as conn:
+        conn.execute(AssetHistoryORM.__table__.insert(), rows)
+    return engine, len(rows)
+
+
+def test_month_helpers():
+    """Test month arithmetic and partition names."""
+    print("\n=== Test: Month helpers ===")
+    
+    month = month_start(datetime(2024, 11, 17, 8, 30))
+    checks = [
+        (month, datetime(2024, 11, 1)),
+        (add_months(month, 2), datetime(2025, 1, 1)),
+        (add_months(month, -11), datetime(2023, 12, 1)),
+        (partition_name(month), "asset_history_p2024_11"),
+        (partition_month("asset_history_p2024_11"), month),
+        (partition_month("asset_history_default"), None),
+    ]
+    
+    failures = [(got, want) for got, want in checks if got != want]
+    if not failures:
+        print("✓ Month arithmetic and partition names correct")
+    else:
+        print(f"✗ Mismatches: {failures}")
+
+
+def test_archive_and_union():
+    """Test that old months move to Parquet and histories still include them."""
+    print("\n=== Test: Archive and union ===")
+    
+    engine, total = _history_database()
+    archive = HistoryArchive(tempfile.mkdtemp())
+    archived = archive_history(engine, archive, hot_months=6, log=lambda message: None)
+    
+    cutoff = add_months(month_start(datetime.utcnow()), -5)
+    with engine.connect() as conn:
+        hot = conn.execute(select(func.count()).select_from(AssetHistoryORM)).scalar()
+        oldest_hot = conn.execute(select(func.min(AssetHistoryORM.moved_at))).scalar()
+    print(f"Archived months: {len(archived)}, rows: {sum(archived.values())}, hot rows: {hot}")
+    
+    if hot + sum(archived.values()) == total and oldest_hot >= cutoff:
+        print("✓ Only months before the cutoff archived, no rows lost")
+    else:
+        print("✗ Archive should hold exactly the rows older than the cutoff")
+    
+    store = HistoryStore(archive)
+    db = sessionmaker(bind=engine)()
+    history = store.asset_history(db, "a1")
+    times = [row["moved_at"] for row in history]
+    print(f"History rows for a1: {len(history)}")
+    
+    if len(history) == 78 and times == sorted(times, reverse=True) and all(r["asset_id"] == "a1" for r in history):
+        print("✓ Hot and archived rows returned together, newest first")
+    else:
+        print("✗ Expected all 78 moves of a1 in order")
+    
+    window = store.history(db, start=cutoff - timedelta(days=60), end=cutoff, newest_first=False)
+    if window and all(cutoff - timedelta(days=60) <= r["moved_at"] < cutoff for r in window):
+        print("✓ Time-range query reads only matching archived rows")
+    else:
+        print("✗ Time-range query returned rows outside the range")
+    db.close()
+
+
+def test_duplicate_rows_returned_once():
+    """Test that a row both archived and still hot is not doubled."""
+    print("\n=== Test: Duplicate rows ===")
+    
+    engine, _ = _history_database()
+    archive = HistoryArchive(tempfile.mkdtemp())
+    with engine.connect() as conn:
+        rows = [dict(r) for r in conn.execute(
+            select(AssetHistoryORM.__table__).where(AssetHistoryORM.asset_id == "a0")
+            .order_by(AssetHistoryORM.moved_at)
+        ).mappings()][:5]
+    # Simulates a run interrupted after writing the file but before deleting
+    archive.write_month(month_start(rows[0]["moved_at"]), [rows])
+    
+    db = sessionmaker(bind=engine)()
+    history = HistoryStore(archive).asset_history(db, "a0")
+    db.close()
+    
+    if len(history) == 78 and len({r["id"] for r in history}) == 78:
+        print("✓ Each movement returned once")
+    else:
+        print(f"✗ Expected 78 unique rows, got {len(history)}")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Asset History Archive Tests")
+    print("=" * 60)
+    
+    test_month_helpers()
+    test_archive_and_union()
+    test_duplicate_rows_returned_once()
+    
+    print("\n" + "=" * 60)
+    print("All tests completed!")
+    print("=" * 60)
@@ -0,0 +1,153 @@
+"""
+Unit tests for Idempotency-Key handling: response replay, key reuse with
+another request, server errors, expiry, abandoned requests and
+concurrent retries, against a temporary SQLite database.
+"""
+import os
+import tempfile
+import threading
+from datetime import datetime, timedelta
+
+from flask import Flask, jsonify, request
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from api.middleware.idempotency import init_idempotency
+from database.db import Base
+from services.idempotency_store import IdempotencyKeyInUse, IdempotencyStore
+
+
+def make_store(**kwargs):
+    engine = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'idempotency.db')}")
+    Base.metadata.create_all(engine)
+    return IdempotencyStore(sessionmaker(bind=engine), **kwargs)
+
+
+def make_app(store):
+    app = Flask(__name__)
+    app.config.update(TESTING=True)
+    init_idempotency(app, store)
+    app.created = []
+    
+    @app.post("/things")
+    def create_thing():
+        app.created.append(request.get_json()["name"])
+        return jsonify({"id": len(app.created)}), 201
+    
+    @app.post("/broken")
+    def broken():
+        app.created.append("broken")
+        return jsonify({"error": "Internal Server Error"}), 500
+    
+    return app
+
+
+def test_replay():
+    """Test that a retried request gets the stored response without running again."""
+    print("\n=== Test: Replay ===")
+    
+    app = make_app(make_store())
+    client = app.test_client()
+    headers = {"Idempotency-Key": "abc"}
+    
+    first = client.post("/things", json={"name": "Drill"}, headers=headers)
+    retry = client.post("/things", json={"name": "Drill"}, headers=headers)
+    if app.created == ["Drill"] and retry.status_code == 201 and retry.get_json() == first.get_json() \
+            and retry.headers.get("Idempotent-Replayed") == "true":
+        print("✓ Retry replayed the original 201 response")
+    else:
+        print(f"✗ Retry ran again or differed: {app.created}, {retry.status_code}")
+    
+    client.post("/things", json={"name": "Saw"})
+    client.post("/things", json={"name": "Saw"})
+    reused = client.post("/things", json={"name": "Ladder"}, headers=headers)
+    if app.created == ["Drill", "Saw", "Saw"] and reused.status_code == 422:
+        print("✓ Requests without a key run every time, a reused key is rejected")
+    else:
+        print(f"✗ Unexpected: {app.created}, reused key got {reused.status_code}")
+    
+    too_long = client.post("/things", json={"name": "x"}, headers={"Idempotency-Key": "k" * 300})
+    if too_long.status_code == 400:
+        print("✓ Oversized key rejected")
+    else:
+        print(f"✗ Oversized key got {too_long.status_code}")
+
+
+def test_errors_and_expiry():
+    """Test that server errors are not stored and responses expire."""
+    print("\n=== Test: Errors and expiry ===")
+    
+    store = make_store(ttl=60, lock_timeout=5)
+    app = make_app(store)
+    client = app.test_client()
+    
+    client.post("/broken", json={}, headers={"Idempotency-Key": "e1"})
+    client.post("/broken", json={}, headers={"Idempotency-Key": "e1"})
+    if app.created == ["broken", "broken"]:
+        print("✓ 5xx response not stored, retry runs again")
+    else:
+        print(f"✗ Unexpected runs: {app.created}")
+    
+    now = datetime.utcnow()
+    store.begin("k", "hash", now)
+    store.finish("k", 201, "application/json", b'{"id": 1}')
+    replayed = store.begin("k", "hash", now + timedelta(seconds=59))
+    expired = store.begin("k", "hash", now + timedelta(seconds=61))
+    if replayed is not None and replayed.body == b'{"id": 1}' and expired is None:
+        print("✓ Response replayed within the TTL, key free again after it")
+    else:
+        print(f"✗ Unexpected: replayed {replayed}, expired {expired}")
+    
+    store.begin("stuck", "hash", now)
+    try:
+        store.begin("stuck", "hash", now + timedelta(seconds=1))
+        in_use = False
+    except IdempotencyKeyInUse:
+        in_use = True
+    taken_over = store.begin("stuck", "hash", now + timedelta(seconds=6))
+    if in_use and taken_over is None:
+        print("✓ Unfinished request blocks retries until the lock timeout")
+    else:
+        print("✗ Unfinished request handled incorrectly")
+
+
+def test_concurrent_retries():
+    """Test that of many simultaneous requests with one key exactly one runs."""
+    print("\n=== Test: Concurrent retries ===")
+    
+    store = make_store()
+    results = []
+    barrier = threading.Barrier(8)
+    
+    def attempt():
+        barrier.wait()
+        try:
+            results.append("ran" if store.begin("same", "hash") is None else "replayed")
+        except IdempotencyKeyInUse:
+            results.append("in use")
+    
+    threads = [threading.Thread(target=attempt) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    print(f"Results: {sorted(results)}")
+    if results.count("ran") == 1 and results.count("in use") == 7:
+        print("✓ One request reserved the key, the others were told to retry")
+    else:
+        print("✗ More than one request ran")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Idempotency-Key Tests")
+    print("=" * 60)
+    
+    test_replay()
+    test_errors_and_expiry()
+    test_concurrent_retries()
+    
+    print("\n" + "=" * 60)
+    print("All tests completed!")
+    print("=" * 60)
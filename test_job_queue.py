@@ -0,0 +1,151 @@
+"""
+Unit tests for the background job queue: transactional enqueue,
+priorities, retries with backoff, visibility timeouts and handler writes.
+"""
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database.db import Base
+from database.models import JobORM, ProjectORM
+from services.job_queue import JobWorker, backoff_seconds, enqueue
+
+
+def make_session():
+    engine = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'jobs.db')}")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)
+
+
+def test_enqueue_and_priorities():
+    """Test that jobs are queued with the caller's transaction and run by priority."""
+    print("\n=== Test: Enqueue and priorities ===")
+    
+    Session = make_session()
+    db = Session()
+    enqueue(db, "noop", {"n": 0})
+    db.rollback()
+    enqueue(db, "noop", {"n": 1})
+    enqueue(db, "noop", {"n": 2}, priority=10)
+    enqueue(db, "noop", {"n": 3}, delay_seconds=3600)
+    db.commit()
+    
+    ran = []
+    worker = JobWorker(Session, {"noop": lambda db, payload: ran.append(payload["n"])})
+    while worker.run_once():
+        pass
+    
+    if ran == [2, 1]:
+        print("✓ Rolled-back job never queued, higher priority first, delayed job waits")
+    else:
+        print(f"✗ Unexpected run order: {ran}")
+    
+    worker.run_once(datetime.utcnow() + timedelta(hours=2))
+    statuses = sorted(status for (status,) in db.query(JobORM.status))
+    if ran == [2, 1, 3] and statuses == ["done"] * 3:
+        print("✓ Delayed job runs once due")
+    else:
+        print(f"✗ Unexpected state: ran {ran}, statuses {statuses}")
+    db.close()
+
+
+def test_retries_and_failures():
+    """Test backoff after failures and giving up after max_attempts."""
+    print("\n=== Test: Retries ===")
+    
+    Session = make_session()
+    db = Session()
+    enqueue(db, "flaky", priority=1, max_attempts=3)
+    enqueue(db, "missing")
+    db.commit()
+    
+    calls = []
+    
+    def flaky(db, payload):
+        calls.append(len(calls))
+        if len(calls) < 3:
+            raise RuntimeError("SMTP unavailable")
+    
+    worker = JobWorker(Session, {"flaky": flaky})
+    now = datetime.utcnow()
+    worker.run_once(now)
+    worker.run_once(now)
+    job = db.query(JobORM).filter(JobORM.kind == "flaky").one()
+    missing = db.query(JobORM).filter(JobORM.kind == "missing").one()
+    if job.status == "queued" and job.run_at == now + timedelta(seconds=backoff_seconds(1)) \
+            and "SMTP unavailable" in job.last_error and "No handler" in missing.last_error:
+        print("✓ Failed attempts rescheduled with backoff and their error")
+    else:
+        print(f"✗ Unexpected job after a failure: {job.status} {job.run_at}")
+    
+    if backoff_seconds(1) == 30 and backoff_seconds(3) == 120 and backoff_seconds(20) == 3600:
+        print("✓ Backoff doubles per attempt up to the cap")
+    else:
+        print("✗ Unexpected backoff")
+    
+    worker.run_once(now + timedelta(seconds=backoff_seconds(1)))
+    worker.run_once(now + timedelta(seconds=backoff_seconds(1) + backoff_seconds(2)))
+    db.expire_all()
+    if job.status == "done" and job.attempts == 3 and len(calls) == 3:
+        print("✓ Job succeeded on its third attempt")
+    else:
+        print(f"✗ Unexpected job: {job.status}, {job.attempts} attempts")
+    
+    later = now + timedelta(days=1)
+    for _ in range(5):
+        worker.run_once(later)
+        later += timedelta(seconds=backoff_seconds(5))
+    db.expire_all()
+    if missing.status == "failed" and missing.attempts == 5:
+        print("✓ Job marked failed after max_attempts")
+    else:
+        print(f"✗ Unexpected job: {missing.status}, {missing.attempts} attempts")
+    db.close()
+
+
+def test_visibility_timeout():
+    """Test that a job held past its timeout is retried and settled once."""
+    print("\n=== Test: Visibility timeout ===")
+    
+    Session = make_session()
+    db = Session()
+    enqueue(db, "slow")
+    db.commit()
+    
+    now = datetime.utcnow()
+    stalled = JobWorker(Session, {}, visibility_timeout=60, worker_id="stalled")
+    rescuer = JobWorker(Session, {"slow": lambda db, payload: db.add(ProjectORM(id="p1", name="Made by job"))},
+                        visibility_timeout=60, worker_id="rescuer")
+    
+    held = stalled.claim(db, now)
+    if held is not None and not rescuer.run_once(now + timedelta(seconds=30)):
+        print("✓ Claimed job hidden from other workers")
+    else:
+        print("✗ Claimed job visible to other workers")
+    
+    rescuer.run_once(now + timedelta(seconds=61))
+    settled = stalled._settle(db, held[0], held[1], now=now + timedelta(seconds=90))
+    job = db.query(JobORM).one()
+    if job.status == "done" and job.attempts == 2 and not settled \
+            and db.query(ProjectORM).filter(ProjectORM.id == "p1").count() == 1:
+        print("✓ Timed-out job retried, handler writes committed, stale worker ignored")
+    else:
+        print(f"✗ Unexpected job: {job.status}, {job.attempts} attempts, stale settle {settled}")
+    db.close()
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Job Queue Tests")
+    print("=" * 60)
+    
+    test_enqueue_and_priorities()
+    test_retries_and_failures()
+    test_visibility_timeout()
+    
+    print("\n" + "=" * 60)
+    print("All tests completed!")
+    print("=" * 60)
@@ -0,0 +1,139 @@
+"""
+Unit tests for point-in-time location queries: the interval tree, the
+asset/project location index, and LocationService over hot, archived
+and newly recorded history.
+"""
+import os
+import tempfile
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database.db import Base
+from database.history_archive import HistoryArchive, archive_history
+from database.models import AssetORM, AssetHistoryORM, ProjectORM
+from services.interval_tree import IntervalTree, OPEN_END
+from services.location_service import LocationService
+
+
+def test_interval_tree_matches_scan():
+    """Test that stab queries return exactly the intervals containing t."""
+    print("\n=== Test: Interval tree ===")
+    
+    rng = np.random.default_rng(7)
+    starts = rng.integers(0, 1_000_000, 5000)
+    ends = starts + rng.integers(1, 50_000, 5000)
+    ends[::25] = OPEN_END
+    tree = IntervalTree(starts, ends)
+    
+    mismatches = 0
+    for t in rng.integers(0, 1_100_000, 200):
+        expected = np.flatnonzero((starts <= t) & (ends > t))
+        if not np.array_equal(np.sort(tree.stab(t)), expected):
+            mismatches += 1
+    
+    if mismatches == 0:
+        print("✓ 200 stab queries match a full scan")
+    else:
+        print(f"✗ {mismatches} stab queries differ from a full scan")
+    
+    same = IntervalTree(np.zeros(1000, dtype=np.int64), np.ones(1000, dtype=np.int64))
+    if len(same.stab(0)) == 1000 and len(same.stab(1)) == 0:
+        print("✓ Identical intervals handled, end is exclusive")
+    else:
+        print("✗ Identical intervals answered incorrectly")
+
+
+def test_locations_over_hot_archived_and_new_moves():
+    """Test asset and project queries across archived, hot and later moves."""
+    print("\n=== Test: Location service ===")
+    
+    engine = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'locations.db')}")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    
+    db.add_all([ProjectORM(id="p1", name="Alpha"), ProjectORM(id="p2", name="Beta")])
+    db.add_all([AssetORM(id=f"a{i}", name=f"Asset {i}", category="Tools") for i in range(3)])
+    # a0: p1 (2023-01-01) -> p2 (2023-03-01) -> unassigned (2023-05-01)
+    # a1: p1 (2023-02-01);  a2: p2 (2023-01-15)
+    moves = [("a0", "p1", datetime(2023, 1, 1)), ("a0", "p2", datetime(2023, 3, 1)),
+             ("a0", None, datetime(2023, 5, 1)), ("a1", "p1", datetime(2023, 2, 1)),
+             ("a2", "p2", datetime(2023, 1, 15))]
+    for i, (asset_id, project_id, moved_at) in enumerate(moves):
+        db.add(AssetHistoryORM(id=f"h{i}", asset_id=asset_id, project_id=project_id, moved_at=moved_at))
+    db.commit()
+    
+    # Archive everything, then record one move in the hot table
+    archive = HistoryArchive(tempfile.mkdtemp())
+    archive_history(engine, archive, hot_months=1, log=lambda message: None)
+    db.add(AssetHistoryORM(id="h-hot", asset_id="a2", project_id="p1", moved_at=datetime.utcnow()))
+    db.commit()
+    
+    service = LocationService(archive)
+    location = service.location_at(db, "a0", datetime(2023, 3, 10))
+    if location == {"project_id": "p2", "since": datetime(2023, 3, 1), "until": datetime(2023, 5, 1)}:
+        print("✓ Asset location found in archived history")
+    else:
+        print(f"✗ Unexpected location: {location}")
+    
+    if service.location_at(db, "a0", datetime(2022, 12, 31)) is None \
+            and service.location_at(db, "a2", datetime.utcnow())["project_id"] == "p1":
+        print("✓ No location before the first move, hot move seen")
+    else:
+        print("✗ Wrong answer before the first move or for the hot move")
+    
+    on_p1 = [row["asset_id"] for row in service.assets_at(db, "p1", datetime(2023, 2, 15))]
+    on_p2 = [row["asset_id"] for row in service.assets_at(db, "p2", datetime(2023, 3, 1))]
+    print(f"p1 on 2023-02-15: {on_p1}, p2 on 2023-03-01: {on_p2}")
+    if on_p1 == ["a0", "a1"] and on_p2 == ["a2", "a0"]:
+        print("✓ Project snapshots correct, ordered by arrival")
+    else:
+        print("✗ Unexpected project snapshots")
+    
+    # A move recorded after the index was built comes from the change log
+    db.add(AssetHistoryORM(id="h-new", asset_id="a1", project_id="p2", moved_at=datetime(2023, 2, 10)))
+    db.commit()
+    on_p1 = [row["asset_id"] for row in service.assets_at(db, "p1", datetime(2023, 2, 15))]
+    on_p2 = [row["asset_id"] for row in service.assets_at(db, "p2", datetime(2023, 2, 15))]
+    if on_p1 == ["a0"] and on_p2 == ["a2", "a1"]:
+        print("✓ Back-dated move applied without rebuilding")
+    else:
+        print(f"✗ Move not applied: p1 {on_p1}, p2 {on_p2}")
+    
+    # Many new moves are read back in several IN (...) lists
+    service.ID_BATCH_SIZE = 2
+    db.add_all([AssetHistoryORM(id=f"h-batch{i}", asset_id="a0", project_id=project_id, moved_at=moved_at)
+                for i, (project_id, moved_at) in enumerate([("p1", datetime(2023, 6, 1)), ("p2", datetime(2023, 7, 1)),
+                                                            ("p1", datetime(2023, 8, 1))])])
+    db.commit()
+    on_p2 = [row["asset_id"] for row in service.assets_at(db, "p2", datetime(2023, 7, 15))]
+    on_p1 = [row["asset_id"] for row in service.assets_at(db, "p1", datetime(2023, 8, 15))]
+    if on_p2 == ["a2", "a1", "a0"] and on_p1 == ["a0"] and service._recent_count == 4:
+        print("✓ New moves read in ID batches")
+    else:
+        print(f"✗ New moves lost between batches: p2 {on_p2}, p1 {on_p1}, {service._recent_count} recent")
+    
+    service.REBUILD_AFTER = 1
+    db.add(AssetHistoryORM(id="h-new2", asset_id="a1", project_id="p1", moved_at=datetime(2023, 2, 20)))
+    db.commit()
+    on_p1 = [row["asset_id"] for row in service.assets_at(db, "p1", datetime(2023, 2, 25))]
+    if on_p1 == ["a0", "a1"] and not service._recent:
+        print("✓ Recent moves folded into a rebuilt index")
+    else:
+        print(f"✗ Unexpected result after rebuild: {on_p1}")
+    db.close()
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Point-in-Time Location Tests")
+    print("=" * 60)
+    
+    test_interval_tree_matches_scan()
+    test_locations_over_hot_archived_and_new_moves()
+    
+    print("\n" + "=" * 60)
+    print("All tests completed!")
+    print("=" * 60)
@@ -0,0 +1,78 @@
+"""
+Unit tests for AssetMapper and PlaceMapper.
+Tests ID-preserving round trips and the bulk Core row-mapping paths
+against an in-memory SQLite database.
+"""
+from sqlalchemy import create_engine, insert, select
+
+from database.db import Base
+from database.models import AssetORM, PlaceORM
+from mappers.asset_mapper import AssetMapper
+from mappers.place_mapper import PlaceMapper
+from models.asset import Asset
+from models.place import Place
+
+
+def test_single_round_trip():
+    """Test that to_orm/to_domain keep the domain IDs."""
+    print("\n=== Test: Single object round trip ===")
+    
+    asset = Asset("Excavator", "Heavy Equipment", None, None)
+    place = Place("Downtown Office", location="123 Main St")
+    
+    asset_back = AssetMapper.to_domain(AssetMapper.to_orm(asset))
+    place_back = PlaceMapper.to_domain(PlaceMapper.to_orm(place))
+    print(f"Asset: {asset_back}, Place: {place_back}")
+    
+    if asset_back.asset_id == asset.asset_id and place_back.place_id == place.place_id:
+        print("✓ IDs preserved")
+    else:
+        print("✗ to_domain should keep the stored ID")
+
+
+def test_bulk_round_trip():
+    """Test to_orm_many -> Core insert -> select -> to_domain_many."""
+    print("\n=== Test: Bulk Core round trip ===")
+    
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    
+    assets = [Asset(f"Asset {i}", "Power Tools", None, None) for i in range(100)]
+    places = [Place(f"Site {i}", location=f"{i} Main St") for i in range(10)]
+    
+    with engine.begin() as conn:
+        conn.execute(insert(AssetORM.__table__), AssetMapper.to_orm_many(assets))
+        conn.execute(insert(PlaceORM.__table__), PlaceMapper.to_orm_many(places))
+    
+    with engine.connect() as conn:
+        asset_rows = conn.execute(select(AssetORM.__table__)).mappings()
+        loaded_assets = AssetMapper.to_domain_many(asset_rows)
+        place_rows = conn.execute(select(PlaceORM.__table__)).mappings()
+        loaded_places = PlaceMapper.to_domain_many(place_rows)
+    
+    expected = {(a.asset_id, a.name, a.category) for a in assets}
+    actual = {(a.asset_id, a.name, a.category) for a in loaded_assets}
+    print(f"Loaded {len(loaded_assets)} assets and {len(loaded_places)} places")
+    
+    if actual == expected:
+        print("✓ Assets round-tripped with their IDs")
+    else:
+        print("✗ Bulk round trip should preserve every asset")
+    
+    if {p.place_id for p in loaded_places} == {p.place_id for p in places}:
+        print("✓ Places round-tripped with their IDs")
+    else:
+        print("✗ Bulk round trip should preserve every place")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Mapper Unit Tests")
+    print("=" * 60)
+    
+    test_single_round_trip()
+    test_bulk_round_trip()
+    
+    print("\n" + "=" * 60)
+    print("Test suite completed")
+    print("=" * 60)
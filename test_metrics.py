@@ -0,0 +1,107 @@
+"""
+Unit tests for the in-process Prometheus metrics.
+Tests thread-sharded counters, histogram buckets, the text format and the
+Flask request instrumentation.
+"""
+import threading
+
+from flask import Flask
+
+from services.metrics import MetricsRegistry
+from api.middleware.metrics import init_metrics
+
+
+def test_counter_across_threads():
+    """Test that increments from many (finished) threads are all counted."""
+    print("\n=== Test: Counter across threads ===")
+    
+    registry = MetricsRegistry()
+    counter = registry.counter("jobs_total", "Jobs.", ("kind",))
+    
+    def work():
+        for _ in range(1000):
+            counter.inc(("email",))
+    
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    counter.inc(("qr",))
+    
+    output = registry.render()
+    print(output)
+    
+    if 'jobs_total{kind="email"} 8000' in output and 'jobs_total{kind="qr"} 1' in output:
+        print("✓ All increments counted, including from finished threads")
+    else:
+        print("✗ Expected 8000 email and 1 qr increments")
+
+
+def test_histogram_buckets():
+    """Test cumulative buckets, sum and count."""
+    print("\n=== Test: Histogram buckets ===")
+    
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+    
+    output = registry.render()
+    print(output)
+    
+    expected = [
+        'latency_seconds_bucket{le="0.1"} 2',
+        'latency_seconds_bucket{le="1.0"} 3',
+        'latency_seconds_bucket{le="+Inf"} 4',
+        'latency_seconds_sum 3.65',
+        'latency_seconds_count 4',
+    ]
+    if all(line in output for line in expected):
+        print("✓ Buckets are cumulative and le is inclusive")
+    else:
+        print("✗ Unexpected histogram output")
+
+
+def test_metrics_endpoint():
+    """Test that requests are recorded and served on /metrics."""
+    print("\n=== Test: /metrics endpoint ===")
+    
+    app = Flask(__name__)
+    
+    @app.get("/ping")
+    def ping():
+        return {"ok": True}
+    
+    init_metrics(app)
+    client = app.test_client()
+    client.get("/ping")
+    client.get("/missing")
+    response = client.get("/metrics")
+    output = response.get_data(as_text=True)
+    
+    if response.status_code == 200 and response.content_type.startswith("text/plain"):
+        print("✓ /metrics served as text/plain")
+    else:
+        print("✗ /metrics should return Prometheus text")
+    
+    if ('http_responses_total{endpoint="ping",method="GET",status="200"}' in output
+            and 'endpoint="unmatched",method="GET",status="404"' in output
+            and 'http_request_duration_seconds_count{blueprint="",endpoint="ping",method="GET"}' in output):
+        print("✓ Status counts and latency recorded per endpoint")
+    else:
+        print("✗ Expected status and latency series for /ping and the 404")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Metrics Unit Tests")
+    print("=" * 60)
+    
+    test_counter_across_threads()
+    test_histogram_buckets()
+    test_metrics_endpoint()
+    
+    print("\n" + "=" * 60)
+    print("Test suite completed")
+    print("=" * 60)
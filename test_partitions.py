@@ -0,0 +1,182 @@
+"""
+Unit tests for asset_history partition management: ensure_partitions
+splitting rows out of the default partition, and the one-off conversion
+of an unpartitioned table (scripts/archive_history.py --convert). They
+run against the PostgreSQL database in TEST_DATABASE_URL, each in a
+scratch schema that is rolled back, and are skipped when none is
+configured.
+"""
+import os
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from database.db import Base
+from database.models import AssetHistoryORM, AssetORM, ProjectORM, UserORM
+from database.partitions import (
+    DEFAULT_PARTITION, PARENT, add_months, attached_partitions, convert_to_partitioned, ensure_partitions,
+    month_start, partition_name
+)
+
+
+def postgres_engine():
+    """Engine on TEST_DATABASE_URL, or None when no PostgreSQL server is configured."""
+    url = os.environ.get("TEST_DATABASE_URL", "")
+    if not url.startswith("postgresql"):
+        return None
+    try:
+        engine = create_engine(url)
+        engine.connect().close()
+        return engine
+    except (ImportError, OperationalError):
+        return None
+
+
+@contextmanager
+def scratch_schema(engine):
+    """Connection whose tables go to a new schema, dropped again by rolling back."""
+    schema = f"partitions_{uuid.uuid4().hex[:12]}"
+    conn = engine.connect()
+    transaction = conn.begin()
+    try:
+        conn.execute(text(f"CREATE SCHEMA {schema}"))
+        # public stays on the path for pg_trgm's operator classes
+        conn.execute(text(f"SET LOCAL search_path TO {schema}, public"))
+        yield conn
+    finally:
+        transaction.rollback()
+        conn.close()
+
+
+def create_parents(conn):
+    """Tables asset_history references, and one asset to move."""
+    Base.metadata.create_all(conn, tables=[UserORM.__table__, ProjectORM.__table__, AssetORM.__table__],
+                             checkfirst=False)
+    conn.execute(AssetORM.__table__.insert(), [{"id": "a1", "name": "Pallet", "category": "Materials"}])
+
+
+def rows_by_partition(conn):
+    """{partition name: row count} of asset_history."""
+    return dict(conn.execute(text(
+        f"SELECT tableoid::regclass::text, count(*) FROM {PARENT} GROUP BY 1"
+    )).all())
+
+
+def test_ensure_partitions_moves_default_rows():
+    """Test that new months take their rows out of the default partition."""
+    print("\n=== Test: ensure_partitions (PostgreSQL) ===")
+    
+    engine = postgres_engine()
+    if engine is None:
+        print("- Skipped: TEST_DATABASE_URL is not a reachable PostgreSQL database")
+        return
+    
+    current = month_start(datetime.utcnow())
+    two_ago, one_ago = add_months(current, -2), add_months(current, -1)
+    with scratch_schema(engine) as conn:
+        create_parents(conn)
+        AssetHistoryORM.__table__.create(conn, checkfirst=False)
+        created_with_table = sorted(attached_partitions(conn))
+        
+        # Moves older than every partition land in the default
+        conn.execute(AssetHistoryORM.__table__.insert(), [
+            {"id": "h1", "asset_id": "a1", "moved_at": two_ago.replace(day=3)},
+            {"id": "h2", "asset_id": "a1", "moved_at": two_ago.replace(day=20)},
+            {"id": "h3", "asset_id": "a1", "moved_at": one_ago.replace(day=9)},
+            {"id": "h4", "asset_id": "a1", "moved_at": current.replace(day=1)},
+        ])
+        before = rows_by_partition(conn)
+        created = ensure_partitions(conn)
+        after = rows_by_partition(conn)
+        again = ensure_partitions(conn)
+        default_attached = conn.execute(text(
+            "SELECT EXISTS (SELECT 1 FROM pg_inherits WHERE inhrelid = CAST(:name AS regclass))"
+        ), {"name": DEFAULT_PARTITION}).scalar()
+    
+    print(f"Before: {before}, after: {after}")
+    if created_with_table == [add_months(current, i) for i in range(4)] and before.get(DEFAULT_PARTITION) == 3:
+        print("✓ Table created with this month and three ahead; older moves went to the default")
+    else:
+        print(f"✗ Unexpected partitions {created_with_table} or rows {before}")
+    
+    expected = {partition_name(two_ago): 2, partition_name(one_ago): 1, partition_name(current): 1}
+    if created == [partition_name(two_ago), partition_name(one_ago)] and after == expected:
+        print("✓ Rows moved from the default partition into their new months")
+    else:
+        print(f"✗ Expected {expected} after creating {created}")
+    
+    if again == [] and default_attached:
+        print("✓ Default partition attached again, second run creates nothing")
+    else:
+        print(f"✗ Second run created {again}, default attached: {default_attached}")
+
+
+def test_convert_existing_table():
+    """Test that --convert partitions an existing table without losing rows."""
+    print("\n=== Test: convert_to_partitioned (PostgreSQL) ===")
+    
+    engine = postgres_engine()
+    if engine is None:
+        print("- Skipped: TEST_DATABASE_URL is not a reachable PostgreSQL database")
+        return
+    
+    current = month_start(datetime.utcnow())
+    old = add_months(current, -14)
+    with scratch_schema(engine) as conn:
+        create_parents(conn)
+        # asset_history as created before partitioning
+        conn.execute(text(f"""
+            CREATE TABLE {PARENT} (
+                id VARCHAR PRIMARY KEY,
+                asset_id VARCHAR NOT NULL REFERENCES assets (id),
+                project_id VARCHAR REFERENCES projects (id),
+                moved_at TIMESTAMP,
+                moved_by VARCHAR REFERENCES users (id)
+            )
+        """))
+        conn.execute(text(f"CREATE INDEX ix_asset_history_asset_id_moved_at ON {PARENT} (asset_id, moved_at)"))
+        conn.execute(text(f"INSERT INTO {PARENT} (id, asset_id, moved_at) VALUES (:id, 'a1', :moved_at)"), [
+            {"id": "h1", "moved_at": old.replace(day=5)},
+            {"id": "h2", "moved_at": add_months(old, 6).replace(day=12)},
+            {"id": "h3", "moved_at": current.replace(day=1)},
+            {"id": "h4", "moved_at": None},
+        ])
+        
+        copied = convert_to_partitioned(conn)
+        after = rows_by_partition(conn)
+        months = sorted(attached_partitions(conn))
+        legacy_left = conn.execute(text("SELECT to_regclass(:name)"), {"name": f"{PARENT}_unpartitioned"}).scalar()
+        second = convert_to_partitioned(conn)
+    
+    print(f"Copied: {copied}, rows: {after}")
+    expected = {partition_name(old): 1, partition_name(add_months(old, 6)): 1, partition_name(current): 2}
+    if copied == 4 and after == expected:
+        print("✓ Every row copied straight into its monthly partition, none left in the default")
+    else:
+        print(f"✗ Expected 4 rows as {expected}")
+    
+    if months == [add_months(old, i) for i in range(18)] and legacy_left is None:
+        print("✓ Partitions cover the oldest row's month to three months ahead, old table dropped")
+    else:
+        print(f"✗ Unexpected partitions {months[:1]}..{months[-1:]} or old table left: {legacy_left}")
+    
+    if second is None:
+        print("✓ Converting a partitioned table is a no-op")
+    else:
+        print(f"✗ Second conversion copied {second} rows")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("asset_history Partition Tests")
+    print("=" * 60)
+    
+    test_ensure_partitions_moves_default_rows()
+    test_convert_existing_table()
+    
+    print("\n" + "=" * 60)
+    print("All tests completed!")
+    print("=" * 60)
@@ -0,0 +1,110 @@
+"""
+Unit tests for the per-request SQL query counter and N+1 detector.
+Tests statement fingerprints, counting on any engine, response headers
+and strict mode against an in-memory SQLite database.
+"""
+from flask import Flask
+from sqlalchemy import create_engine, text
+
+from api.middleware.query_counter import (
+    init_query_counter, count_queries, fingerprint, NPlusOneError
+)
+
+
+def make_app(strict=False, threshold=3):
+    engine = create_engine("sqlite://")
+    app = Flask(__name__)
+    app.config.update(DB_QUERY_STRICT=strict, DB_QUERY_REPEAT_THRESHOLD=threshold, TESTING=True)
+    init_query_counter(app)
+    
+    @app.get("/loop/<int:n>")
+    def loop(n):
+        with engine.connect() as conn:
+            for i in range(n):
+                conn.execute(text(f"SELECT {i}")).scalar()
+        return {"ok": True}
+    
+    return app
+
+
+def test_fingerprint():
+    """Test that statements differing only in values share a fingerprint."""
+    print("\n=== Test: Statement fingerprints ===")
+    
+    first = fingerprint("SELECT * FROM assets WHERE id = 'a1' AND n = 10")
+    second = fingerprint("SELECT *  FROM assets\n WHERE id = 'b2' AND n = 7")
+    in_list = fingerprint("SELECT * FROM assets WHERE id IN (?, ?, ?)")
+    print(f"Fingerprint: {first}")
+    print(f"IN list: {in_list}")
+    
+    if first == second and in_list.endswith("IN (...)"):
+        print("✓ Literals, whitespace and IN lists normalised")
+    else:
+        print("✗ Statements with different values should match")
+
+
+def test_count_queries():
+    """Test that count_queries sees statements on any engine."""
+    print("\n=== Test: count_queries ===")
+    
+    engine = create_engine("sqlite://")
+    with count_queries() as stats:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+    
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 3"))
+    print(f"Count: {stats.count}, time: {stats.total_time * 1000:.3f} ms")
+    
+    if stats.count == 2 and stats.fingerprints["SELECT ?"] == 2:
+        print("✓ Only statements inside the block counted")
+    else:
+        print("✗ Expected 2 statements with the same fingerprint")
+
+
+def test_response_headers():
+    """Test that responses carry X-DB-Queries and X-DB-Time."""
+    print("\n=== Test: Response headers ===")
+    
+    client = make_app().test_client()
+    response = client.get("/loop/2")
+    print(f"X-DB-Queries: {response.headers.get('X-DB-Queries')}, X-DB-Time: {response.headers.get('X-DB-Time')}")
+    
+    if response.headers.get("X-DB-Queries") == "2" and float(response.headers["X-DB-Time"]) >= 0:
+        print("✓ Query headers added")
+    else:
+        print("✗ Response should report 2 queries")
+
+
+def test_strict_mode():
+    """Test that strict mode fails a request with an N+1 loop."""
+    print("\n=== Test: Strict mode ===")
+    
+    client = make_app(strict=True, threshold=3).test_client()
+    
+    if client.get("/loop/3").status_code == 200:
+        print("✓ Requests at the threshold pass")
+    else:
+        print("✗ Requests at the threshold should pass")
+    
+    try:
+        client.get("/loop/4")
+        print("✗ Strict mode should raise NPlusOneError")
+    except NPlusOneError as e:
+        print(f"✓ Strict mode raised: {e}")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Query Counter Unit Tests")
+    print("=" * 60)
+    
+    test_fingerprint()
+    test_count_queries()
+    test_response_headers()
+    test_strict_mode()
+    
+    print("\n" + "=" * 60)
+    print("Test suite completed")
+    print("=" * 60)
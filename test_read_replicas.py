@@ -0,0 +1,157 @@
+"""
+Unit tests for read-replica routing.
+Uses two local SQLite databases as "primary" and "replica" holding
+different rows, so every read shows which database served it.
+"""
+import os
+import tempfile
+
+from flask import Flask
+from flask_jwt_extended import JWTManager, create_access_token, verify_jwt_in_request
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database.db import Base
+from database.models import ProjectORM
+from database.routing import ReplicaSet, RoutingSession, WritePins
+
+app = Flask(__name__)
+app.config["JWT_SECRET_KEY"] = "read-replica-test-secret-0123456789abcdef"
+JWTManager(app)
+
+
+def _database(name):
+    engine = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), name)}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(ProjectORM.__table__.insert(), {"id": "p1", "name": name})
+    return engine
+
+
+def _factory(replica_engines, **replica_options):
+    primary = _database("primary")
+    replicas = ReplicaSet(replica_engines, **replica_options)
+    return sessionmaker(bind=primary, class_=RoutingSession, replicas=replicas, pins=WritePins(10))
+
+
+def _served_by(db):
+    return db.get(ProjectORM, "p1").name
+
+
+def _request(method, user=None):
+    """Request context, authenticated as user if given."""
+    headers = {}
+    if user is not None:
+        with app.app_context():
+            headers["Authorization"] = f"Bearer {create_access_token(identity=user)}"
+    return app.test_request_context("/", method=method, headers=headers)
+
+
+def test_routing_by_method():
+    """Test that GET reads from the replica and POST from the primary."""
+    print("\n=== Test: Routing by request method ===")
+    
+    Session = _factory([_database("replica")])
+    
+    with _request("GET"):
+        db = Session()
+        get_source = _served_by(db)
+        db.close()
+    with _request("POST"):
+        db = Session()
+        post_source = _served_by(db)
+        db.close()
+    db = Session(read_only=True)
+    script_source = _served_by(db)
+    db.close()
+    
+    print(f"GET: {get_source}, POST: {post_source}, read-only script: {script_source}")
+    if (get_source, post_source, script_source) == ("replica", "primary", "replica"):
+        print("✓ Reads routed by request method")
+    else:
+        print("✗ GET and read-only sessions should use the replica, POST the primary")
+
+
+def test_round_robin():
+    """Test that sessions alternate between replicas."""
+    print("\n=== Test: Round robin ===")
+    
+    Session = _factory([_database("replica-a"), _database("replica-b")])
+    
+    sources = []
+    for _ in range(4):
+        db = Session(read_only=True)
+        sources.append(_served_by(db))
+        db.close()
+    
+    print(f"Sources: {sources}")
+    if sources == ["replica-a", "replica-b", "replica-a", "replica-b"]:
+        print("✓ Replicas used in turn")
+    else:
+        print("✗ Expected alternating replicas")
+
+
+def test_fallback():
+    """Test that a lagging or unreachable replica falls back to the primary."""
+    print("\n=== Test: Fallback to primary ===")
+    
+    lagging = _factory([_database("replica")], max_lag=5, lag_query="SELECT 60")
+    unreachable = _factory([create_engine("sqlite:////nonexistent/dir/replica.db")])
+    
+    db = lagging(read_only=True)
+    lag_source = _served_by(db)
+    db.close()
+    db = unreachable(read_only=True)
+    down_source = _served_by(db)
+    db.close()
+    
+    print(f"Lagging: {lag_source}, unreachable: {down_source}")
+    if lag_source == "primary" and down_source == "primary":
+        print("✓ Unhealthy replicas skipped")
+    else:
+        print("✗ Should fall back to the primary")
+
+
+def test_read_your_writes():
+    """Test that a user who wrote reads from the primary; others do not."""
+    print("\n=== Test: Read-your-writes pinning ===")
+    
+    Session = _factory([_database("replica")])
+    
+    with _request("POST", user="u1"):
+        verify_jwt_in_request()
+        db = Session()
+        project = db.get(ProjectORM, "p1")
+        project.location = "Moved"
+        db.commit()
+        same_session = _served_by(db)
+        db.close()
+    
+    sources = {}
+    for user in ("u1", "u2"):
+        with _request("GET", user=user):
+            verify_jwt_in_request()
+            db = Session()
+            sources[user] = _served_by(db)
+            db.close()
+    
+    print(f"After write: {same_session}, next GET by u1: {sources['u1']}, by u2: {sources['u2']}")
+    if same_session == "primary" and sources == {"u1": "primary", "u2": "replica"}:
+        print("✓ Writer pinned to the primary")
+    else:
+        print("✗ Only the user who wrote should be pinned")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Read Replica Routing Tests")
+    print("=" * 60)
+    
+    test_routing_by_method()
+    test_round_robin()
+    test_fallback()
+    test_read_your_writes()
+    
+    print("\n" + "=" * 60)
+    print("All tests completed!")
+    print("=" * 60)
@@ -0,0 +1,134 @@
+"""
+Unit tests for the in-memory NGramIndex used by the search endpoint.
+Tests fuzzy ranking, ID prefix lookups, type filters, index updates and
+removing IDs without shifting the sorted ID list.
+"""
+from services.search_index import NGramIndex, trigrams
+
+
+def build_index():
+    index = NGramIndex()
+    index.add(("asset", "a1"), "Excavator CAT 320 Heavy Equipment", {"name": "Excavator CAT 320"}, doc_id="3f2a9c10-a1")
+    index.add(("asset", "a2"), "Hammer Drill Power Tools", {"name": "Hammer Drill"}, doc_id="7be41d22-a2")
+    index.add(("asset", "a3"), "Drill Press Power Tools", {"name": "Drill Press"}, doc_id="9c0d3e44-a3")
+    index.add(("project", "p1"), "Downtown Office 123 Main St", {"name": "Downtown Office"}, doc_id="5e6f7a88-p1")
+    return index
+
+
+def test_trigrams():
+    """Test that words are padded like pg_trgm."""
+    print("\n=== Test: Trigram extraction ===")
+    
+    grams = trigrams("Cat")
+    print(f"Trigrams: {sorted(grams)}")
+    
+    if grams == {"  c", " ca", "cat", "at "}:
+        print("✓ Trigrams match pg_trgm padding")
+    else:
+        print("✗ Expected {'  c', ' ca', 'cat', 'at '}")
+
+
+def test_fuzzy_match():
+    """Test that misspelled queries still find the right document first."""
+    print("\n=== Test: Fuzzy match ===")
+    
+    index = build_index()
+    hits = index.search("hamer dril")
+    print(f"Hits: {[(round(s, 3), k) for s, k, _ in hits]}")
+    
+    if hits and hits[0][1] == ("asset", "a2"):
+        print("✓ Misspelled query ranks Hammer Drill first")
+    else:
+        print("✗ Hammer Drill should be the top hit")
+    
+    if not index.search("zzzz qqqq"):
+        print("✓ Unrelated query returns no hits")
+    else:
+        print("✗ Unrelated query should return no hits")
+
+
+def test_id_prefix():
+    """Test that the start of an ID finds the document above text matches."""
+    print("\n=== Test: ID prefix lookup ===")
+    
+    index = build_index()
+    hits = index.search("7be41d")
+    print(f"Hits: {[(round(s, 3), k) for s, k, _ in hits]}")
+    
+    if hits and hits[0][1] == ("asset", "a2") and hits[0][0] > 1:
+        print("✓ ID prefix match ranked first")
+    else:
+        print("✗ ID prefix match should rank first with a score above 1")
+
+
+def test_kind_filter_and_limit():
+    """Test that kinds and limit restrict the hits."""
+    print("\n=== Test: Kind filter and limit ===")
+    
+    index = build_index()
+    projects = index.search("downtwn", kinds={"project"})
+    assets = index.search("downtwn", kinds={"asset"})
+    limited = index.search("drill", limit=1)
+    print(f"Projects: {projects}, assets: {assets}, limited: {len(limited)}")
+    
+    if projects and projects[0][1] == ("project", "p1") and not assets:
+        print("✓ Kind filter applied")
+    else:
+        print("✗ Only the requested kinds should be returned")
+    
+    if len(limited) == 1:
+        print("✓ Limit applied")
+    else:
+        print("✗ Limit should cap the number of hits")
+
+
+def test_update_and_remove():
+    """Test that re-adding replaces a document and remove drops it."""
+    print("\n=== Test: Update and remove ===")
+    
+    index = build_index()
+    index.add(("asset", "a1"), "Generator 50kW Power Equipment", {"name": "Generator"}, doc_id="3f2a9c10-a1")
+    renamed = index.search("excavator")
+    updated = index.search("generator")
+    print(f"Old name: {renamed}, new name: {updated}")
+    
+    if not renamed and updated and updated[0][1] == ("asset", "a1"):
+        print("✓ Re-adding replaced the old text")
+    else:
+        print("✗ Re-adding should replace the document")
+    
+    index.remove(("asset", "a1"))
+    if not index.search("generator") and not index.search("3f2a9c10") and len(index) == 3:
+        print("✓ Removed document no longer found")
+    else:
+        print("✗ Removed document should not be found")
+    
+    # Re-indexing many documents leaves tombstones instead of shifting the ID list
+    index = NGramIndex()
+    for i in range(1000):
+        index.add(("asset", f"a{i}"), f"Pallet {i}", doc_id=f"{i:08d}-asset")
+    index.search("00000001")
+    for i in range(0, 1000, 2):
+        index.add(("asset", f"a{i}"), f"Pallet {i} moved", doc_id=f"{i:08d}-asset")
+    tombstones = len(index._removed_ids)
+    hits = [key for _, key, _ in index.search("00000002")]
+    if tombstones == 500 and hits == [("asset", "a2")] and len(index._ids) == 1000 and not index._removed_ids:
+        print("✓ Removed IDs skipped by lookups and compacted on the next sort")
+    else:
+        print(f"✗ {tombstones} tombstones, hits {hits}, {len(index._ids)} IDs kept")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Search Index Unit Tests")
+    print("=" * 60)
+    
+    test_trigrams()
+    test_fuzzy_match()
+    test_id_prefix()
+    test_kind_filter_and_limit()
+    test_update_and_remove()
+    
+    print("\n" + "=" * 60)
+    print("Test suite completed")
+    print("=" * 60)
@@ -0,0 +1,126 @@
+"""
+Unit tests for the synthetic data generator.
+Loads a small dataset into a temporary SQLite database and checks row
+counts, determinism and the skewed distributions.
+"""
+import os
+import tempfile
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, func, select
+
+from database.db import Base
+from database.models import AssetORM, AssetHistoryORM, ComplianceDocumentORM, UserORM
+from database.synthetic import SyntheticScale, entity_id, entity_ids, generate
+
+
+def _load(scale, seed=42):
+    path = os.path.join(tempfile.mkdtemp(), "synthetic.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    counts = generate(engine, scale, seed=seed, chunk_size=250)
+    return engine, counts
+
+
+def test_counts_and_ids():
+    """Test row counts and that IDs are derived from the index."""
+    print("\n=== Test: Counts and deterministic IDs ===")
+    
+    scale = SyntheticScale(1000)
+    engine, counts = _load(scale)
+    print(f"Counts: {counts}")
+    
+    with engine.connect() as conn:
+        asset_ids = set(conn.execute(select(AssetORM.id)).scalars())
+        admin = conn.execute(select(UserORM).where(UserORM.username == "admin")).first()
+    
+    if counts["assets"] == 1000 and counts["projects"] == 10 and counts["compliance_documents"] == 60:
+        print("✓ Row counts follow the scale")
+    else:
+        print("✗ Unexpected row counts")
+    
+    if asset_ids == set(entity_ids("asset", 1000)) and admin.id == entity_id("user", 0):
+        print("✓ IDs match entity_ids()")
+    else:
+        print("✗ Stored IDs should be the deterministic ones")
+    
+    if entity_id("asset", 0, seed=1) != entity_id("asset", 0, seed=2):
+        print("✓ Seed changes the IDs")
+    else:
+        print("✗ Different seeds should give different IDs")
+
+
+def test_history_matches_current_project():
+    """Test that each asset's latest move is to its current project."""
+    print("\n=== Test: Latest history row matches asset ===")
+    
+    engine, counts = _load(SyntheticScale(1000))
+    
+    latest = {}
+    with engine.connect() as conn:
+        for asset_id, project_id, moved_at in conn.execute(
+            select(AssetHistoryORM.asset_id, AssetHistoryORM.project_id, AssetHistoryORM.moved_at)
+        ):
+            if asset_id not in latest or moved_at > latest[asset_id][1]:
+                latest[asset_id] = (project_id, moved_at)
+        current = dict(conn.execute(select(AssetORM.id, AssetORM.project_id)).all())
+    
+    mismatches = [a for a, (project_id, _) in latest.items() if current[a] != project_id]
+    print(f"History rows: {counts['asset_history']}, mismatches: {len(mismatches)}")
+    
+    if not mismatches:
+        print("✓ Asset project_id equals its latest move")
+    else:
+        print("✗ Latest history row should match the asset's project")
+
+
+def test_skewed_distributions():
+    """Test hot assets, busy projects and expiries around 30 days."""
+    print("\n=== Test: Skewed distributions ===")
+    
+    engine, counts = _load(SyntheticScale(5000, history_depth=5))
+    today = date.today()
+    
+    with engine.connect() as conn:
+        depths = sorted(conn.execute(
+            select(func.count()).select_from(AssetHistoryORM).group_by(AssetHistoryORM.asset_id)
+        ).scalars(), reverse=True)
+        sizes = sorted(conn.execute(
+            select(func.count()).select_from(AssetORM).group_by(AssetORM.project_id)
+        ).scalars(), reverse=True)
+        expiries = list(conn.execute(select(ComplianceDocumentORM.expiry_date)).scalars())
+    
+    mean_depth = sum(depths) / len(depths)
+    print(f"History depth: max {depths[0]}, mean {mean_depth:.1f}")
+    if depths[0] > 10 * mean_depth:
+        print("✓ A few hot assets have deep history")
+    else:
+        print("✗ History depth should be long-tailed")
+    
+    print(f"Largest project: {sizes[0]} of {counts['assets']} assets")
+    if sizes[0] > 5 * counts["assets"] / len(sizes):
+        print("✓ Project sizes are skewed")
+    else:
+        print("✗ Project sizes should be skewed")
+    
+    near_threshold = sum(1 for d in expiries if today + timedelta(days=15) <= d <= today + timedelta(days=45))
+    expired = sum(1 for d in expiries if d < today)
+    print(f"Expired: {expired}, within 15-45 days: {near_threshold}, total: {len(expiries)}")
+    if near_threshold > len(expiries) * 0.25 and expired > 0:
+        print("✓ Expiry dates cluster around the 30-day threshold")
+    else:
+        print("✗ Expiry dates should cluster around 30 days")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Synthetic Data Tests")
+    print("=" * 60)
+    
+    test_counts_and_ids()
+    test_history_matches_current_project()
+    test_skewed_distributions()
+    
+    print("\n" + "=" * 60)
+    print("All tests completed!")
+    print("=" * 60)